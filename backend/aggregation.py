@@ -0,0 +1,415 @@
+"""
+Combine council members' stage 2 rankings into one ordering.
+
+Methods (selected per preset with an "aggregation" key):
+  average:  mean position among the rankings that include a model
+  borda:    n - position points per ranking
+  copeland: pairwise majority wins minus losses
+  schulze:  strongest-path wins over the pairwise preference matrix
+  kemeny:   the ordering that agrees with the most pairwise judgements,
+            found by local search from the Borda order
+
+Partial rankings (a member that left models out) count as ranking every
+listed model above every unlisted one, with no preference among the
+unlisted; Borda splits the remaining points evenly between them. A
+ranking can also have a scope, the models its reviewer was shown (see
+backend/peer_review.py): models outside it are unknown to that ranking
+rather than ranked below, and positions and Borda points within it are
+scaled to the size of the whole council.
+
+Pairwise work uses numpy when it is installed and the council is large
+enough for vectorizing to pay off; results are the same either way.
+Compare methods and sizes with: python -m benchmarks.aggregation
+"""
+
+from operator import lt
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+METHODS = ("average", "borda", "copeland", "schulze", "kemeny")
+
+# Candidates below this count are handled in pure Python even with numpy
+# installed: array setup costs more than the loops it replaces
+_VECTORIZE_MIN_CANDIDATES = 8
+
+
+def _orders(
+    rankings: List[List[str]],
+    candidates: List[str],
+    scopes: Optional[List[Optional[List[str]]]] = None
+) -> Tuple[List[List[int]], List[Optional[List[int]]]]:
+    """
+    Turn rankings into lists of candidate indices.
+
+    Unknown and repeated entries are dropped, as are entries outside the
+    ranking's scope and rankings left empty.
+
+    Returns:
+        Tuple of (orders, scopes as candidate indices or None for all)
+    """
+    index = {candidate: i for i, candidate in enumerate(candidates)}
+    orders = []
+    order_scopes: List[Optional[List[int]]] = []
+    for i, ranking in enumerate(rankings):
+        scope = scopes[i] if scopes is not None else None
+        order = [index[c] for c in ranking if c in index]
+        if scope is not None:
+            scope = [index[c] for c in dict.fromkeys(scope) if c in index]
+            shown = set(scope)
+            order = [c for c in order if c in shown]
+            if len(scope) == len(candidates):
+                scope = None
+        if len(set(order)) != len(order):
+            order = list(dict.fromkeys(order))
+        if order:
+            orders.append(order)
+            order_scopes.append(scope)
+    return orders, order_scopes
+
+
+def _position_rows(orders: List[List[int]], n: int) -> List[List[int]]:
+    """One row per ranking: each candidate's 1-based position, n + 1 if unlisted."""
+    rows = []
+    for order in orders:
+        row = [n + 1] * n
+        for position, candidate in enumerate(order, start=1):
+            row[candidate] = position
+        rows.append(row)
+    return rows
+
+
+def tabulate(
+    orders: List[List[int]],
+    n: int,
+    scopes: Optional[List[Optional[List[int]]]] = None
+) -> Dict[str, Any]:
+    """
+    Build every per-candidate table the methods need.
+
+    Args:
+        orders: Rankings as candidate indices, best first (possibly partial)
+        n: Number of candidates
+        scopes: Optional candidates each ranking was shown (None for all)
+
+    Returns:
+        Dict with 'matrix' (n x n, [a][b] = rankings putting a above b) and
+        lists indexed by candidate: 'counts' and 'position_sums' over the
+        rankings that list it, 'borda' points (unlisted candidates share
+        the points left over; with scopes, scaled as if every ranking had
+        seen it) and 'rank_sums' (unlisted candidates share the mean of the
+        positions left over, as Kendall's W needs; None with scopes)
+    """
+    m = len(orders)
+    scopes = scopes or [None] * m
+    scoped = any(scope is not None for scope in scopes)
+    sizes = [len(scope) if scope is not None else n for scope in scopes]
+    rows = _position_rows(orders, n)
+    # Per ranking: factor from its scope to the whole council, and the
+    # points and position shared by its unlisted candidates
+    scales = [(n - 1) / (k - 1) if k > 1 else 0.0 for k in sizes]
+    shares = [(k - len(order) - 1) / 2 * scale for order, k, scale in zip(orders, sizes, scales)]
+    tails = [(len(order) + 1 + n) / 2 for order in orders]
+
+    if np is not None and n >= _VECTORIZE_MIN_CANDIDATES:
+        positions = np.array(rows)
+        listed = positions <= n
+        before = positions[:, :, None] < positions[:, None, :]
+        if scoped:
+            seen = np.zeros((m, n), dtype=bool)
+            for row, scope in enumerate(scopes):
+                seen[row, scope if scope is not None else slice(None)] = True
+            before &= seen[:, :, None] & seen[:, None, :]
+        else:
+            seen = np.ones((m, n), dtype=bool)
+        k = np.array(sizes)[:, None]
+        scale = np.array(scales)[:, None]
+        points = np.where(listed, (k - positions) * scale, np.where(seen, np.array(shares)[:, None], 0.0))
+        seen_counts = np.maximum(seen.sum(axis=0), 1)
+        return {
+            "matrix": before.sum(axis=0).tolist(),
+            "counts": listed.sum(axis=0).tolist(),
+            "position_sums": np.where(listed, 1 + (positions - 1) * scale, 0.0).sum(axis=0).tolist(),
+            "borda": (points.sum(axis=0) * m / seen_counts).tolist(),
+            "rank_sums": None if scoped else
+                np.where(listed, positions, np.array(tails)[:, None]).sum(axis=0).tolist(),
+        }
+
+    if not scoped:
+        # Common case: one C-level pass per candidate pair
+        columns = list(zip(*rows))
+        counts = [m - column.count(n + 1) for column in columns]
+        position_sums = [float(sum(column) - (n + 1) * (m - count)) for column, count in zip(columns, counts)]
+        borda = [n * count - total for count, total in zip(counts, position_sums)]
+        rank_sums = list(position_sums)
+        for order, share, tail in zip(orders, shares, tails):
+            if len(order) == n:
+                continue
+            listed_set = set(order)
+            for candidate in range(n):
+                if candidate not in listed_set:
+                    borda[candidate] += share
+                    rank_sums[candidate] += tail
+        return {
+            "matrix": [[sum(map(lt, a, b)) for b in columns] for a in columns],
+            "counts": counts,
+            "position_sums": position_sums,
+            "borda": borda,
+            "rank_sums": rank_sums,
+        }
+
+    matrix = [[0] * n for _ in range(n)]
+    counts = [0] * n
+    position_sums = [0.0] * n
+    points = [0.0] * n
+    seen_counts = [0] * n
+    for order, scope, k, scale, share in zip(orders, scopes, sizes, scales, shares):
+        shown = scope if scope is not None else range(n)
+        unlisted = set(shown).difference(order)
+        for i, a in enumerate(order):
+            counts[a] += 1
+            position_sums[a] += 1 + i * scale
+            points[a] += (k - 1 - i) * scale
+            row = matrix[a]
+            for b in order[i + 1:]:
+                row[b] += 1
+            for b in unlisted:
+                row[b] += 1
+        for candidate in unlisted:
+            points[candidate] += share
+        for candidate in shown:
+            seen_counts[candidate] += 1
+    return {
+        "matrix": matrix,
+        "counts": counts,
+        "position_sums": position_sums,
+        "borda": [points[c] * m / max(seen_counts[c], 1) for c in range(n)],
+        "rank_sums": None,
+    }
+
+
+def _copeland(matrix: List[List[int]]) -> List[float]:
+    n = len(matrix)
+    scores = [0.0] * n
+    for a in range(n):
+        for b in range(a + 1, n):
+            if matrix[a][b] > matrix[b][a]:
+                scores[a] += 1
+                scores[b] -= 1
+            elif matrix[a][b] < matrix[b][a]:
+                scores[b] += 1
+                scores[a] -= 1
+    return scores
+
+
+def _strongest_paths(matrix: List[List[int]]) -> List[List[int]]:
+    """Widest-path strengths between candidates (Floyd-Warshall on majorities)."""
+    n = len(matrix)
+    if np is not None and n >= _VECTORIZE_MIN_CANDIDATES:
+        d = np.array(matrix)
+        p = np.where(d > d.T, d, 0)
+        for k in range(n):
+            p = np.maximum(p, np.minimum(p[:, k:k + 1], p[k:k + 1, :]))
+        return p.tolist()
+
+    p = [
+        [matrix[a][b] if matrix[a][b] > matrix[b][a] else 0 for b in range(n)]
+        for a in range(n)
+    ]
+    for k in range(n):
+        pk = p[k]
+        for a in range(n):
+            via = p[a][k]
+            if not via:
+                continue
+            pa = p[a]
+            for b in range(n):
+                if pk[b] > pa[b] and via > pa[b]:
+                    pa[b] = via if via < pk[b] else pk[b]
+    return p
+
+
+def _schulze(matrix: List[List[int]]) -> List[float]:
+    p = _strongest_paths(matrix)
+    n = len(matrix)
+    return [float(sum(1 for b in range(n) if b != a and p[a][b] > p[b][a])) for a in range(n)]
+
+
+def _kemeny_order(matrix: List[List[int]], start: List[int]) -> List[int]:
+    """
+    Improve an ordering by moving single candidates while agreement increases.
+
+    Each pass tries every candidate at every position, with the gain of a
+    move accumulated as it slides, so a pass is O(n^2).
+    """
+    n = len(matrix)
+    margin = [[matrix[a][b] - matrix[b][a] for b in range(n)] for a in range(n)]
+    order = list(start)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n):
+            x = order[i]
+            best_gain, best_j = 0, i
+            gain = 0
+            for j in range(i + 1, n):
+                gain -= margin[x][order[j]]
+                if gain > best_gain:
+                    best_gain, best_j = gain, j
+            gain = 0
+            for j in range(i - 1, -1, -1):
+                gain += margin[x][order[j]]
+                if gain > best_gain:
+                    best_gain, best_j = gain, j
+            if best_j != i:
+                order.insert(best_j, order.pop(i))
+                improved = True
+    return order
+
+
+def _positions(order: List[int], n: int) -> List[int]:
+    """Position of each candidate in an ordering (0 = best)."""
+    positions = [0] * n
+    for position, candidate in enumerate(order):
+        positions[candidate] = position
+    return positions
+
+
+def _condorcet_winner(matrix: List[List[int]], candidates: List[str]) -> Optional[str]:
+    """The candidate preferred to every other by a majority, if there is one."""
+    n = len(matrix)
+    # Only the survivor of a single elimination pass can beat everyone
+    champion = 0
+    for challenger in range(1, n):
+        if matrix[challenger][champion] > matrix[champion][challenger]:
+            champion = challenger
+    row = matrix[champion]
+    if all(row[b] > matrix[b][champion] for b in range(n) if b != champion):
+        return candidates[champion]
+    return None
+
+
+def _kendall_w(rank_sums: Optional[List[float]], m: int) -> Optional[float]:
+    """Kendall's coefficient of concordance (0 = no agreement, 1 = identical rankings)."""
+    if rank_sums is None:
+        # Not defined when rankers saw different subsets
+        return None
+    n = len(rank_sums)
+    if m < 2 or n < 2:
+        return None
+    mean = m * (n + 1) / 2
+    spread = sum((total - mean) ** 2 for total in rank_sums)
+    return 12 * spread / (m * m * (n ** 3 - n))
+
+
+def aggregate(
+    rankings: List[List[str]],
+    candidates: List[str],
+    method: str = "average",
+    scopes: Optional[List[Optional[List[str]]]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Aggregate rankings of candidates with one of METHODS.
+
+    Args:
+        rankings: Each member's ranking of candidate identifiers, best first
+        candidates: All candidates that could be ranked
+        method: Aggregation method
+        scopes: Optional candidates shown to each ranker, aligned with
+            `rankings` (None, or a None entry, for all of them)
+
+    Returns:
+        Tuple of (entries best first, agreement stats). Each entry has
+        'model', 'rank' (ties share a rank), 'score' (the method's own score,
+        lower is better only for "average"), 'average_rank' (scaled to the
+        whole council for scoped rankings), 'rankings_count' and 'agreement'
+        (share of pairwise judgements involving the model that the
+        aggregate order agrees with). Candidates no ranking lists are left
+        out. Stats have 'method', 'rankers', 'complete_rankings' (rankings
+        of everything their ranker was shown), 'kendall_w' (None with
+        scopes), 'pairwise_agreement' and 'condorcet_winner'.
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown aggregation method {method!r}")
+
+    n = len(candidates)
+    orders, order_scopes = _orders(rankings, candidates, scopes)
+    stats: Dict[str, Any] = {
+        "method": method,
+        "rankers": len(orders),
+        "complete_rankings": sum(
+            1 for order, scope in zip(orders, order_scopes)
+            if len(order) == (len(scope) if scope is not None else n)
+        ),
+        "kendall_w": None,
+        "pairwise_agreement": None,
+        "condorcet_winner": None,
+    }
+    if not orders:
+        return [], stats
+
+    tables = tabulate(orders, n, order_scopes)
+    matrix, counts, borda = tables["matrix"], tables["counts"], tables["borda"]
+    averages = [
+        tables["position_sums"][c] / counts[c] if counts[c] else float(n + 1) for c in range(n)
+    ]
+
+    wins = [sum(row) for row in matrix]
+    losses = [sum(column) for column in zip(*matrix)]
+
+    # Sort keys: primary score, then Borda, then council order
+    if method == "average":
+        scores = averages
+        order = sorted(range(n), key=lambda c: (averages[c], -borda[c], c))
+        primary = averages
+    elif method == "borda":
+        scores = borda
+        order = sorted(range(n), key=lambda c: (-borda[c], averages[c], c))
+        primary = [-s for s in borda]
+    elif method in ("copeland", "schulze"):
+        scores = _copeland(matrix) if method == "copeland" else _schulze(matrix)
+        order = sorted(range(n), key=lambda c: (-scores[c], -borda[c], c))
+        primary = [-s for s in scores]
+    else:
+        start = sorted(range(n), key=lambda c: (-borda[c], c))
+        order = _kemeny_order(matrix, start)
+        scores = [float(wins[c] - losses[c]) for c in range(n)]
+        # The order itself decides; no ties
+        primary = _positions(order, n)
+
+    # The preference matrix in aggregate order: judgements above the
+    # diagonal agree with it
+    ordered = [[matrix[a][b] for b in order] for a in order]
+    ordered_columns = list(zip(*ordered))
+    agreeing_total = sum(sum(row[place + 1:]) for place, row in enumerate(ordered))
+    judged_total = sum(wins)
+
+    entries = []
+    rank = 0
+    for place, candidate in enumerate(order):
+        if place == 0 or primary[candidate] != primary[order[place - 1]]:
+            rank = place + 1
+        if not counts[candidate]:
+            continue
+        agreeing = sum(ordered[place][place + 1:]) + sum(ordered_columns[place][:place])
+        judged = wins[candidate] + losses[candidate]
+        entries.append({
+            "model": candidates[candidate],
+            "rank": rank,
+            "score": round(scores[candidate], 2),
+            "average_rank": round(averages[candidate], 2),
+            "rankings_count": counts[candidate],
+            "agreement": round(agreeing / judged, 3) if judged else None,
+        })
+
+    w = _kendall_w(tables["rank_sums"], len(orders))
+    stats["kendall_w"] = round(w, 3) if w is not None else None
+    stats["pairwise_agreement"] = round(agreeing_total / judged_total, 3) if judged_total else None
+    stats["condorcet_winner"] = _condorcet_winner(matrix, candidates)
+    return entries, stats
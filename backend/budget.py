@@ -0,0 +1,363 @@
+"""
+Prompt token budgets.
+
+Stage 2 prompts paste in every stage 1 answer a member reviews, and the
+chairman's prompt pastes in every answer and every stage 2 evaluation. With
+long answers or a large council such a prompt can exceed the model's context
+window (the chairman then fails and stage 3 falls back to an error), and it
+always adds to time to first token. Before these prompts are sent their size
+is estimated offline, and if a prompt would not fit its model's budget (the
+context window less room for the answer and a safety margin, or a preset's
+max_prompt_tokens) the pasted texts are cut down by one of these policies:
+
+    proportional  every text is truncated by the same share
+    keep_top      the top-ranked answers are kept whole, the rest truncated
+    extractive    the top-ranked answers are kept whole, the rest reduced
+                  to their most informative sentences
+
+Both kinds of cut happen at paragraph, line or sentence boundaries and mark
+what was left out. Prompts that fit are sent unchanged.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+from .config import DEFAULT_CONTEXT_LIMIT, MODEL_CONTEXT_LIMITS, PROMPT_BUDGET_MARGIN
+from .near_duplicate import STOPWORDS, QUESTION_WORDS
+
+POLICIES = ("proportional", "keep_top", "extractive")
+
+# Mark left where a text was cut short, and where sentences were left out
+TRUNCATED_MARK = "[... truncated]"
+OMITTED_MARK = "[...]"
+
+# Texts are never cut below this many tokens
+MIN_TEXT_TOKENS = 64
+
+# Pieces a BPE tokenizer mostly encodes as one token each: runs of letters
+# (together with the space before them), groups of up to three digits, line
+# breaks, runs of indentation, one or two ASCII punctuation marks, and any
+# other single character
+_PIECES = re.compile(r"[A-Za-z]+|[0-9]{1,3}|\n+|[ \t]{2,}|[!-/:-@\[-`{-~]{1,2}|[^\x00-\x7f]")
+# Words long enough to be split into several tokens, about one per 8 letters
+_LONG_WORDS = re.compile(r"[A-Za-z]{9,}")
+_LONG_WORD_LETTERS = 8
+
+# Sentence ends, but not list numbers ("1. ") or heading numbers
+_SENTENCE_BREAK = re.compile(r"(?<=[^\d\s][.!?])[ \t]+(?=\S)")
+_CONTENT_WORDS = re.compile(r"[a-z0-9]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the tokens a model's tokenizer splits a text into.
+
+    Works offline, without a model vocabulary: it counts the pieces a BPE
+    tokenizer mostly keeps together (see _PIECES), which tracks English prose
+    and code more closely than a flat characters-per-token ratio.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    pieces = len(_PIECES.findall(text))
+    return pieces + sum(len(word) // _LONG_WORD_LETTERS for word in _LONG_WORDS.findall(text))
+
+
+def context_limit(model: str) -> int:
+    """Context window of a model in tokens (see MODEL_CONTEXT_LIMITS in config.py)."""
+    return MODEL_CONTEXT_LIMITS.get(model, DEFAULT_CONTEXT_LIMIT)
+
+
+def prompt_budget(
+    model: str,
+    policy: Dict[str, Any],
+    reserve_output_tokens: Optional[int] = None
+) -> int:
+    """
+    Tokens a prompt to `model` may take.
+
+    Args:
+        model: OpenRouter model identifier
+        policy: Budget policy (see DEFAULT_BUDGET_POLICY in config.py)
+        reserve_output_tokens: Room to leave for the answer (default the
+            policy's reserve_output_tokens)
+
+    Returns:
+        The context window less the reserved answer tokens and
+        PROMPT_BUDGET_MARGIN, capped at the policy's max_prompt_tokens
+    """
+    reserve = reserve_output_tokens or policy.get("reserve_output_tokens") or 0
+    budget = int((context_limit(model) - reserve) * (1 - PROMPT_BUDGET_MARGIN))
+    if policy.get("max_prompt_tokens"):
+        budget = min(budget, policy["max_prompt_tokens"])
+    return max(budget, 0)
+
+
+def _break_before(text: str, limit: int) -> int:
+    """Latest paragraph, line, sentence or word break before `limit`, preferring the larger breaks."""
+    floor = limit * 4 // 5
+    for separators in (("\n\n",), ("\n",), (". ", "? ", "! "), (" ",)):
+        position = max(text.rfind(separator, 0, limit) for separator in separators)
+        if position >= floor:
+            # Keep the sentence's closing punctuation
+            return position + 1 if separators[0] == ". " else position
+    return limit
+
+
+def truncate_text(text: str, tokens: int) -> str:
+    """
+    Cut a text to at most about `tokens` tokens, at a paragraph, line, sentence or word break.
+
+    Args:
+        text: Text to cut
+        tokens: Tokens to keep, including the truncation mark
+
+    Returns:
+        The start of the text followed by TRUNCATED_MARK (the text itself if
+        it already fits)
+    """
+    total = estimate_tokens(text)
+    if total <= tokens:
+        return text
+    keep = max(tokens - estimate_tokens(TRUNCATED_MARK) - 2, 1)
+    limit = len(text) * keep // total
+    while limit > 0:
+        cut = text[:_break_before(text, limit)].rstrip()
+        if estimate_tokens(cut) <= keep:
+            break
+        limit = limit * 9 // 10
+    else:
+        cut = ""
+    if cut.count("```") % 2:
+        # Close a code block cut off in the middle
+        cut += "\n```"
+    return f"{cut}\n{TRUNCATED_MARK}" if cut else TRUNCATED_MARK
+
+
+def _units(text: str) -> List[Tuple[int, int]]:
+    """Split a text into (start, end) spans: whole fenced code blocks, otherwise sentences within lines."""
+    units = []
+    fence = None
+    position = 0
+    for line in text.splitlines(keepends=True):
+        start = position
+        position += len(line)
+        end = start + len(line.rstrip())
+        if line.lstrip().startswith("```"):
+            if fence is None:
+                fence = start
+            else:
+                units.append((fence, end))
+                fence = None
+        elif fence is None and line.strip():
+            cut = start + len(line) - len(line.lstrip())
+            if text.startswith("#", cut):
+                units.append((cut, end))
+                continue
+            for separator in _SENTENCE_BREAK.finditer(text, cut, end):
+                units.append((cut, separator.start()))
+                cut = separator.end()
+            units.append((cut, end))
+    if fence is not None:
+        units.append((fence, len(text.rstrip())))
+    return units
+
+
+# Words that say nothing about a sentence's topic
+_IGNORED_WORDS = STOPWORDS | QUESTION_WORDS | {"not"}
+
+
+def _content_words(text: str) -> List[str]:
+    return [w for w in _CONTENT_WORDS.findall(text.lower()) if len(w) > 2 and w not in _IGNORED_WORDS]
+
+
+def extract_text(text: str, tokens: int, query: str = "") -> str:
+    """
+    Reduce a text to its most informative sentences within `tokens` tokens.
+
+    Sentences (and fenced code blocks, kept whole) are scored by how common
+    their words are across the text, boosted by words shared with the
+    question; the opening sentence goes first. The chosen ones are kept in
+    their original order, with OMITTED_MARK where others were left out.
+
+    Args:
+        text: Text to compress
+        tokens: Tokens to keep, including omission marks
+        query: The user's question
+
+    Returns:
+        The compressed text (the text itself if it already fits; cut
+        short like truncate_text if whole sentences fill less than half of
+        `tokens`)
+    """
+    if estimate_tokens(text) <= tokens:
+        return text
+    units = _units(text)
+    words = [set(_content_words(text[start:end])) for start, end in units]
+    frequency = Counter(word for unit in words for word in unit)
+    query_words = set(_content_words(query))
+    mark_tokens = estimate_tokens(f"\n{OMITTED_MARK}\n")
+
+    def priority(index: int) -> Tuple[int, float, int]:
+        unit = words[index]
+        score = sum(frequency[word] for word in unit) / math.sqrt(len(unit)) if unit else 0.0
+        return (1 if index == 0 else 0, score * (1 + len(unit & query_words)), -index)
+
+    # Greedy selection; words already covered count for half as much each
+    # time, so repeated points are not picked over new ones. Scores only
+    # drop, so a stale score in the heap is an upper bound.
+    heap = [(tuple(-x for x in priority(index)), index) for index in range(len(units))]
+    heapq.heapify(heap)
+    chosen = []
+    used = 0
+    while heap:
+        _, index = heapq.heappop(heap)
+        current = tuple(-x for x in priority(index))
+        if heap and current > heap[0][0]:
+            heapq.heappush(heap, (current, index))
+            continue
+        cost = estimate_tokens(text[units[index][0]:units[index][1]]) + mark_tokens
+        if used + cost <= tokens:
+            chosen.append(index)
+            used += cost
+            for word in words[index]:
+                frequency[word] /= 2
+    if used < tokens // 2:
+        # Mostly units too long to fit whole (e.g. one big code block)
+        return truncate_text(text, tokens)
+
+    chosen.sort()
+    parts = [] if chosen[0] == 0 else [OMITTED_MARK, "\n"]
+    for previous, index in zip([None] + chosen, chosen):
+        start, end = units[index]
+        if previous is not None:
+            gap = text[units[previous][1]:start]
+            if index == previous + 1:
+                parts.append(gap)
+            else:
+                parts.append(f"\n{OMITTED_MARK}\n" if "\n" in gap else f" {OMITTED_MARK} ")
+        parts.append(text[start:end])
+    if chosen[-1] != len(units) - 1:
+        parts.append(f"\n{OMITTED_MARK}")
+    return "".join(parts)
+
+
+def fit_texts(
+    texts: List[str],
+    budget: int,
+    policy: str = "proportional",
+    order: Optional[List[int]] = None,
+    keep_top: int = 0,
+    query: str = ""
+) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Cut texts down so that together they take at most `budget` tokens.
+
+    Args:
+        texts: Texts pasted into one prompt
+        budget: Tokens available for all of them
+        policy: One of POLICIES
+        order: Indices of the ranked texts, best first (None if there is no
+            ranking yet: every text is then cut alike). Texts not listed are
+            never kept whole by keep_top.
+        keep_top: Top-ranked texts to keep whole ("keep_top" and
+            "extractive"), as long as the others can still get
+            MIN_TEXT_TOKENS each
+        query: The user's question, favoured by extractive compression
+
+    Returns:
+        Tuple of (texts, report), with one report entry per cut text:
+        'index', 'tokens' (before), 'kept' (after) and 'method'
+        ("truncated" or "extractive")
+    """
+    sizes = [estimate_tokens(text) for text in texts]
+    if sum(sizes) <= budget:
+        return list(texts), []
+
+    whole = set()
+    if policy != "proportional":
+        for index in (order or [])[:keep_top]:
+            others = len(texts) - len(whole) - 1
+            if sum(sizes[i] for i in whole) + sizes[index] + others * MIN_TEXT_TOKENS <= budget:
+                whole.add(index)
+    rest = [i for i in range(len(texts)) if i not in whole]
+    room = budget - sum(sizes[i] for i in whole)
+    share = max(room, 0) / max(sum(sizes[i] for i in rest), 1)
+
+    method = "extractive" if policy == "extractive" else "truncated"
+    fitted = list(texts)
+    report = []
+    for index in rest:
+        quota = max(int(sizes[index] * share), MIN_TEXT_TOKENS)
+        if quota >= sizes[index]:
+            continue
+        if method == "extractive":
+            fitted[index] = extract_text(texts[index], quota, query)
+        else:
+            fitted[index] = truncate_text(texts[index], quota)
+        report.append({
+            "index": index,
+            "tokens": sizes[index],
+            "kept": estimate_tokens(fitted[index]),
+            "method": method,
+        })
+    return fitted, report
+
+
+def fit_prompt(
+    build: Callable[[List[str]], str],
+    texts: List[str],
+    names: List[str],
+    model: str,
+    policy: Dict[str, Any],
+    order: Optional[List[int]] = None,
+    query: str = "",
+    reserve_output_tokens: Optional[int] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build a prompt, cutting down the texts pasted into it if it would exceed the model's budget.
+
+    Args:
+        build: Builds the prompt from the texts
+        texts: Texts pasted into the prompt (answers, evaluations, ...)
+        names: Name of each text for the report (a label or model)
+        model: Model the prompt is for
+        policy: Budget policy (see DEFAULT_BUDGET_POLICY in config.py)
+        order: Indices of the ranked texts, best first (see fit_texts)
+        query: The user's question
+        reserve_output_tokens: Room to leave for the answer (default the
+            policy's)
+
+    Returns:
+        Tuple of (prompt, report). The report has 'context_limit', 'budget'
+        and the prompt's estimated 'tokens'; when texts were cut, also
+        'original_tokens' and 'trimmed' (name, tokens, kept, method per text).
+    """
+    prompt = build(texts)
+    budget = prompt_budget(model, policy, reserve_output_tokens)
+    tokens = estimate_tokens(prompt)
+    report: Dict[str, Any] = {"context_limit": context_limit(model), "budget": budget, "tokens": tokens}
+    if tokens <= budget:
+        return prompt, report
+
+    fixed = estimate_tokens(build([""] * len(texts)))
+    fitted, trimmed = fit_texts(
+        texts, budget - fixed, policy.get("policy") or "proportional", order,
+        policy.get("keep_top") or 0, query
+    )
+    prompt = build(fitted)
+    report["original_tokens"] = tokens
+    report["tokens"] = estimate_tokens(prompt)
+    report["trimmed"] = [
+        {"name": names[entry.pop("index")], **entry}
+        for entry in trimmed
+    ]
+    return prompt, report
@@ -0,0 +1,242 @@
+"""Two-tier (memory LRU + SQLite) cache for upstream model responses."""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from .config import (
+    CACHE_ENABLED,
+    CACHE_TTL_SECONDS,
+    CACHE_MEMORY_MAX_ENTRIES,
+    CACHE_MEMORY_MAX_BYTES,
+    CACHE_DB_PATH,
+    CACHE_DISK_MAX_ENTRIES,
+)
+from .io_pool import run_blocking
+from . import serialization
+
+# Set to True for the duration of a request that must not use cached responses
+cache_bypass: ContextVar[bool] = ContextVar("cache_bypass", default=False)
+
+_stats = {
+    "memory_hits": 0,
+    "disk_hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "bypassed": 0,
+    "errors": 0,
+}
+
+
+def make_key(
+    model: str,
+    messages: List[Dict[str, str]],
+    params: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a content-addressed cache key for an upstream call.
+
+    Args:
+        model: OpenRouter model identifier
+        messages: List of message dicts; only 'role' and 'content' are keyed
+        params: Optional extra request parameters that affect the output
+
+    Returns:
+        Hex SHA-256 of the canonical JSON encoding of the call
+    """
+    canonical = {
+        "model": model,
+        "messages": [{"role": m.get("role"), "content": m.get("content")} for m in messages],
+        "params": params or {},
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class MemoryCache:
+    """LRU cache bounded by entry count and approximate byte size, with TTL."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, size, value = entry
+        if expires_at < time.time():
+            self._drop(key)
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Dict[str, Any], size: int, expires_at: float):
+        if key in self.entries:
+            self._drop(key)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (expires_at, size, value)
+        self.size += size
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self._drop(next(iter(self.entries)))
+
+    def _drop(self, key: str):
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+
+class DiskCache:
+    """Persistent SQLite tier that survives restarts."""
+
+    def __init__(self, path: str, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        self.writes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    value TEXT NOT NULL
+                )"""
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_expires ON responses(expires_at)"
+            )
+        return self.conn
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self.lock:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at >= ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return serialization.loads(row[0]), row[1], len(row[0])
+
+    def put(self, key: str, model: str, encoded: str, expires_at: float):
+        with self.lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, created_at, expires_at, value) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, time.time(), expires_at, encoded)
+            )
+            self.writes += 1
+            # Prune now and then rather than on every write
+            if self.writes % 100 == 0:
+                conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            conn.commit()
+
+
+_memory = MemoryCache(CACHE_MEMORY_MAX_ENTRIES, CACHE_MEMORY_MAX_BYTES, CACHE_TTL_SECONDS)
+_disk = DiskCache(CACHE_DB_PATH, CACHE_DISK_MAX_ENTRIES)
+
+
+def is_active() -> bool:
+    """Whether the cache should be consulted for the current request."""
+    if not CACHE_ENABLED:
+        return False
+    if cache_bypass.get():
+        _stats["bypassed"] += 1
+        return False
+    return True
+
+
+async def get(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up a cached response, checking memory before disk.
+
+    A failing disk tier (locked or corrupt database, full disk) is logged
+    and counted as a miss, so the caller falls through to the upstream call.
+
+    Args:
+        key: Cache key from make_key
+
+    Returns:
+        Cached response dict, or None on a miss
+    """
+    value = _memory.get(key)
+    if value is not None:
+        _stats["memory_hits"] += 1
+        return value
+
+    try:
+        found = await run_blocking(_disk.get, key)
+    except Exception as e:
+        print(f"Response cache read failed: {e}")
+        _stats["errors"] += 1
+        found = None
+    if found is None:
+        _stats["misses"] += 1
+        return None
+
+    value, expires_at, size = found
+    _memory.put(key, value, size, expires_at)
+    _stats["disk_hits"] += 1
+    return value
+
+
+async def put(key: str, model: str, value: Dict[str, Any]):
+    """
+    Store a successful response in both tiers.
+
+    A failing disk write is logged and skipped; the response has already
+    been fetched and is still returned to the caller.
+
+    Args:
+        key: Cache key from make_key
+        model: OpenRouter model identifier (kept for inspection/pruning)
+        value: Response dict with 'content' and optional 'reasoning_details'
+    """
+    try:
+        encoded = serialization.dumps(value)
+        expires_at = time.time() + CACHE_TTL_SECONDS
+        _memory.put(key, value, len(encoded), expires_at)
+        await run_blocking(_disk.put, key, model, encoded, expires_at)
+    except Exception as e:
+        print(f"Response cache write failed: {e}")
+        _stats["errors"] += 1
+        return
+    _stats["stores"] += 1
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get cache hit/miss counters and memory tier usage.
+
+    Returns:
+        Dict of counters plus current memory entries and bytes
+    """
+    return {
+        "enabled": CACHE_ENABLED,
+        **_stats,
+        "memory_entries": len(_memory.entries),
+        "memory_bytes": _memory.size,
+    }
@@ -5,6 +5,15 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 # OpenRouter API key
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 
@@ -82,6 +91,132 @@ COUNCIL_MODELS = [
 # Default chairman model - synthesizes final response (using flagship model)
 CHAIRMAN_MODEL = "google/gemini-3-pro-preview"
 
+# Default stage execution policy for stages 1 and 2; presets may override it
+# with a "stage_policy" key.
+#   quorum: advance once this many members have answered (None waits for all)
+#   soft_deadline: seconds after which the stage advances with the answers
+#       received so far, as long as at least one member has answered
+DEFAULT_STAGE_POLICY = {
+    "quorum": None,
+    "soft_deadline": None,
+}
+
+# How stage 2 rankings are combined into the aggregate ranking; presets may
+# override it with an "aggregation" key. One of "average" (mean position),
+# "borda", "copeland", "schulze" or "kemeny" (see backend/aggregation.py).
+DEFAULT_AGGREGATION_METHOD = "average"
+
+# How stage 2 review is split up; presets may override it with a
+# "review_policy" key (see backend/peer_review.py).
+#   sharded: show each reviewer a block of the answers instead of all of them
+#   pair_coverage: reviewers that must compare every pair of answers
+#   block_size: minimum answers per reviewer (None picks the smallest block
+#       that meets pair_coverage)
+#   min_responses: review in full below this many stage 1 answers
+DEFAULT_REVIEW_POLICY = {
+    "sharded": False,
+    "pair_coverage": 2,
+    "block_size": None,
+    "min_responses": 6,
+}
+
+# Stage 2 answer style; presets may override it with a "ranking" key.
+#   mode: "full" (evaluate every response, then a FINAL RANKING section) or
+#       "fast" (only the ranking: JSON for STRUCTURED_RANKING_MODELS, a bare
+#       FINAL RANKING list for everyone else)
+#   rationales: in fast mode, ask for a one-line reason per response
+#   max_tokens: cap on each reviewer's stage 2 answer (None = no cap). Leave
+#       room for reasoning models, whose hidden reasoning counts against it.
+DEFAULT_RANKING_POLICY = {
+    "mode": "full",
+    "rationales": True,
+    "max_tokens": None,
+}
+
+# Hierarchical councils; presets may override it with a "hierarchy" key.
+# Councils of at least `min_members` are split into sub-councils of about
+# `group_size` members. Each runs stages 1 and 2 on its own and has a
+# sub-chairman synthesize its answers; the chairman then synthesizes the
+# sub-council syntheses.
+#   sub_chairman: model for every sub-council's synthesis (None = the
+#       sub-council's top-ranked member)
+DEFAULT_HIERARCHY_POLICY = {
+    "enabled": False,
+    "group_size": 5,
+    "min_members": 9,
+    "sub_chairman": None,
+}
+
+# Prompt token budgets for stage 2 and 3 prompts; presets may override it
+# with a "budget" key. Answers pasted into a prompt are cut down when the
+# prompt would not fit the model's context window (see backend/budget.py).
+#   policy: "proportional" (cut every answer by the same share), "keep_top"
+#       (keep the top-ranked answers whole, cut the rest) or "extractive"
+#       (keep the top-ranked answers whole, reduce the rest to their most
+#       informative sentences). Stage 2 prompts come before any ranking, so
+#       "keep_top" cuts them proportionally.
+#   keep_top: answers kept whole by "keep_top" and "extractive"
+#   reserve_output_tokens: room left in the window for the answer (stage 2
+#       uses the ranking policy's max_tokens instead when it is set)
+#   max_prompt_tokens: optional cap below the context window, e.g. to bound
+#       time to first token (None = the window)
+DEFAULT_BUDGET_POLICY = {
+    "policy": "keep_top",
+    "keep_top": 2,
+    "reserve_output_tokens": 8192,
+    "max_prompt_tokens": None,
+}
+
+# Context window (prompt plus answer, in tokens) per model; other models get
+# DEFAULT_CONTEXT_LIMIT. Prompt sizes are estimated offline, so budgets keep a
+# margin of PROMPT_BUDGET_MARGIN below the window.
+DEFAULT_CONTEXT_LIMIT = 32768
+PROMPT_BUDGET_MARGIN = 0.1
+MODEL_CONTEXT_LIMITS = {
+    "openai/gpt-5.2": 400000,
+    "openai/gpt-5.1": 400000,
+    "openai/gpt-5.1-codex": 400000,
+    "openai/gpt-5": 400000,
+    "openai/gpt-5-mini": 400000,
+    "openai/gpt-4o": 128000,
+    "openai/gpt-4o-mini": 128000,
+    "openai/o1": 200000,
+    "openai/o1-mini": 128000,
+    "anthropic/claude-opus-4.5": 200000,
+    "anthropic/claude-sonnet-4.5": 1000000,
+    "anthropic/claude-haiku-4.5": 200000,
+    "anthropic/claude-3.5-sonnet": 200000,
+    "anthropic/claude-3.5-haiku": 200000,
+    "anthropic/claude-3-opus": 200000,
+    "google/gemini-3-pro-preview": 1048576,
+    "google/gemini-3-flash-preview": 1048576,
+    "google/gemini-3-pro-image-preview": 65536,
+    "google/gemini-2.5-pro": 1048576,
+    "google/gemini-2.5-flash": 1048576,
+    "google/gemini-2.0-flash-exp:free": 1048576,
+    "google/gemini-exp-1206:free": 2097152,
+    "google/gemini-2.0-flash-thinking-exp:free": 40000,
+    "google/gemini-pro-1.5": 2000000,
+    "meta-llama/llama-3.3-70b-instruct": 131072,
+    "meta-llama/llama-3.1-405b-instruct": 131072,
+    "perplexity/llama-3.1-sonar-large-128k-online": 127072,
+    "perplexity/llama-3.1-sonar-huge-128k-online": 127072,
+    "mistralai/mistral-large": 128000,
+    "mistralai/mistral-medium": 32000,
+    "deepseek/deepseek-chat": 64000,
+    "x-ai/grok-2-1212": 131072,
+    "x-ai/grok-beta": 131072,
+    "qwen/qwen-2.5-72b-instruct": 32768,
+}
+
+# Council members asked for their stage 2 ranking as JSON-schema structured
+# output (OpenRouter "response_format") rather than a free-text FINAL RANKING
+# section. Only list models whose providers support json_schema; a provider
+# that rejects it fails the request.
+STRUCTURED_RANKING_MODELS = [
+    # "openai/gpt-5.2",
+]
+
 # Task-based model presets
 # Based on OpenRouter rankings and real-world usage data
 MODEL_PRESETS = {
@@ -105,7 +240,8 @@ MODEL_PRESETS = {
             "google/gemini-3-pro-preview",   # Strong general capabilities
             "openai/gpt-5.2",                # Latest flagship
         ],
-        "chairman_model": "openai/gpt-4o"
+        "chairman_model": "openai/gpt-4o",
+        "stage_policy": {"quorum": 3, "soft_deadline": 60.0}
     },
     "brainstorming": {
         "name": "Brainstorming & Ideation",
@@ -116,7 +252,9 @@ MODEL_PRESETS = {
             "google/gemini-3-pro-preview",   # Novel approaches
             "deepseek/deepseek-chat",        # Alternative viewpoint
         ],
-        "chairman_model": "google/gemini-3-pro-preview"
+        "chairman_model": "google/gemini-3-pro-preview",
+        # Three viewpoints are plenty for ideation; don't wait on a straggler
+        "stage_policy": {"quorum": 3, "soft_deadline": 45.0}
     },
     "reasoning": {
         "name": "Complex Reasoning",
@@ -127,7 +265,37 @@ MODEL_PRESETS = {
             "google/gemini-2.5-pro",         # Strong reasoning
             "openai/gpt-5.2",                # Latest capabilities
         ],
-        "chairman_model": "openai/o1"
+        "chairman_model": "openai/o1",
+        # Pairwise majorities are less swayed by one outlier ranking than mean position
+        "aggregation": "schulze"
+    },
+    "panel": {
+        "name": "Large Panel",
+        "description": "Fifteen models from every provider in three sub-councils",
+        "council_models": [
+            # Listed by provider; sub-councils take every third model,
+            # so each gets a mix of providers
+            "openai/gpt-5.2",
+            "openai/gpt-5.1",
+            "openai/o1",
+            "openai/gpt-4o",
+            "anthropic/claude-opus-4.5",
+            "anthropic/claude-sonnet-4.5",
+            "anthropic/claude-haiku-4.5",
+            "google/gemini-3-pro-preview",
+            "google/gemini-2.5-pro",
+            "google/gemini-3-flash-preview",
+            "deepseek/deepseek-chat",
+            "mistralai/mistral-large",
+            "meta-llama/llama-3.1-405b-instruct",
+            "qwen/qwen-2.5-72b-instruct",
+            "x-ai/grok-2-1212",
+        ],
+        "chairman_model": "google/gemini-3-pro-preview",
+        # Sub-councils keep every ranking and synthesis prompt to five answers
+        "hierarchy": {"enabled": True, "group_size": 5},
+        # Fifteen full evaluations add little over one-line rationales
+        "ranking": {"mode": "fast"}
     },
     "balanced": {
         "name": "Balanced Performance",
@@ -145,5 +313,113 @@ MODEL_PRESETS = {
 # OpenRouter API endpoint
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
+# Shared upstream HTTP client (one pooled client per process)
+# HTTP/2 multiplexing requires the optional `h2` package (pip install "httpx[http2]")
+HTTP2_ENABLED = _env_bool("HTTP2_ENABLED", False)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+# Requests beyond this many in flight wait in a measurable queue
+HTTP_MAX_CONCURRENT_REQUESTS = int(os.getenv("HTTP_MAX_CONCURRENT_REQUESTS", str(HTTP_MAX_CONNECTIONS)))
+# Seconds a request may wait for a free connection before failing
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "30"))
+# Connections opened to OpenRouter at startup (0 disables prewarming)
+HTTP_PREWARM_CONNECTIONS = int(os.getenv("HTTP_PREWARM_CONNECTIONS", "4"))
+
+# Request hedging: if a call has produced no first byte after the model's
+# recent HEDGE_PERCENTILE time-to-first-byte, send a duplicate and keep
+# whichever answers first. Doubles cost for hedged calls, so off by default.
+HEDGING_ENABLED = _env_bool("HEDGING_ENABLED", False)
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.95"))
+# Samples needed before the percentile is trusted; until then the default is used
+HEDGE_MIN_SAMPLES = 20
+HEDGE_HISTORY_SIZE = 200
+HEDGE_DEFAULT_DELAY = 15.0
+HEDGE_MIN_DELAY = 2.0
+# Optional per-model target for the duplicate request (must be in AVAILABLE_MODELS);
+# models not listed are hedged against themselves
+HEDGE_FALLBACK_MODELS = {
+    # "openai/gpt-5.2": "openai/gpt-5.1",
+}
+
+# Retries for transient upstream failures (429, 5xx, timeouts, dropped connections)
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "2"))
+RETRY_BASE_DELAY = 0.5
+# Longest backoff we'll sleep; a larger Retry-After gives up instead of waiting
+RETRY_MAX_DELAY = 10.0
+
+# Upstream call scheduler: a global cap on concurrent upstream calls plus
+# per-model concurrency caps and token-bucket rate limits. Calls over the
+# limits queue and are served round-robin across conversations.
+SCHEDULER_MAX_CONCURRENT = int(os.getenv("SCHEDULER_MAX_CONCURRENT", "64"))
+
+# Limits applied to any model without an entry in MODEL_LIMITS (None = unlimited)
+DEFAULT_MODEL_LIMITS = {
+    "max_concurrent": 16,
+    "requests_per_minute": None,
+    "tokens_per_minute": None,
+}
+
+# Per-model overrides matching each provider's published limits, e.g.
+#   "openai/o1": {"max_concurrent": 4, "requests_per_minute": 60, "tokens_per_minute": 200000},
+MODEL_LIMITS = {
+}
+
+# Per-model circuit breaker: after this many consecutive failures a model
+# fails fast (and is skipped by the council) until a half-open probe succeeds
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
 # Data directory for conversation storage
 DATA_DIR = "data/conversations"
+
+# Conversation storage backend:
+#   "jsonl": append-only log per conversation in DATA_DIR (legacy .json files
+#            are read as-is and converted on their next write)
+#   "json": one JSON file per conversation, rewritten on every change
+#   "sqlite": normalized tables in STORAGE_DB_PATH, WAL mode
+# Import existing file conversations into SQLite with: python -m backend.storage.migrate
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "jsonl")
+STORAGE_DB_PATH = "data/conversations.sqlite3"
+# fsync conversation writes before reporting them done (slower, crash-safe)
+STORAGE_FSYNC = _env_bool("STORAGE_FSYNC", False)
+# Rewrite a conversation log once this many title/model updates have piled up
+STORAGE_LOG_COMPACT_UPDATES = 20
+# Threads for blocking storage I/O, so disk work never runs on the event loop
+STORAGE_IO_THREADS = int(os.getenv("STORAGE_IO_THREADS", "8"))
+# A turn's storage changes are committed in one write when it finishes. With
+# write-behind enabled they are also flushed in the background at stage
+# boundaries and every STORAGE_WRITE_BEHIND_INTERVAL seconds, so less is lost
+# if the process dies mid-turn, without the stream ever waiting on disk.
+STORAGE_WRITE_BEHIND = _env_bool("STORAGE_WRITE_BEHIND", False)
+STORAGE_WRITE_BEHIND_INTERVAL = float(os.getenv("STORAGE_WRITE_BEHIND_INTERVAL", "5"))
+# Stage 1/2 texts are kept once per distinct content in a compressed blob
+# table (DATA_DIR/.blobs.sqlite3, or inside STORAGE_DB_PATH for sqlite) and
+# referenced by hash from messages. "auto" uses zstd when the optional
+# `zstandard` package is installed and zlib with a preset dictionary
+# otherwise; "zstd", "zlib" and "none" force one. Existing blobs stay readable
+# whatever this is set to. Remove orphans with: python -m backend.storage.prune
+STORAGE_BLOB_COMPRESSION = os.getenv("STORAGE_BLOB_COMPRESSION", "auto")
+
+# Response cache for upstream calls, keyed by model + canonicalized messages.
+# An in-memory LRU sits in front of a SQLite file that survives restarts.
+# Individual requests can skip it with "bypass_cache": true.
+CACHE_ENABLED = _env_bool("CACHE_ENABLED", True)
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", str(24 * 3600)))
+CACHE_MEMORY_MAX_ENTRIES = 1000
+CACHE_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+CACHE_DB_PATH = "data/response_cache.sqlite3"
+CACHE_DISK_MAX_ENTRIES = 50000
+
+# Near-duplicate query reuse: queries are MinHashed and looked up in a local
+# LSH index; a past run with the same council configuration whose estimated
+# similarity is at least the threshold is reused.
+#   mode "return": answer with the previous three-stage result
+#   mode "offer": run the council anyway but surface the previous result
+NEAR_DUPLICATE_ENABLED = _env_bool("NEAR_DUPLICATE_ENABLED", False)
+NEAR_DUPLICATE_MODE = os.getenv("NEAR_DUPLICATE_MODE", "return")
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.85"))
+NEAR_DUPLICATE_DB_PATH = "data/near_duplicates.sqlite3"
+# bands * rows MinHash permutations; candidates surface at ~(1/bands)^(1/rows) similarity
+NEAR_DUPLICATE_BANDS = 16
+NEAR_DUPLICATE_ROWS = 4
@@ -1,17 +1,308 @@
 """3-stage LLM Council orchestration."""
 
-from typing import List, Dict, Any, Tuple
-from .openrouter import query_models_parallel, query_model
-from .config import COUNCIL_MODELS, CHAIRMAN_MODEL
+import asyncio
+from typing import List, Dict, Any, Tuple, Callable, Optional
+from .openrouter import query_model
+from .ranking import response_labels, parse_ranking, ranking_response_format, structured_to_text
+from . import aggregation
+from . import budget
+from .peer_review import plan_review, min_pair_coverage
+from .resilience import is_available
+from .cache import cache_bypass
+from . import near_duplicate
+from .io_pool import run_blocking
+from .config import (
+    COUNCIL_MODELS,
+    CHAIRMAN_MODEL,
+    DEFAULT_STAGE_POLICY,
+    DEFAULT_AGGREGATION_METHOD,
+    DEFAULT_REVIEW_POLICY,
+    DEFAULT_HIERARCHY_POLICY,
+    DEFAULT_RANKING_POLICY,
+    DEFAULT_BUDGET_POLICY,
+    NEAR_DUPLICATE_ENABLED,
+    NEAR_DUPLICATE_MODE,
+    STRUCTURED_RANKING_MODELS,
+)
+
+
+# Stage 3 answer when the chairman fails
+SYNTHESIS_ERROR = "Error: Unable to generate final synthesis."
+
+# Callback receiving (model, content delta) while a stage streams
+DeltaCallback = Callable[[str, str], None]
+
+# Callback receiving (model, formatted result) as each member finishes
+ResultCallback = Callable[[str, Dict[str, Any]], None]
+
+
+def resolve_stage_policy(preset: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the stage execution policy for a preset.
+
+    Args:
+        preset: Preset dict (built-in or custom), or None for defaults
+
+    Returns:
+        Dict with 'quorum' and 'soft_deadline' keys
+    """
+    policy = dict(DEFAULT_STAGE_POLICY)
+    if preset and preset.get("stage_policy"):
+        policy.update(preset["stage_policy"])
+    return policy
+
+
+def resolve_aggregation_method(preset: Optional[Dict[str, Any]]) -> str:
+    """
+    Get the rank aggregation method for a preset.
+
+    Args:
+        preset: Preset dict (built-in or custom), or None for defaults
+
+    Returns:
+        One of aggregation.METHODS (the default if the preset names an unknown one)
+    """
+    method = (preset or {}).get("aggregation") or DEFAULT_AGGREGATION_METHOD
+    if method not in aggregation.METHODS:
+        print(f"Unknown aggregation method {method!r}; using {DEFAULT_AGGREGATION_METHOD}")
+        return DEFAULT_AGGREGATION_METHOD
+    return method
 
 
-async def stage1_collect_responses(user_query: str, council_models: List[str]) -> List[Dict[str, Any]]:
+def resolve_review_policy(preset: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the stage 2 review policy for a preset.
+
+    Args:
+        preset: Preset dict (built-in or custom), or None for defaults
+
+    Returns:
+        Dict with 'sharded', 'pair_coverage', 'block_size' and 'min_responses' keys
+    """
+    policy = dict(DEFAULT_REVIEW_POLICY)
+    if preset and preset.get("review_policy"):
+        policy.update(preset["review_policy"])
+    return policy
+
+
+def resolve_ranking_policy(preset: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the stage 2 answer style for a preset.
+
+    Args:
+        preset: Preset dict (built-in or custom), or None for defaults
+
+    Returns:
+        Dict with 'mode' ("full" or "fast"), 'rationales' and 'max_tokens' keys
+    """
+    policy = dict(DEFAULT_RANKING_POLICY)
+    if preset and preset.get("ranking"):
+        policy.update(preset["ranking"])
+    return policy
+
+
+def resolve_hierarchy_policy(preset: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the hierarchical council policy for a preset.
+
+    Args:
+        preset: Preset dict (built-in or custom), or None for defaults
+
+    Returns:
+        Dict with 'enabled', 'group_size', 'min_members' and 'sub_chairman' keys
+    """
+    policy = dict(DEFAULT_HIERARCHY_POLICY)
+    if preset and preset.get("hierarchy"):
+        policy.update(preset["hierarchy"])
+    return policy
+
+
+def resolve_budget_policy(preset: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the prompt token budget policy for a preset.
+
+    Args:
+        preset: Preset dict (built-in or custom), or None for defaults
+
+    Returns:
+        Dict with 'policy', 'keep_top', 'reserve_output_tokens' and
+        'max_prompt_tokens' keys
+    """
+    policy = dict(DEFAULT_BUDGET_POLICY)
+    if preset and preset.get("budget"):
+        policy.update(preset["budget"])
+    if policy["policy"] not in budget.POLICIES:
+        print(f"Unknown budget policy {policy['policy']!r}; using {DEFAULT_BUDGET_POLICY['policy']}")
+        policy["policy"] = DEFAULT_BUDGET_POLICY["policy"]
+    return policy
+
+
+def plan_sub_councils(
+    council_models: List[str],
+    policy: Optional[Dict[str, Any]]
+) -> Optional[List[List[str]]]:
+    """
+    Split a council into sub-councils under a hierarchy policy.
+
+    Sub-councils take every g-th member (for g sub-councils), so models
+    listed next to each other, often from one provider, are spread out.
+
+    Args:
+        council_models: Active council members
+        policy: Hierarchy policy (see resolve_hierarchy_policy)
+
+    Returns:
+        Members of each sub-council, or None to run one flat council
+    """
+    if not policy or not policy.get("enabled"):
+        return None
+    size = len(council_models)
+    group_size = max(2, policy.get("group_size") or 2)
+    if size < max(policy.get("min_members") or 0, group_size + 1):
+        return None
+    groups = -(-size // group_size)
+    return [council_models[i::groups] for i in range(groups)]
+
+
+async def collect_with_policy(
+    models: List[str],
+    messages: List[Dict[str, str]],
+    policy: Optional[Dict[str, Any]] = None,
+    on_delta: Optional[DeltaCallback] = None,
+    on_response: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    overrides: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, str]]]:
+    """
+    Query models in parallel, advancing once the stage policy is satisfied.
+
+    Members whose circuit breaker is open are skipped up front. Members still
+    running when the quorum is reached or the soft deadline expires are
+    cancelled. The deadline never fires before at least one member has answered.
+
+    Args:
+        models: List of OpenRouter model identifiers
+        messages: List of message dicts to send to each model
+        policy: Stage policy with 'quorum' and 'soft_deadline' (None waits for all)
+        on_delta: Optional callback receiving (model, delta) as responses stream
+        on_response: Optional callback receiving (model, response) as each
+            member answers successfully
+        overrides: Optional per-model request changes: 'messages' replacing
+            the shared messages and/or extra request 'params'
+
+    Returns:
+        Tuple of (successful responses keyed by model in council order,
+        list of dropped members with 'model' and 'reason')
+    """
+    policy = policy or {}
+    overrides = overrides or {}
+    quorum = policy.get("quorum")
+    soft_deadline = policy.get("soft_deadline")
+
+    dropped: List[Dict[str, str]] = [
+        {"model": model, "reason": "circuit_open"}
+        for model in models if not is_available(model)
+    ]
+    tasks = {
+        asyncio.create_task(query_model(
+            model,
+            overrides.get(model, {}).get("messages", messages),
+            on_delta=(lambda delta, m=model: on_delta(m, delta)) if on_delta else None,
+            params=overrides.get(model, {}).get("params")
+        )): model
+        for model in models if is_available(model)
+    }
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + soft_deadline if soft_deadline is not None else None
+    answered: Dict[str, Dict[str, Any]] = {}
+    pending = set(tasks)
+    stop_reason = None
+
+    try:
+        while pending:
+            timeout = max(0.0, deadline - loop.time()) if deadline is not None else None
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+
+            for task in done:
+                model = tasks[task]
+                response = task.result()
+                if response is None:
+                    dropped.append({"model": model, "reason": "failed"})
+                    continue
+                answered[model] = response
+                if on_response:
+                    on_response(model, response)
+
+            if quorum and len(answered) >= quorum:
+                stop_reason = "quorum_reached"
+                break
+            if deadline is not None and loop.time() >= deadline:
+                if answered:
+                    stop_reason = "deadline_expired"
+                    break
+                # Nobody has answered yet; keep waiting for the first member
+                deadline = None
+    finally:
+        # Also runs when the stage itself is cancelled (client went away),
+        # so no upstream call outlives it
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    for task in pending:
+        dropped.append({"model": tasks[task], "reason": stop_reason})
+
+    ordered = {model: answered[model] for model in models if model in answered}
+    return ordered, dropped
+
+
+def _flag_origin(result: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+    """Mark a stage result served from the response cache or by a hedge fallback model."""
+    if response.get('cached'):
+        result["cached"] = True
+    if response.get('answered_by'):
+        result["answered_by"] = response['answered_by']
+    return result
+
+
+def _model_label(result: Dict[str, Any]) -> str:
+    """A stage result's model, naming the fallback model that actually answered."""
+    if result.get("answered_by"):
+        return f"{result['model']} (answered by {result['answered_by']})"
+    return result["model"]
+
+
+def _record_dropped(
+    metadata: Optional[Dict[str, Any]],
+    stage: str,
+    dropped: List[Dict[str, str]]
+):
+    """Record a stage's dropped members in the run metadata."""
+    if metadata is not None and dropped:
+        metadata.setdefault("dropped_members", {})[stage] = dropped
+
+
+async def stage1_collect_responses(
+    user_query: str,
+    council_models: List[str],
+    on_delta: Optional[DeltaCallback] = None,
+    policy: Optional[Dict[str, Any]] = None,
+    on_result: Optional[ResultCallback] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
     """
     Stage 1: Collect individual responses from all council models.
 
     Args:
         user_query: The user's question
         council_models: List of model identifiers to query (can be 0-4 models)
+        on_delta: Optional callback receiving (model, delta) as responses stream
+        policy: Optional stage policy (quorum / soft deadline)
+        on_result: Optional callback receiving (model, result) as each member finishes
+        metadata: Optional dict that receives dropped members under 'dropped_members'
 
     Returns:
         List of dicts with 'model' and 'response' keys
@@ -24,33 +315,66 @@ async def stage1_collect_responses(user_query: str, council_models: List[str]) -
     
     messages = [{"role": "user", "content": user_query}]
 
-    # Query all models in parallel
-    responses = await query_models_parallel(active_models, messages)
-
-    # Format results
-    stage1_results = []
-    for model, response in responses.items():
-        if response is not None:  # Only include successful responses
-            stage1_results.append({
-                "model": model,
-                "response": response.get('content', '')
-            })
+    def format_result(model: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        return _flag_origin({
+            "model": model,
+            "response": response.get('content', '')
+        }, response)
+
+    # Query all models in parallel, advancing per the stage policy
+    responses, dropped = await collect_with_policy(
+        active_models,
+        messages,
+        policy,
+        on_delta=on_delta,
+        on_response=(lambda m, r: on_result(m, format_result(m, r))) if on_result else None
+    )
+    _record_dropped(metadata, "stage1", dropped)
 
-    return stage1_results
+    # Format results (only successful responses are included)
+    return [format_result(model, response) for model, response in responses.items()]
 
 
 async def stage2_collect_rankings(
     user_query: str,
     stage1_results: List[Dict[str, Any]],
-    council_models: List[str]
+    council_models: List[str],
+    on_delta: Optional[DeltaCallback] = None,
+    policy: Optional[Dict[str, Any]] = None,
+    on_result: Optional[ResultCallback] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    review_policy: Optional[Dict[str, Any]] = None,
+    label_offset: int = 0,
+    ranking_policy: Optional[Dict[str, Any]] = None,
+    budget_policy: Optional[Dict[str, Any]] = None
 ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
     """
     Stage 2: Each model ranks the anonymized responses.
 
+    With a sharded review policy each model is shown only its block of the
+    responses (see peer_review.plan_review) and its result lists them under
+    'reviewed'. In the fast ranking mode models return only the ranking,
+    with optional one-line rationales, instead of a full evaluation.
+    Responses are cut down where a member's prompt would not fit its
+    context window (see budget.fit_prompt).
+
     Args:
         user_query: The original user query
         stage1_results: Results from Stage 1
         council_models: List of model identifiers to query
+        on_delta: Optional callback receiving (model, delta) as rankings stream
+        policy: Optional stage policy (quorum / soft deadline)
+        on_result: Optional callback receiving (model, result) as each member finishes
+        metadata: Optional dict that receives dropped members under
+            'dropped_members', the review layout under 'peer_review' and
+            each member's prompt budget under 'prompt_budget'
+        review_policy: Optional review policy (full review if None)
+        label_offset: Labels to skip, so that sub-councils of one council
+            use distinct labels
+        ranking_policy: Optional answer style (see resolve_ranking_policy;
+            full evaluations if None)
+        budget_policy: Optional prompt budget policy (see
+            resolve_budget_policy; DEFAULT_BUDGET_POLICY if None)
 
     Returns:
         Tuple of (rankings list, label_to_model mapping)
@@ -65,31 +389,73 @@ async def stage2_collect_rankings(
     if not active_models:
         return [], {}
     
-    # Create anonymized labels for responses (Response A, Response B, etc.)
-    labels = [chr(65 + i) for i in range(len(stage1_results))]  # A, B, C, ...
+    # Create anonymized labels for responses (Response A, ..., Response Z, Response AA, ...)
+    labels = response_labels(label_offset + len(stage1_results))[label_offset:]
 
     # Create mapping from label to model name
     label_to_model = {
-        f"Response {label}": result['model']
+        label: result['model']
         for label, result in zip(labels, stage1_results)
     }
 
-    # Build the ranking prompt
-    responses_text = "\n\n".join([
-        f"Response {label}:\n{result['response']}"
-        for label, result in zip(labels, stage1_results)
-    ])
+    # Sharded review shows each model a block of the responses
+    blocks = plan_review(active_models, [r['model'] for r in stage1_results], review_policy or {})
+    shown_labels = {
+        model: [labels[i] for i in blocks[model]] if blocks else labels
+        for model in active_models
+    }
+
+    ranking_policy = ranking_policy or {}
+    fast = ranking_policy.get("mode") == "fast"
+    rationales = ranking_policy.get("rationales", True)
+    max_tokens = ranking_policy.get("max_tokens")
+
+    budget_policy = budget_policy or DEFAULT_BUDGET_POLICY
+    budget_reports: Dict[str, Dict[str, Any]] = {}
 
-    ranking_prompt = f"""You are evaluating different responses to the following question:
+    def ranking_prompt(shown: List[str], structured: bool, texts: List[str]) -> str:
+        """Prompt asking a member to rank `shown`, whose responses read `texts`."""
+        responses_text = "\n\n".join([
+            f"{label}:\n{text}"
+            for label, text in zip(shown, texts)
+        ])
+
+        context = f"""You are evaluating different responses to the following question:
 
 Question: {user_query}
 
 Here are the responses from different models (anonymized):
 
-{responses_text}
+{responses_text}"""
+
+        prompt_intro = f"""{context}
 
 Your task:
-1. First, evaluate each response individually. For each response, explain what it does well and what it does poorly.
+1. First, evaluate each response individually. For each response, explain what it does well and what it does poorly."""
+
+        if fast and structured:
+            notes = ' and a one-line reason for each, in the same order, in "notes"' if rationales else ""
+            prompt = f"""{context}
+
+Rank the responses from best to worst. Do not write an evaluation. Reply with a JSON object: the response labels, best first, in "ranking"{notes}."""
+        elif fast:
+            reason = " - <one-line reason>" if rationales else ""
+            prompt = f"""{context}
+
+Rank the responses from best to worst. Do not write an evaluation. Reply with ONLY the ranking, formatted EXACTLY as:
+
+FINAL RANKING:
+1. <best response label>{reason}
+2. <next response label>{reason}
+(and so on for every response)"""
+        elif structured:
+            # Members that support it answer with a schema-checked JSON object instead
+            prompt = f"""{prompt_intro}
+2. Then rank all of the responses from best to worst.
+
+Reply with a JSON object: put your evaluation in "evaluation" and the response labels, best first, in "ranking"."""
+        else:
+            prompt = f"""{prompt_intro}
 2. Then, at the very end of your response, provide a final ranking.
 
 IMPORTANT: Your final ranking MUST be formatted EXACTLY as follows:
@@ -110,23 +476,70 @@ FINAL RANKING:
 3. Response B
 
 Now provide your evaluation and ranking:"""
+        return prompt
+
+    def ranking_request(model: str, shown: List[str], structured: bool) -> Dict[str, Any]:
+        """Build the messages and params asking `model` to rank `shown`."""
+        texts = [result['response'] for label, result in zip(labels, stage1_results) if label in shown]
+        # Cut the responses down if the prompt would not fit the member's context window
+        prompt, budget_reports[model] = budget.fit_prompt(
+            lambda texts: ranking_prompt(shown, structured, texts), texts, shown, model,
+            budget_policy, query=user_query, reserve_output_tokens=max_tokens
+        )
 
-    messages = [{"role": "user", "content": ranking_prompt}]
+        params: Dict[str, Any] = {}
+        if structured:
+            params["response_format"] = ranking_response_format(
+                shown, evaluation=not fast, notes=fast and rationales
+            )
+        if max_tokens:
+            params["max_tokens"] = max_tokens
+        return {"messages": [{"role": "user", "content": prompt}], "params": params or None}
+
+    # Every member gets its own request, so there are no shared messages
+    overrides = {
+        model: ranking_request(model, shown_labels[model], model in STRUCTURED_RANKING_MODELS)
+        for model in active_models
+    }
+    if metadata is not None:
+        metadata.setdefault("prompt_budget", {})["stage2"] = budget_reports
+    if metadata is not None and fast:
+        metadata["ranking_output"] = {"mode": "fast", "rationales": rationales, "max_tokens": max_tokens}
+    if metadata is not None and blocks:
+        metadata["peer_review"] = {
+            "mode": "sharded",
+            "block_size": max(len(block) for block in blocks.values()),
+            "pair_coverage": min_pair_coverage(list(blocks.values()), len(labels)),
+            "responses": len(labels),
+        }
+
+    def format_result(model: str, response: Dict[str, Any]) -> Dict[str, Any]:
+        shown = shown_labels[model]
+        full_text = response.get('content', '')
+        if model in STRUCTURED_RANKING_MODELS:
+            full_text = structured_to_text(full_text, shown)
+        result = {
+            "model": model,
+            "ranking": full_text,
+            "parsed_ranking": parse_ranking(full_text, shown)
+        }
+        if blocks:
+            result["reviewed"] = shown
+        return _flag_origin(result, response)
 
     # Get rankings from all active council models in parallel
-    responses = await query_models_parallel(active_models, messages)
+    responses, dropped = await collect_with_policy(
+        active_models,
+        [],
+        policy,
+        on_delta=on_delta,
+        on_response=(lambda m, r: on_result(m, format_result(m, r))) if on_result else None,
+        overrides=overrides
+    )
+    _record_dropped(metadata, "stage2", dropped)
 
     # Format results
-    stage2_results = []
-    for model, response in responses.items():
-        if response is not None:
-            full_text = response.get('content', '')
-            parsed = parse_ranking_from_text(full_text)
-            stage2_results.append({
-                "model": model,
-                "ranking": full_text,
-                "parsed_ranking": parsed
-            })
+    stage2_results = [format_result(model, response) for model, response in responses.items()]
 
     return stage2_results, label_to_model
 
@@ -135,32 +548,93 @@ async def stage3_synthesize_final(
     user_query: str,
     stage1_results: List[Dict[str, Any]],
     stage2_results: List[Dict[str, Any]],
-    chairman_model: str
+    chairman_model: str,
+    on_delta: Optional[DeltaCallback] = None,
+    budget_policy: Optional[Dict[str, Any]] = None,
+    aggregate_rankings: Optional[List[Dict[str, Any]]] = None,
+    metadata: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Stage 3: Chairman synthesizes final response.
 
+    If the prompt would not fit the chairman's context window, responses and
+    evaluations are cut down by the budget policy; the top-ranked responses
+    are the ones it keeps whole, and the FINAL RANKING section of each
+    evaluation is always kept.
+
     Args:
         user_query: The original user query
         stage1_results: Individual model responses from Stage 1
         stage2_results: Rankings from Stage 2
         chairman_model: Model identifier for the chairman
+        on_delta: Optional callback receiving (model, delta) as the synthesis streams
+        budget_policy: Optional prompt budget policy (DEFAULT_BUDGET_POLICY if None)
+        aggregate_rankings: Optional aggregate rankings, best first
+        metadata: Optional dict that receives the prompt budget under
+            'prompt_budget'
 
     Returns:
         Dict with 'model' and 'response' keys
     """
+    # Evaluations may be cut; the ranking at their end is kept as it is
+    evaluations, final_rankings = zip(*[
+        _split_final_ranking(result['ranking']) for result in stage2_results
+    ]) if stage2_results else ((), ())
+
+    def build(texts: List[str]) -> str:
+        responses, evaluations = texts[:len(stage1_results)], texts[len(stage1_results):]
+        return _stage3_prompt(user_query, stage1_results, responses, stage2_results, evaluations, final_rankings)
+
+    position = {entry["model"]: i for i, entry in enumerate(aggregate_rankings or [])}
+    order = sorted(
+        (i for i, result in enumerate(stage1_results) if result["model"] in position),
+        key=lambda i: position[stage1_results[i]["model"]]
+    )
+    chairman_prompt, report = budget.fit_prompt(
+        build,
+        [result['response'] for result in stage1_results] + list(evaluations),
+        [result['model'] for result in stage1_results] + [f"{result['model']} (ranking)" for result in stage2_results],
+        chairman_model,
+        budget_policy or DEFAULT_BUDGET_POLICY,
+        order,
+        user_query
+    )
+    if metadata is not None:
+        metadata.setdefault("prompt_budget", {})["stage3"] = {"model": chairman_model, **report}
+
+    return await _chairman_answer(chairman_model, chairman_prompt, on_delta)
+
+
+def _split_final_ranking(ranking: str) -> Tuple[str, str]:
+    """Split a stage 2 answer into its evaluation and its FINAL RANKING section (with the space before it)."""
+    index = ranking.rfind("FINAL RANKING:")
+    if index < 0:
+        return ranking, ""
+    index = len(ranking[:index].rstrip())
+    return ranking[:index], ranking[index:]
+
+
+def _stage3_prompt(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    responses: List[str],
+    stage2_results: List[Dict[str, Any]],
+    evaluations: List[str],
+    final_rankings: List[str]
+) -> str:
+    """Chairman prompt with the given (possibly cut) response and evaluation texts."""
     # Build comprehensive context for chairman
     stage1_text = "\n\n".join([
-        f"Model: {result['model']}\nResponse: {result['response']}"
-        for result in stage1_results
+        f"Model: {_model_label(result)}\nResponse: {response}"
+        for result, response in zip(stage1_results, responses)
     ])
 
     stage2_text = "\n\n".join([
-        f"Model: {result['model']}\nRanking: {result['ranking']}"
-        for result in stage2_results
+        f"Model: {_model_label(result)}\nRanking: {evaluation}{final_ranking}"
+        for result, evaluation, final_ranking in zip(stage2_results, evaluations, final_rankings)
     ])
 
-    chairman_prompt = f"""You are the Chairman of an LLM Council. Multiple AI models have provided responses to a user's question, and then ranked each other's responses.
+    return f"""You are the Chairman of an LLM Council. Multiple AI models have provided responses to a user's question, and then ranked each other's responses.
 
 Original Question: {user_query}
 
@@ -177,103 +651,386 @@ Your task as Chairman is to synthesize all of this information into a single, co
 
 Provide a clear, well-reasoned final answer that represents the council's collective wisdom:"""
 
-    messages = [{"role": "user", "content": chairman_prompt}]
+
+async def _chairman_answer(
+    chairman_model: str,
+    prompt: str,
+    on_delta: Optional[DeltaCallback] = None
+) -> Dict[str, Any]:
+    """Query a chairman with a synthesis prompt, falling back to an error message."""
+    messages = [{"role": "user", "content": prompt}]
 
     # Query the chairman model
-    response = await query_model(chairman_model, messages)
+    response = await query_model(
+        chairman_model,
+        messages,
+        on_delta=(lambda delta: on_delta(chairman_model, delta)) if on_delta else None
+    )
 
     if response is None:
         # Fallback if chairman fails
         return {
             "model": chairman_model,
-            "response": "Error: Unable to generate final synthesis."
+            "response": SYNTHESIS_ERROR
         }
 
-    return {
+    return _flag_origin({
         "model": chairman_model,
         "response": response.get('content', '')
-    }
+    }, response)
 
 
-def parse_ranking_from_text(ranking_text: str) -> List[str]:
+def parse_ranking_from_text(
+    ranking_text: str,
+    labels: Optional[List[str]] = None
+) -> List[str]:
     """
     Parse the FINAL RANKING section from the model's response.
 
     Args:
         ranking_text: The full text response from the model
+        labels: Optional labels that were shown; others are ignored
 
     Returns:
-        List of response labels in ranked order
+        List of response labels in ranked order (see ranking.extract_ranking)
     """
-    import re
-
-    # Look for "FINAL RANKING:" section
-    if "FINAL RANKING:" in ranking_text:
-        # Extract everything after "FINAL RANKING:"
-        parts = ranking_text.split("FINAL RANKING:")
-        if len(parts) >= 2:
-            ranking_section = parts[1]
-            # Try to extract numbered list format (e.g., "1. Response A")
-            # This pattern looks for: number, period, optional space, "Response X"
-            numbered_matches = re.findall(r'\d+\.\s*Response [A-Z]', ranking_section)
-            if numbered_matches:
-                # Extract just the "Response X" part
-                return [re.search(r'Response [A-Z]', m).group() for m in numbered_matches]
-
-            # Fallback: Extract all "Response X" patterns in order
-            matches = re.findall(r'Response [A-Z]', ranking_section)
-            return matches
-
-    # Fallback: try to find any "Response X" patterns in order
-    matches = re.findall(r'Response [A-Z]', ranking_text)
-    return matches
+    return parse_ranking(ranking_text, labels)
 
 
 def calculate_aggregate_rankings(
     stage2_results: List[Dict[str, Any]],
-    label_to_model: Dict[str, str]
+    label_to_model: Dict[str, str],
+    method: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None
 ) -> List[Dict[str, Any]]:
     """
     Calculate aggregate rankings across all models.
 
     Args:
-        stage2_results: Rankings from each model
+        stage2_results: Rankings from each model (with 'reviewed' labels
+            for sharded review)
         label_to_model: Mapping from anonymous labels to model names
+        method: One of aggregation.METHODS (default DEFAULT_AGGREGATION_METHOD)
+        metadata: Optional dict that receives agreement stats under 'ranking_agreement'
 
     Returns:
-        List of dicts with model name and average rank, sorted best to worst
+        List of dicts with model name, rank, score, average rank, vote count
+        and agreement, sorted best to worst
     """
-    from collections import defaultdict
+    labels = list(label_to_model)
+    rankings = []
+    scopes = []
+    for ranking in stage2_results:
+        # Sharded reviewers only saw (and only ranked) their block
+        reviewed = ranking.get('reviewed')
+        # Reuse the ranking parsed when the result came in
+        parsed_ranking = ranking.get('parsed_ranking')
+        if parsed_ranking is None:
+            parsed_ranking = parse_ranking(ranking['ranking'], reviewed or labels)
+        rankings.append([label_to_model[label] for label in parsed_ranking if label in label_to_model])
+        scopes.append([label_to_model[label] for label in reviewed if label in label_to_model] if reviewed else None)
+
+    entries, stats = aggregation.aggregate(
+        rankings, list(label_to_model.values()), method or DEFAULT_AGGREGATION_METHOD,
+        scopes if any(scope is not None for scope in scopes) else None
+    )
+    if metadata is not None:
+        metadata["ranking_agreement"] = stats
+    return entries
 
-    # Track positions for each model
-    model_positions = defaultdict(list)
 
-    for ranking in stage2_results:
-        ranking_text = ranking['ranking']
+async def run_sub_council(
+    user_query: str,
+    members: List[str],
+    label_offset: int = 0,
+    policy: Optional[Dict[str, Any]] = None,
+    review_policy: Optional[Dict[str, Any]] = None,
+    aggregation_method: Optional[str] = None,
+    sub_chairman: Optional[str] = None,
+    on_delta: Optional[Dict[str, DeltaCallback]] = None,
+    on_result: Optional[Dict[str, ResultCallback]] = None,
+    ranking_policy: Optional[Dict[str, Any]] = None,
+    budget_policy: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run stages 1 and 2 and a sub-chairman synthesis for one sub-council.
+
+    Args:
+        user_query: The user's question
+        members: Sub-council members
+        label_offset: Labels used by earlier sub-councils
+        policy: Optional stage policy (quorum / soft deadline)
+        review_policy: Optional stage 2 review policy
+        aggregation_method: Optional rank aggregation method
+        sub_chairman: Model that synthesizes the sub-council's answers
+            (None = its top-ranked member)
+        on_delta: Optional callbacks keyed by stage ("stage1", "stage2")
+            receiving (model, delta)
+        on_result: Optional callbacks keyed by stage receiving (model, result)
+        ranking_policy: Optional stage 2 answer style
+        budget_policy: Optional prompt budget policy
+
+    Returns:
+        Dict with 'members', 'stage1', 'stage2', 'label_to_model',
+        'aggregate_rankings', 'sub_chairman', 'synthesis' (None if no member
+        answered) and 'metadata'
+    """
+    on_delta = on_delta or {}
+    on_result = on_result or {}
+    metadata: Dict[str, Any] = {}
+
+    stage1_results = await stage1_collect_responses(
+        user_query, members, on_delta.get("stage1"), policy, on_result.get("stage1"), metadata
+    )
+    stage2_results, label_to_model = await stage2_collect_rankings(
+        user_query, stage1_results, members, on_delta.get("stage2"), policy,
+        on_result.get("stage2"), metadata, review_policy, label_offset, ranking_policy,
+        budget_policy
+    )
+    aggregate_rankings = calculate_aggregate_rankings(
+        stage2_results, label_to_model, aggregation_method
+    ) if stage2_results else []
 
-        # Parse the ranking from the structured format
-        parsed_ranking = parse_ranking_from_text(ranking_text)
+    synthesis = None
+    if len(stage1_results) == 1:
+        # A lone answer stands for its sub-council as it is
+        sub_chairman = stage1_results[0]["model"]
+        synthesis = stage1_results[0]["response"]
+    elif stage1_results:
+        if not sub_chairman:
+            sub_chairman = aggregate_rankings[0]["model"] if aggregate_rankings else stage1_results[0]["model"]
+        result = await stage3_synthesize_final(
+            user_query, stage1_results, stage2_results, sub_chairman,
+            budget_policy=budget_policy, aggregate_rankings=aggregate_rankings, metadata=metadata
+        )
+        if result["response"] != SYNTHESIS_ERROR:
+            synthesis = result["response"]
+        elif aggregate_rankings:
+            # Sub-chairman failed: pass on the top-ranked answer instead
+            top = aggregate_rankings[0]["model"]
+            synthesis = next(r["response"] for r in stage1_results if r["model"] == top)
 
-        for position, label in enumerate(parsed_ranking, start=1):
-            if label in label_to_model:
-                model_name = label_to_model[label]
-                model_positions[model_name].append(position)
+    return {
+        "members": members,
+        "stage1": stage1_results,
+        "stage2": stage2_results,
+        "label_to_model": label_to_model,
+        "aggregate_rankings": aggregate_rankings,
+        "sub_chairman": sub_chairman,
+        "synthesis": synthesis,
+        "metadata": metadata,
+    }
 
-    # Calculate average position for each model
-    aggregate = []
-    for model, positions in model_positions.items():
-        if positions:
-            avg_rank = sum(positions) / len(positions)
-            aggregate.append({
-                "model": model,
-                "average_rank": round(avg_rank, 2),
-                "rankings_count": len(positions)
-            })
 
-    # Sort by average rank (lower is better)
-    aggregate.sort(key=lambda x: x['average_rank'])
+async def run_sub_councils(
+    user_query: str,
+    groups: List[List[str]],
+    policy: Optional[Dict[str, Any]] = None,
+    review_policy: Optional[Dict[str, Any]] = None,
+    aggregation_method: Optional[str] = None,
+    hierarchy_policy: Optional[Dict[str, Any]] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    on_delta: Optional[Dict[str, DeltaCallback]] = None,
+    on_result: Optional[Dict[str, ResultCallback]] = None,
+    ranking_policy: Optional[Dict[str, Any]] = None,
+    budget_policy: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, str], List[Dict[str, Any]]]:
+    """
+    Stages 1 and 2 of a hierarchical council: run every sub-council in parallel.
 
-    return aggregate
+    Each sub-council goes on to its own synthesis as soon as its rankings
+    are in, without waiting for the others. Results are merged into one
+    council: stage 1 and 2 results carry their 'sub_council' index, labels
+    are distinct across sub-councils, and each ranking's 'reviewed' labels
+    keep the aggregate from comparing answers across sub-councils directly
+    (an answer's overall place reflects its standing within its own
+    sub-council).
+
+    Args:
+        user_query: The user's question
+        groups: Members of each sub-council (see plan_sub_councils)
+        policy: Optional stage policy (quorum / soft deadline)
+        review_policy: Optional stage 2 review policy within each sub-council
+        aggregation_method: Optional rank aggregation method
+        hierarchy_policy: Optional hierarchy policy (for 'sub_chairman')
+        metadata: Optional dict that receives dropped members, the
+            sub-councils under 'sub_councils' (each with its synthesis
+            prompt budget), stage 2 prompt budgets and agreement stats
+        on_delta: Optional callbacks keyed by stage receiving (model, delta)
+        on_result: Optional callbacks keyed by stage receiving (model, result)
+        ranking_policy: Optional stage 2 answer style
+        budget_policy: Optional prompt budget policy
+
+    Returns:
+        Tuple of (stage1_results, stage2_results, label_to_model,
+        aggregate_rankings)
+    """
+    offsets = [sum(len(group) for group in groups[:i]) for i in range(len(groups))]
+    sub_councils = await asyncio.gather(*[
+        run_sub_council(
+            user_query, group, offset, policy, review_policy, aggregation_method,
+            (hierarchy_policy or {}).get("sub_chairman"), on_delta, on_result, ranking_policy,
+            budget_policy
+        )
+        for group, offset in zip(groups, offsets)
+    ])
+
+    stage1_results: List[Dict[str, Any]] = []
+    stage2_results: List[Dict[str, Any]] = []
+    label_to_model: Dict[str, str] = {}
+    summaries = []
+    for index, sub in enumerate(sub_councils):
+        stage1_results.extend({**result, "sub_council": index} for result in sub["stage1"])
+        stage2_results.extend(
+            {"reviewed": list(sub["label_to_model"]), **result, "sub_council": index}
+            for result in sub["stage2"]
+        )
+        label_to_model.update(sub["label_to_model"])
+        summary = {
+            "members": sub["members"],
+            "sub_chairman": sub["sub_chairman"],
+            "synthesis": sub["synthesis"],
+            "aggregate_rankings": sub["aggregate_rankings"],
+        }
+        if "peer_review" in sub["metadata"]:
+            summary["peer_review"] = sub["metadata"]["peer_review"]
+        sub_budget = sub["metadata"].get("prompt_budget", {})
+        if "stage3" in sub_budget:
+            summary["prompt_budget"] = sub_budget["stage3"]
+        summaries.append(summary)
+        if metadata is not None:
+            for stage, dropped in sub["metadata"].get("dropped_members", {}).items():
+                metadata.setdefault("dropped_members", {}).setdefault(stage, []).extend(dropped)
+            if "ranking_output" in sub["metadata"]:
+                metadata["ranking_output"] = sub["metadata"]["ranking_output"]
+            if "stage2" in sub_budget:
+                metadata.setdefault("prompt_budget", {}).setdefault("stage2", {}).update(sub_budget["stage2"])
+
+    aggregate_rankings = calculate_aggregate_rankings(
+        stage2_results, label_to_model, aggregation_method, metadata
+    )
+    if metadata is not None:
+        metadata["sub_councils"] = summaries
+    return stage1_results, stage2_results, label_to_model, aggregate_rankings
+
+
+async def synthesize_sub_councils(
+    user_query: str,
+    sub_councils: List[Dict[str, Any]],
+    chairman_model: str,
+    on_delta: Optional[DeltaCallback] = None,
+    budget_policy: Optional[Dict[str, Any]] = None,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Stage 3 of a hierarchical council: the chairman synthesizes the sub-council syntheses.
+
+    Syntheses are cut down alike if the prompt would not fit the chairman's
+    context window.
+
+    Args:
+        user_query: The original user query
+        sub_councils: metadata['sub_councils'] from run_sub_councils
+        chairman_model: Model identifier for the chairman
+        on_delta: Optional callback receiving (model, delta) as the synthesis streams
+        budget_policy: Optional prompt budget policy (DEFAULT_BUDGET_POLICY if None)
+        metadata: Optional dict that receives the prompt budget under
+            'prompt_budget'
+
+    Returns:
+        Dict with 'model' and 'response' keys
+    """
+    numbered = [
+        (number, sub) for number, sub in enumerate(sub_councils, start=1)
+        if sub.get("synthesis")
+    ]
+
+    def build(syntheses: List[str]) -> str:
+        syntheses_text = "\n\n".join([
+            f"Sub-council {number} (members: {', '.join(sub['members'])})\nSynthesis: {synthesis}"
+            for (number, sub), synthesis in zip(numbered, syntheses)
+        ])
+
+        return f"""You are the Chairman of an LLM Council. The council was split into sub-councils. In each, several AI models answered a user's question and ranked each other's answers, and a sub-chairman synthesized them into one answer.
+
+Original Question: {user_query}
+
+SUB-COUNCIL SYNTHESES:
+{syntheses_text}
+
+Your task as Chairman is to combine these syntheses into a single, comprehensive, accurate answer to the user's original question. Consider:
+- The insights each sub-council contributed
+- Where the sub-councils agree, and which is more convincing where they disagree
+
+Provide a clear, well-reasoned final answer that represents the council's collective wisdom:"""
+
+    chairman_prompt, report = budget.fit_prompt(
+        build,
+        [sub["synthesis"] for _, sub in numbered],
+        [f"Sub-council {number}" for number, _ in numbered],
+        chairman_model,
+        budget_policy or DEFAULT_BUDGET_POLICY,
+        query=user_query
+    )
+    if metadata is not None:
+        metadata.setdefault("prompt_budget", {})["stage3"] = {"model": chairman_model, **report}
+
+    return await _chairman_answer(chairman_model, chairman_prompt, on_delta)
+
+
+async def conclude_sub_councils(
+    user_query: str,
+    stage1_results: List[Dict[str, Any]],
+    aggregate_rankings: List[Dict[str, Any]],
+    chairman_model: Optional[str],
+    metadata: Dict[str, Any],
+    on_delta: Optional[DeltaCallback] = None,
+    budget_policy: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Final answer of a hierarchical council, after run_sub_councils.
+
+    The chairman combines the sub-council syntheses. Without a chairman, or
+    without any synthesis to combine, the top-ranked answer's sub-council
+    synthesis (or else the first answer) is the final answer.
+
+    Args:
+        user_query: The original user query
+        stage1_results: Merged stage 1 results from run_sub_councils
+        aggregate_rankings: Aggregate rankings from run_sub_councils
+        chairman_model: Model identifier for the chairman (None or empty for none)
+        metadata: Run metadata holding 'sub_councils'
+        on_delta: Optional callback receiving (model, delta) as the synthesis streams
+        budget_policy: Optional prompt budget policy
+
+    Returns:
+        Dict with 'model' and 'response' keys ('model' is "error" if no
+        member answered)
+    """
+    if not stage1_results:
+        return {
+            "model": "error",
+            "response": "All models failed to respond. Please try again."
+        }
+
+    sub_councils = metadata.get("sub_councils", [])
+    if chairman_model and chairman_model.strip() and any(sub["synthesis"] for sub in sub_councils):
+        return await synthesize_sub_councils(
+            user_query, sub_councils, chairman_model, on_delta,
+            budget_policy=budget_policy, metadata=metadata
+        )
+
+    top_model = aggregate_rankings[0]["model"] if aggregate_rankings else stage1_results[0]["model"]
+    top = next((
+        sub for sub in sub_councils
+        if top_model in sub["members"] and sub["synthesis"]
+    ), None)
+    if top:
+        return {"model": top["sub_chairman"], "response": top["synthesis"]}
+    return {
+        "model": stage1_results[0]["model"],
+        "response": stage1_results[0]["response"]
+    }
 
 
 async def generate_conversation_title(user_query: str) -> str:
@@ -314,18 +1071,112 @@ Title:"""
     return title
 
 
-async def run_full_council(
+async def find_near_duplicate(
     user_query: str,
     council_models: List[str],
     chairman_model: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Look up a previous council run for a near-identical query.
+
+    Args:
+        user_query: The user's question
+        council_models: Council member identifiers
+        chairman_model: Chairman identifier
+
+    Returns:
+        Match dict with 'query', 'similarity', 'created_at' and 'result'
+        (stage1/stage2/stage3/metadata), or None
+    """
+    if not NEAR_DUPLICATE_ENABLED or cache_bypass.get():
+        return None
+    key = near_duplicate.config_key(council_models, chairman_model)
+    return await run_blocking(near_duplicate.get_index().lookup, user_query, key)
+
+
+def near_duplicate_info(match: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe a near-duplicate match for message metadata."""
+    return {
+        "query": match["query"],
+        "similarity": match["similarity"],
+        "created_at": match["created_at"],
+    }
+
+
+def reuse_near_duplicate(match: Dict[str, Any]) -> Tuple[List, List, Dict, Dict]:
+    """
+    Unpack a matched previous run as a council result.
+
+    Args:
+        match: Match dict from find_near_duplicate
+
+    Returns:
+        Tuple of (stage1_results, stage2_results, stage3_result, metadata),
+        with metadata['near_duplicate'] describing the match
+    """
+    result = match["result"]
+    metadata = {**result["metadata"], "near_duplicate": near_duplicate_info(match)}
+    return result["stage1"], result["stage2"], result["stage3"], metadata
+
+
+async def remember_council_result(
+    user_query: str,
+    council_models: List[str],
+    chairman_model: str,
+    stage1_results: List[Dict[str, Any]],
+    stage2_results: List[Dict[str, Any]],
+    stage3_result: Dict[str, Any],
+    metadata: Dict[str, Any]
+):
+    """
+    Index a completed council run for near-duplicate reuse.
+
+    Failed runs (no stage 1 answers, or no synthesis) and runs that were
+    themselves reused are not indexed.
+    """
+    if not NEAR_DUPLICATE_ENABLED or stage3_result.get("model") == "error":
+        return
+    if not stage1_results or stage3_result.get("response") == SYNTHESIS_ERROR:
+        return
+    if "near_duplicate" in metadata and NEAR_DUPLICATE_MODE == "return":
+        return
+    key = near_duplicate.config_key(council_models, chairman_model)
+    metadata = {k: v for k, v in metadata.items() if k != "near_duplicate"}
+    result = {
+        "stage1": stage1_results,
+        "stage2": stage2_results,
+        "stage3": stage3_result,
+        "metadata": metadata,
+    }
+    await run_blocking(near_duplicate.get_index().add, user_query, key, result)
+
+
+async def run_full_council(
+    user_query: str,
+    council_models: List[str],
+    chairman_model: str,
+    stage_policy: Optional[Dict[str, Any]] = None,
+    aggregation_method: Optional[str] = None,
+    review_policy: Optional[Dict[str, Any]] = None,
+    hierarchy_policy: Optional[Dict[str, Any]] = None,
+    ranking_policy: Optional[Dict[str, Any]] = None,
+    budget_policy: Optional[Dict[str, Any]] = None
 ) -> Tuple[List, List, Dict, Dict]:
     """
     Run the complete 3-stage council process.
 
     Args:
         user_query: The user's question
-        council_models: List of model identifiers for council members (0-4 models)
+        council_models: List of model identifiers for council members
         chairman_model: Model identifier for the chairman
+        stage_policy: Optional quorum / soft deadline policy for stages 1 and 2
+        aggregation_method: Optional rank aggregation method (see aggregation.METHODS)
+        review_policy: Optional stage 2 review policy (see resolve_review_policy)
+        hierarchy_policy: Optional policy for splitting large councils into
+            sub-councils (see resolve_hierarchy_policy)
+        ranking_policy: Optional stage 2 answer style (see resolve_ranking_policy)
+        budget_policy: Optional prompt token budget policy for stage 2 and 3
+            prompts (see resolve_budget_policy)
 
     Returns:
         Tuple of (stage1_results, stage2_results, stage3_result, metadata)
@@ -341,8 +1192,43 @@ async def run_full_council(
             "response": "No models selected. Please configure at least one model in the Model Settings."
         }, {}
     
+    metadata: Dict[str, Any] = {}
+
+    # Reuse (or offer) a previous run for a near-identical question
+    duplicate = await find_near_duplicate(user_query, active_council_models, active_chairman)
+    if duplicate is not None:
+        if NEAR_DUPLICATE_MODE == "return":
+            return reuse_near_duplicate(duplicate)
+        metadata["near_duplicate"] = {
+            **near_duplicate_info(duplicate),
+            "stage3": duplicate["result"]["stage3"],
+        }
+
+    # Large councils run as parallel sub-councils, each with its own synthesis
+    groups = plan_sub_councils(active_council_models, hierarchy_policy)
+    if groups:
+        stage1_results, stage2_results, label_to_model, aggregate_rankings = await run_sub_councils(
+            user_query, groups, stage_policy, review_policy, aggregation_method,
+            hierarchy_policy, metadata, ranking_policy=ranking_policy,
+            budget_policy=budget_policy
+        )
+        stage3_result = await conclude_sub_councils(
+            user_query, stage1_results, aggregate_rankings, active_chairman, metadata,
+            budget_policy=budget_policy
+        )
+
+        metadata["label_to_model"] = label_to_model
+        metadata["aggregate_rankings"] = aggregate_rankings
+        await remember_council_result(
+            user_query, active_council_models, active_chairman,
+            stage1_results, stage2_results, stage3_result, metadata
+        )
+        return stage1_results, stage2_results, stage3_result, metadata
+
     # Stage 1: Collect individual responses
-    stage1_results = await stage1_collect_responses(user_query, active_council_models)
+    stage1_results = await stage1_collect_responses(
+        user_query, active_council_models, policy=stage_policy, metadata=metadata
+    )
 
     # If no models responded successfully, return error
     if not stage1_results:
@@ -354,12 +1240,12 @@ async def run_full_council(
                 return [], [], {
                     "model": active_chairman,
                     "response": response.get('content', '')
-                }, {}
+                }, metadata
         
         return [], [], {
             "model": "error",
             "response": "All models failed to respond. Please try again."
-        }, {}
+        }, metadata
 
     # If only one model responded, skip ranking and go straight to synthesis
     if len(stage1_results) == 1:
@@ -368,24 +1254,30 @@ async def run_full_council(
             return stage1_results, [], {
                 "model": stage1_results[0]["model"],
                 "response": stage1_results[0]["response"]
-            }, {}
+            }, metadata
         
         # Otherwise, let chairman synthesize based on single response
         stage3_result = await stage3_synthesize_final(
             user_query,
             stage1_results,
             [],
-            active_chairman
+            active_chairman,
+            budget_policy=budget_policy,
+            metadata=metadata
         )
-        return stage1_results, [], stage3_result, {}
+        return stage1_results, [], stage3_result, metadata
 
     # Stage 2: Collect rankings (only if we have multiple responses)
     stage2_results, label_to_model = await stage2_collect_rankings(
-        user_query, stage1_results, active_council_models
+        user_query, stage1_results, active_council_models,
+        policy=stage_policy, metadata=metadata, review_policy=review_policy,
+        ranking_policy=ranking_policy, budget_policy=budget_policy
     )
 
     # Calculate aggregate rankings
-    aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
+    aggregate_rankings = calculate_aggregate_rankings(
+        stage2_results, label_to_model, aggregation_method, metadata
+    )
 
     # Stage 3: Synthesize final answer
     if active_chairman:
@@ -393,7 +1285,10 @@ async def run_full_council(
             user_query,
             stage1_results,
             stage2_results,
-            active_chairman
+            active_chairman,
+            budget_policy=budget_policy,
+            aggregate_rankings=aggregate_rankings,
+            metadata=metadata
         )
     else:
         # If no chairman, use the top-ranked response as final answer
@@ -419,9 +1314,12 @@ async def run_full_council(
             }
 
     # Prepare metadata
-    metadata = {
-        "label_to_model": label_to_model,
-        "aggregate_rankings": aggregate_rankings
-    }
+    metadata["label_to_model"] = label_to_model
+    metadata["aggregate_rankings"] = aggregate_rankings
+
+    await remember_council_result(
+        user_query, active_council_models, active_chairman,
+        stage1_results, stage2_results, stage3_result, metadata
+    )
 
     return stage1_results, stage2_results, stage3_result, metadata
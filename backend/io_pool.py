@@ -0,0 +1,114 @@
+"""Bounded thread pool for blocking disk I/O, with wait-time metrics."""
+
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable, TypeVar
+
+from .config import STORAGE_IO_THREADS
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Updated from worker threads
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "in_flight": 0,
+    "max_in_flight": 0,
+    "total_wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+    "total_run_seconds": 0.0,
+    "max_run_seconds": 0.0,
+}
+_per_operation: Dict[str, Dict[str, float]] = defaultdict(
+    lambda: {"calls": 0, "total_run_seconds": 0.0, "max_run_seconds": 0.0}
+)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=STORAGE_IO_THREADS, thread_name_prefix="storage-io")
+    return _executor
+
+
+def shutdown():
+    """Wait for queued I/O to finish and stop the worker threads."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a blocking function on the I/O pool without blocking the event loop.
+
+    A call keeps running if the awaiting task is cancelled, so a client
+    disconnecting never leaves a write half-done.
+
+    Args:
+        func: Blocking callable (e.g. a storage function)
+        *args: Positional arguments for func
+
+    Returns:
+        Whatever func returns (its exceptions are re-raised)
+    """
+    submitted = time.monotonic()
+    name = getattr(func, "__qualname__", repr(func))
+
+    def call():
+        started = time.monotonic()
+        try:
+            return func(*args)
+        finally:
+            finished = time.monotonic()
+            waited, ran = started - submitted, finished - started
+            with _stats_lock:
+                _stats["total_wait_seconds"] += waited
+                _stats["max_wait_seconds"] = max(_stats["max_wait_seconds"], waited)
+                _stats["total_run_seconds"] += ran
+                _stats["max_run_seconds"] = max(_stats["max_run_seconds"], ran)
+                op = _per_operation[name]
+                op["calls"] += 1
+                op["total_run_seconds"] += ran
+                op["max_run_seconds"] = max(op["max_run_seconds"], ran)
+
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["in_flight"] += 1
+        _stats["max_in_flight"] = max(_stats["max_in_flight"], _stats["in_flight"])
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), call)
+    finally:
+        with _stats_lock:
+            _stats["in_flight"] -= 1
+
+
+def get_io_stats() -> Dict[str, Any]:
+    """
+    Get I/O pool counters.
+
+    Returns:
+        Dict with call counts, time spent queued for a thread ('wait') and
+        running ('run'), plus per-operation run times
+    """
+    with _stats_lock:
+        calls = _stats["calls"]
+        return {
+            "threads": STORAGE_IO_THREADS,
+            **{k: round(v, 4) if isinstance(v, float) else v for k, v in _stats.items()},
+            "avg_wait_seconds": round(_stats["total_wait_seconds"] / calls, 4) if calls else 0.0,
+            "operations": {
+                name: {
+                    "calls": op["calls"],
+                    "avg_run_seconds": round(op["total_run_seconds"] / op["calls"], 4),
+                    "max_run_seconds": round(op["max_run_seconds"], 4),
+                }
+                for name, op in _per_operation.items()
+            },
+        }
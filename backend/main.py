@@ -1,20 +1,41 @@
 """FastAPI backend for LLM Council."""
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Path, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
-from typing import List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import List, Dict, Any, Literal, Optional
+from contextlib import asynccontextmanager
 import uuid
-import json
 import asyncio
+import hashlib
 
 from . import storage
 from . import preset_storage
-from .council import run_full_council, generate_conversation_title, stage1_collect_responses, stage2_collect_rankings, stage3_synthesize_final, calculate_aggregate_rankings
-from .config import AVAILABLE_MODELS, MODEL_PRESETS
-
-app = FastAPI(title="LLM Council API")
+from . import openrouter
+from . import resilience
+from . import scheduler
+from . import cache
+from . import io_pool
+from . import serialization
+from . import aggregation
+from . import budget
+from .io_pool import run_blocking
+from .council import run_full_council, generate_conversation_title, stage1_collect_responses, stage2_collect_rankings, stage3_synthesize_final, calculate_aggregate_rankings, resolve_stage_policy, resolve_aggregation_method, resolve_review_policy, resolve_hierarchy_policy, resolve_ranking_policy, resolve_budget_policy, plan_sub_councils, run_sub_councils, conclude_sub_councils, find_near_duplicate, near_duplicate_info, reuse_near_duplicate, remember_council_result
+from .config import AVAILABLE_MODELS, MODEL_PRESETS, NEAR_DUPLICATE_MODE
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the shared upstream HTTP client and storage I/O pool for the lifetime of the app."""
+    await run_blocking(storage.prepare)
+    await openrouter.start_client()
+    yield
+    await openrouter.close_client()
+    io_pool.shutdown()
+
+
+app = FastAPI(title="LLM Council API", lifespan=lifespan)
 
 # Enable CORS for local development
 app.add_middleware(
@@ -23,9 +44,57 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
+def sse_event(event: Dict[str, Any]) -> bytes:
+    """Encode an event dict as a Server-Sent Events data frame."""
+    return serialization.sse_frame(event)
+
+
+# Frames without a payload, encoded once
+STATIC_FRAMES = {
+    event_type: sse_event({'type': event_type})
+    for event_type in ('stage1_start', 'stage2_start', 'stage3_start', 'complete')
+}
+
+
+def content_etag(data: Any) -> str:
+    """Build a strong ETag from a JSON-serializable response body."""
+    encoded = serialization.dumps_bytes(data, sort_keys=True)
+    return f'"{hashlib.blake2b(encoded, digest_size=12).hexdigest()}"'
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Headers letting clients cache a response but revalidate it on every use."""
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    Answer a conditional GET whose If-None-Match already names the current ETag.
+
+    Args:
+        request: Incoming request
+        etag: Current ETag of the resource
+
+    Returns:
+        A 304 response, or None if the client needs the full body
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = {tag.strip() for tag in header.split(",")}
+    if "*" in tags or etag in tags or f"W/{etag}" in tags:
+        return Response(status_code=304, headers=cache_headers(etag))
+    return None
+
+
+# The model list only changes on restart
+MODELS_ETAG = content_etag(AVAILABLE_MODELS)
+
+
 class CreateConversationRequest(BaseModel):
     """Request to create a new conversation."""
     pass
@@ -34,12 +103,63 @@ class CreateConversationRequest(BaseModel):
 class SendMessageRequest(BaseModel):
     """Request to send a message in a conversation."""
     content: str
+    bypass_cache: bool = False
 
 
 class UpdateModelsRequest(BaseModel):
     """Request to update conversation models."""
     council_models: List[str]
     chairman_model: str
+    preset_id: Optional[str] = None
+
+
+class PresetPolicy(BaseModel):
+    """A preset's overrides of one policy; unknown keys and mistyped values are rejected."""
+    model_config = ConfigDict(extra="forbid", strict=True)
+
+
+class StagePolicy(PresetPolicy):
+    """Overrides of DEFAULT_STAGE_POLICY."""
+    quorum: Optional[int] = Field(None, ge=1)
+    soft_deadline: Optional[float] = Field(None, gt=0)
+
+
+class ReviewPolicy(PresetPolicy):
+    """Overrides of DEFAULT_REVIEW_POLICY."""
+    sharded: bool = False
+    pair_coverage: int = Field(2, ge=1)
+    block_size: Optional[int] = Field(None, ge=2)
+    min_responses: int = Field(6, ge=0)
+
+
+class HierarchyPolicy(PresetPolicy):
+    """Overrides of DEFAULT_HIERARCHY_POLICY."""
+    enabled: bool = False
+    group_size: int = Field(5, ge=2)
+    min_members: int = Field(9, ge=0)
+    sub_chairman: Optional[str] = None
+
+
+class RankingPolicy(PresetPolicy):
+    """Overrides of DEFAULT_RANKING_POLICY."""
+    mode: Literal["full", "fast"] = "full"
+    rationales: bool = True
+    max_tokens: Optional[int] = Field(None, ge=1)
+
+
+class BudgetPolicy(PresetPolicy):
+    """Overrides of DEFAULT_BUDGET_POLICY."""
+    policy: str = "keep_top"
+    keep_top: int = Field(2, ge=0)
+    reserve_output_tokens: int = Field(8192, ge=0)
+    max_prompt_tokens: Optional[int] = Field(None, ge=1)
+
+    @field_validator("policy")
+    @classmethod
+    def known_policy(cls, policy: str) -> str:
+        if policy not in budget.POLICIES:
+            raise ValueError(f"budget policy must be one of {', '.join(budget.POLICIES)}")
+        return policy
 
 
 class SavePresetRequest(BaseModel):
@@ -48,12 +168,19 @@ class SavePresetRequest(BaseModel):
     description: str
     council_models: List[str]
     chairman_model: str
+    stage_policy: Optional[StagePolicy] = None
+    aggregation: Optional[str] = None
+    review_policy: Optional[ReviewPolicy] = None
+    hierarchy: Optional[HierarchyPolicy] = None
+    ranking: Optional[RankingPolicy] = None
+    budget: Optional[BudgetPolicy] = None
 
 
 class ConversationMetadata(BaseModel):
     """Conversation metadata for list view."""
     id: str
     created_at: str
+    updated_at: Optional[str] = None
     title: str
     message_count: int
 
@@ -72,50 +199,170 @@ async def root():
     return {"status": "ok", "service": "LLM Council API"}
 
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """Get runtime metrics for upstream calls."""
+    return {
+        "http_pool": openrouter.get_pool_stats(),
+        "hedging": openrouter.get_hedge_stats(),
+        "singleflight": openrouter.get_singleflight_stats(),
+        **resilience.get_resilience_stats(),
+        "scheduler": scheduler.get_scheduler_stats(),
+        "cache": cache.get_cache_stats(),
+        "storage_io": io_pool.get_io_stats(),
+        "storage_locks": storage.get_lock_stats(),
+    }
+
+
 @app.get("/api/conversations", response_model=List[ConversationMetadata])
-async def list_conversations():
-    """List all conversations (metadata only)."""
-    return storage.list_conversations()
+async def list_conversations(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    order: str = "desc"
+):
+    """
+    List conversations (metadata only).
+
+    Without `limit` every conversation is returned. With it, one page is
+    returned and the cursor for the next page (if any) is sent in the
+    X-Next-Cursor header; pass it back as `cursor` with the same sort.
+    Supports If-None-Match.
+    """
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
+    try:
+        page = await run_blocking(storage.list_conversations_page, limit, cursor, sort, order == "desc")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    etag = content_etag(page)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers.update(cache_headers(etag))
+    if page["next_cursor"]:
+        response.headers["X-Next-Cursor"] = page["next_cursor"]
+    return page["conversations"]
 
 
 @app.post("/api/conversations", response_model=Conversation)
 async def create_conversation(request: CreateConversationRequest):
     """Create a new conversation."""
     conversation_id = str(uuid.uuid4())
-    conversation = storage.create_conversation(conversation_id)
+    conversation = await run_blocking(storage.create_conversation, conversation_id)
     return conversation
 
 
 @app.get("/api/conversations/{conversation_id}", response_model=Conversation)
-async def get_conversation(conversation_id: str):
-    """Get a specific conversation with all its messages."""
-    conversation = storage.get_conversation(conversation_id)
+async def get_conversation(conversation_id: str, request: Request, response: Response):
+    """
+    Get a specific conversation with all its messages.
+
+    The ETag is the conversation's version, so a matching If-None-Match is
+    answered from the header alone, without reading any messages.
+    """
+    if request.headers.get("if-none-match"):
+        header = await run_blocking(storage.get_conversation_header, conversation_id)
+        if header is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        cached = not_modified(request, f'"{storage.conversation_version(header)}"')
+        if cached:
+            return cached
+
+    conversation = await run_blocking(storage.get_conversation, conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
+    response.headers.update(cache_headers(f'"{storage.conversation_version(conversation)}"'))
     return conversation
 
 
+@app.get("/api/conversations/{conversation_id}/changes")
+async def get_conversation_changes(conversation_id: str, since: str):
+    """
+    Get what changed in a conversation after version `since`.
+
+    Versions come from the ETag of GET /api/conversations/{id} (without
+    quotes) or from a previous call's 'version'. Only messages added since
+    are returned, plus the title/model fields if any of them were updated.
+    """
+    try:
+        changes = await run_blocking(storage.get_changes, conversation_id, since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if changes is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return changes
+
+
+@app.get("/api/conversations/{conversation_id}/messages")
+async def list_messages(
+    conversation_id: str,
+    limit: Optional[int] = Query(20, ge=1, le=200),
+    cursor: Optional[int] = Query(None, ge=0)
+):
+    """
+    Get a page of a conversation's messages, newest first.
+
+    Assistant messages carry stage 3 and per-model stage 1/2 summaries;
+    the full texts are loaded per message from the stage1/stage2
+    endpoints. Pass `next_cursor` back as `cursor` for older messages.
+    """
+    page = await run_blocking(storage.get_message_page, conversation_id, limit, cursor)
+    if page is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return page
+
+
+async def get_stage_details(conversation_id: str, index: int, stage: str) -> Dict[str, Any]:
+    """Load one stage's full results for a message, or raise a 404."""
+    message = await run_blocking(storage.get_message, conversation_id, index)
+    if message is None:
+        raise HTTPException(status_code=404, detail="Message not found")
+    if message["role"] != "assistant":
+        raise HTTPException(status_code=404, detail=f"Message {index} has no {stage} results")
+    return {"index": index, stage: message.get(stage) or []}
+
+
+@app.get("/api/conversations/{conversation_id}/messages/{index}/stage1")
+async def get_stage1_details(conversation_id: str, index: int = Path(..., ge=0)):
+    """Get the full stage 1 responses of one assistant message."""
+    return await get_stage_details(conversation_id, index, "stage1")
+
+
+@app.get("/api/conversations/{conversation_id}/messages/{index}/stage2")
+async def get_stage2_details(conversation_id: str, index: int = Path(..., ge=0)):
+    """Get the full stage 2 evaluations of one assistant message."""
+    return await get_stage_details(conversation_id, index, "stage2")
+
+
 @app.delete("/api/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """Delete a specific conversation."""
     try:
-        storage.delete_conversation(conversation_id)
+        await storage.run_locked(storage.delete_conversation, conversation_id)
         return {"success": True}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
 @app.get("/api/models")
-async def get_available_models():
+async def get_available_models(request: Request, response: Response):
     """Get list of available models."""
+    cached = not_modified(request, MODELS_ETAG)
+    if cached:
+        return cached
+    response.headers.update(cache_headers(MODELS_ETAG))
     return {"models": AVAILABLE_MODELS}
 
 
 @app.get("/api/presets")
-async def get_presets():
+async def get_presets(request: Request, response: Response):
     """Get available model presets (built-in + custom)."""
     # Combine built-in and custom presets
-    custom_presets = preset_storage.get_custom_presets()
+    custom_presets = await run_blocking(preset_storage.get_custom_presets)
     all_presets = {
         **MODEL_PRESETS,
         **custom_presets
@@ -129,7 +376,13 @@ async def get_presets():
             "is_custom": key in custom_presets
         }
     
-    return {"presets": presets_with_metadata}
+    body = {"presets": presets_with_metadata}
+    etag = content_etag(body)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    response.headers.update(cache_headers(etag))
+    return body
 
 
 @app.post("/api/presets")
@@ -146,8 +399,21 @@ async def save_custom_preset(request: SavePresetRequest):
         "council_models": request.council_models,
         "chairman_model": request.chairman_model
     }
+    if request.aggregation:
+        if request.aggregation not in aggregation.METHODS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"aggregation must be one of {', '.join(aggregation.METHODS)}"
+            )
+        preset_data["aggregation"] = request.aggregation
+    # Policies were type- and range-checked by the request model; only the
+    # keys the client set are stored, so the rest keep following the defaults
+    for key in ("stage_policy", "review_policy", "hierarchy", "ranking", "budget"):
+        policy = getattr(request, key)
+        if policy is not None and policy.model_fields_set:
+            preset_data[key] = policy.model_dump(exclude_unset=True)
     
-    preset_storage.save_custom_preset(preset_id, preset_data)
+    await run_blocking(preset_storage.save_custom_preset, preset_id, preset_data)
     
     return {"success": True, "preset_id": preset_id}
 
@@ -159,7 +425,7 @@ async def delete_custom_preset(preset_id: str):
     if not preset_id.startswith("custom_"):
         raise HTTPException(status_code=400, detail="Cannot delete built-in presets")
     
-    preset_storage.delete_custom_preset(preset_id)
+    await run_blocking(preset_storage.delete_custom_preset, preset_id)
     
     return {"success": True}
 
@@ -168,7 +434,7 @@ async def delete_custom_preset(preset_id: str):
 async def get_conversation_models(conversation_id: str):
     """Get the model configuration for a conversation."""
     try:
-        models = storage.get_conversation_models(conversation_id)
+        models = await run_blocking(storage.get_conversation_models, conversation_id)
         return models
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -181,10 +447,12 @@ async def update_conversation_models(
 ):
     """Update the model configuration for a conversation."""
     try:
-        storage.update_conversation_models(
+        await storage.run_locked(
+            storage.update_conversation_models,
             conversation_id,
             request.council_models,
-            request.chairman_model
+            request.chairman_model,
+            request.preset_id
         )
         return {"success": True}
     except ValueError as e:
@@ -197,41 +465,55 @@ async def send_message(conversation_id: str, request: SendMessageRequest):
     Send a message and run the 3-stage council process.
     Returns the complete response with all stages.
     """
-    # Check if conversation exists
-    conversation = storage.get_conversation(conversation_id)
-    if conversation is None:
+    # Load the conversation once; this turn's changes are committed together
+    session = storage.open_session(conversation_id)
+    if await session.load() is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    # Check if this is the first message
-    is_first_message = len(conversation["messages"]) == 0
-
-    # Add user message
-    storage.add_user_message(conversation_id, request.content)
-
-    # If this is the first message, generate a title
-    if is_first_message:
-        title = await generate_conversation_title(request.content)
-        storage.update_conversation_title(conversation_id, title)
-
-    # Get conversation-specific models
-    models_config = storage.get_conversation_models(conversation_id)
-    council_models = models_config["council_models"]
-    chairman_model = models_config["chairman_model"]
-
-    # Run the 3-stage council process
-    stage1_results, stage2_results, stage3_result, metadata = await run_full_council(
-        request.content,
-        council_models,
-        chairman_model
-    )
+    # Upstream calls made for this request queue fairly per conversation
+    scheduler.current_conversation.set(conversation_id)
+    cache.cache_bypass.set(request.bypass_cache)
 
-    # Add assistant message with all stages
-    storage.add_assistant_message(
-        conversation_id,
-        stage1_results,
-        stage2_results,
-        stage3_result
-    )
+    try:
+        # Add user message
+        is_first_message = session.is_first_message
+        session.add_user_message(request.content)
+
+        # If this is the first message, generate a title
+        if is_first_message:
+            title = await generate_conversation_title(request.content)
+            session.update_title(title)
+
+        # Get conversation-specific models
+        models_config = session.models
+        council_models = models_config["council_models"]
+        chairman_model = models_config["chairman_model"]
+        preset = await run_blocking(preset_storage.get_preset, models_config["preset_id"])
+        stage_policy = resolve_stage_policy(preset)
+        session.checkpoint()
+
+        # Run the 3-stage council process
+        stage1_results, stage2_results, stage3_result, metadata = await run_full_council(
+            request.content,
+            council_models,
+            chairman_model,
+            stage_policy,
+            resolve_aggregation_method(preset),
+            resolve_review_policy(preset),
+            resolve_hierarchy_policy(preset),
+            resolve_ranking_policy(preset),
+            resolve_budget_policy(preset)
+        )
+
+        # Add assistant message with all stages
+        session.add_assistant_message(
+            stage1_results,
+            stage2_results,
+            stage3_result,
+            metadata
+        )
+    finally:
+        await session.close()
 
     # Return the complete response with metadata
     return {
@@ -246,20 +528,25 @@ async def send_message(conversation_id: str, request: SendMessageRequest):
 async def send_message_stream(conversation_id: str, request: SendMessageRequest):
     """
     Send a message and stream the 3-stage council process.
-    Returns Server-Sent Events as each stage completes.
+    Returns Server-Sent Events with token deltas as models generate
+    (stage1_delta, stage2_delta, stage3_delta), as each member finishes
+    (stage1_model_complete, stage2_model_complete) and as each stage completes.
     """
-    # Check if conversation exists
-    conversation = storage.get_conversation(conversation_id)
-    if conversation is None:
+    # Load the conversation once; this turn's changes are committed together
+    session = storage.open_session(conversation_id)
+    if await session.load() is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Check if this is the first message
-    is_first_message = len(conversation["messages"]) == 0
+    is_first_message = session.is_first_message
 
     async def event_generator():
+        # Upstream calls made for this request queue fairly per conversation
+        scheduler.current_conversation.set(conversation_id)
+        cache.cache_bypass.set(request.bypass_cache)
         try:
             # Add user message
-            storage.add_user_message(conversation_id, request.content)
+            session.add_user_message(request.content)
 
             # Start title generation in parallel (don't await yet)
             title_task = None
@@ -267,50 +554,177 @@ async def send_message_stream(conversation_id: str, request: SendMessageRequest)
                 title_task = asyncio.create_task(generate_conversation_title(request.content))
 
             # Get conversation-specific models
-            models_config = storage.get_conversation_models(conversation_id)
+            models_config = session.models
             council_models = models_config["council_models"]
             chairman_model = models_config["chairman_model"]
-
-            # Stage 1: Collect responses
-            yield f"data: {json.dumps({'type': 'stage1_start'})}\n\n"
-            stage1_results = await stage1_collect_responses(request.content, council_models)
-            yield f"data: {json.dumps({'type': 'stage1_complete', 'data': stage1_results})}\n\n"
-
-            # Stage 2: Collect rankings
-            yield f"data: {json.dumps({'type': 'stage2_start'})}\n\n"
-            stage2_results, label_to_model = await stage2_collect_rankings(
-                request.content, stage1_results, council_models
-            )
-            aggregate_rankings = calculate_aggregate_rankings(stage2_results, label_to_model)
-            yield f"data: {json.dumps({'type': 'stage2_complete', 'data': stage2_results, 'metadata': {'label_to_model': label_to_model, 'aggregate_rankings': aggregate_rankings}})}\n\n"
-
-            # Stage 3: Synthesize final answer
-            yield f"data: {json.dumps({'type': 'stage3_start'})}\n\n"
-            stage3_result = await stage3_synthesize_final(
-                request.content, stage1_results, stage2_results, chairman_model
-            )
-            yield f"data: {json.dumps({'type': 'stage3_complete', 'data': stage3_result})}\n\n"
+            preset = await run_blocking(preset_storage.get_preset, models_config["preset_id"])
+            stage_policy = resolve_stage_policy(preset)
+            budget_policy = resolve_budget_policy(preset)
+            metadata: Dict[str, Any] = {}
+            session.checkpoint()
+
+            # Reuse (or offer) a previous run for a near-identical question
+            duplicate = await find_near_duplicate(request.content, council_models, chairman_model)
+            if duplicate is not None and NEAR_DUPLICATE_MODE == "return":
+                stage1_results, stage2_results, stage3_result, metadata = reuse_near_duplicate(duplicate)
+                yield sse_event({'type': 'stage1_complete', 'data': stage1_results, 'metadata': metadata})
+                yield sse_event({'type': 'stage2_complete', 'data': stage2_results, 'metadata': metadata})
+                yield sse_event({'type': 'stage3_complete', 'data': stage3_result})
+            else:
+                if duplicate is not None:
+                    metadata['near_duplicate'] = {
+                        **near_duplicate_info(duplicate),
+                        'stage3': duplicate['result']['stage3'],
+                    }
+                    yield sse_event({'type': 'near_duplicate', 'data': metadata['near_duplicate']})
+
+                hierarchy_policy = resolve_hierarchy_policy(preset)
+                groups = plan_sub_councils(
+                    [m for m in council_models if m and m.strip()], hierarchy_policy
+                )
+                if groups:
+                    # Sub-councils run stages 1 and 2 (and their syntheses) side by side
+                    yield STATIC_FRAMES['stage1_start']
+                    yield STATIC_FRAMES['stage2_start']
+                    sub_task = asyncio.create_task(run_sub_councils(
+                        request.content, groups, stage_policy, resolve_review_policy(preset),
+                        resolve_aggregation_method(preset), hierarchy_policy, metadata,
+                        on_delta={
+                            'stage1': queue_delta('stage1_delta'),
+                            'stage2': queue_delta('stage2_delta'),
+                        },
+                        on_result={
+                            'stage1': queue_result('stage1_model_complete'),
+                            'stage2': queue_result('stage2_model_complete'),
+                        },
+                        ranking_policy=resolve_ranking_policy(preset),
+                        budget_policy=budget_policy
+                    ))
+                    async for frame in drain_events(sub_task):
+                        yield frame
+                    stage1_results, stage2_results, label_to_model, aggregate_rankings = sub_task.result()
+                    metadata['label_to_model'] = label_to_model
+                    metadata['aggregate_rankings'] = aggregate_rankings
+                    yield sse_event({'type': 'stage1_complete', 'data': stage1_results, 'metadata': metadata})
+                    yield sse_event({'type': 'stage2_complete', 'data': stage2_results, 'metadata': metadata})
+
+                    # Stage 3: The chairman synthesizes the sub-council syntheses
+                    yield STATIC_FRAMES['stage3_start']
+                    stage3_task = asyncio.create_task(conclude_sub_councils(
+                        request.content, stage1_results, aggregate_rankings, chairman_model,
+                        metadata,
+                        on_delta=queue_delta('stage3_delta'),
+                        budget_policy=budget_policy
+                    ))
+                else:
+                    # Stage 1: Collect responses, streaming each model's tokens
+                    yield STATIC_FRAMES['stage1_start']
+                    stage1_task = asyncio.create_task(stage1_collect_responses(
+                        request.content, council_models,
+                        on_delta=queue_delta('stage1_delta'),
+                        policy=stage_policy,
+                        on_result=queue_result('stage1_model_complete'),
+                        metadata=metadata
+                    ))
+                    async for frame in drain_events(stage1_task):
+                        yield frame
+                    stage1_results = stage1_task.result()
+                    yield sse_event({'type': 'stage1_complete', 'data': stage1_results, 'metadata': metadata})
+
+                    # Stage 2: Collect rankings
+                    yield STATIC_FRAMES['stage2_start']
+                    stage2_task = asyncio.create_task(stage2_collect_rankings(
+                        request.content, stage1_results, council_models,
+                        on_delta=queue_delta('stage2_delta'),
+                        policy=stage_policy,
+                        on_result=queue_result('stage2_model_complete'),
+                        metadata=metadata,
+                        review_policy=resolve_review_policy(preset),
+                        ranking_policy=resolve_ranking_policy(preset),
+                        budget_policy=budget_policy
+                    ))
+                    async for frame in drain_events(stage2_task):
+                        yield frame
+                    stage2_results, label_to_model = stage2_task.result()
+                    aggregate_rankings = calculate_aggregate_rankings(
+                        stage2_results, label_to_model, resolve_aggregation_method(preset), metadata
+                    )
+                    metadata['label_to_model'] = label_to_model
+                    metadata['aggregate_rankings'] = aggregate_rankings
+                    yield sse_event({'type': 'stage2_complete', 'data': stage2_results, 'metadata': metadata})
+
+                    # Stage 3: Synthesize final answer
+                    yield STATIC_FRAMES['stage3_start']
+                    stage3_task = asyncio.create_task(stage3_synthesize_final(
+                        request.content, stage1_results, stage2_results, chairman_model,
+                        on_delta=queue_delta('stage3_delta'),
+                        budget_policy=budget_policy,
+                        aggregate_rankings=aggregate_rankings,
+                        metadata=metadata
+                    ))
+                async for frame in drain_events(stage3_task):
+                    yield frame
+                stage3_result = stage3_task.result()
+                yield sse_event({'type': 'stage3_complete', 'data': stage3_result})
+
+                await remember_council_result(
+                    request.content, council_models, chairman_model,
+                    stage1_results, stage2_results, stage3_result, metadata
+                )
 
             # Wait for title generation if it was started
+            title = None
             if title_task:
                 title = await title_task
-                storage.update_conversation_title(conversation_id, title)
-                yield f"data: {json.dumps({'type': 'title_complete', 'data': {'title': title}})}\n\n"
+                session.update_title(title)
 
-            # Save complete assistant message
-            storage.add_assistant_message(
-                conversation_id,
+            # Save the user message, title and assistant message in one commit
+            session.add_assistant_message(
                 stage1_results,
                 stage2_results,
-                stage3_result
+                stage3_result,
+                metadata
             )
+            await session.close()
+
+            if title is not None:
+                yield sse_event({'type': 'title_complete', 'data': {'title': title}})
 
             # Send completion event
-            yield f"data: {json.dumps({'type': 'complete'})}\n\n"
+            yield STATIC_FRAMES['complete']
 
         except Exception as e:
             # Send error event
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield sse_event({'type': 'error', 'message': str(e)})
+        finally:
+            # Keep whatever the turn got to (at least the user message)
+            await session.close()
+
+    # Token deltas from concurrently streaming models are funneled through one queue
+    events: asyncio.Queue = asyncio.Queue()
+
+    def queue_delta(event_type: str):
+        """Build an on_delta callback that queues `event_type` SSE frames."""
+        def on_delta(model: str, delta: str):
+            events.put_nowait(sse_event({'type': event_type, 'model': model, 'delta': delta}))
+        return on_delta
+
+    def queue_result(event_type: str):
+        """Build an on_result callback that queues per-model completion frames."""
+        def on_result(model: str, result: Dict[str, Any]):
+            events.put_nowait(sse_event({'type': event_type, 'model': model, 'data': result}))
+        return on_result
+
+    async def drain_events(stage_task: asyncio.Task):
+        """Yield queued delta frames until the stage task finishes."""
+        stage_task.add_done_callback(lambda _: events.put_nowait(None))
+        try:
+            while (frame := await events.get()) is not None:
+                yield frame
+        finally:
+            # Client went away mid-stage: stop the upstream calls too
+            if not stage_task.done():
+                stage_task.cancel()
 
     return StreamingResponse(
         event_generator(),
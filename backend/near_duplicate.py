@@ -0,0 +1,256 @@
+"""Near-duplicate query lookup using MinHash signatures and a local LSH index."""
+
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from .config import (
+    NEAR_DUPLICATE_DB_PATH,
+    NEAR_DUPLICATE_THRESHOLD,
+    NEAR_DUPLICATE_BANDS,
+    NEAR_DUPLICATE_ROWS,
+)
+from . import serialization
+
+NUM_PERMUTATIONS = NEAR_DUPLICATE_BANDS * NEAR_DUPLICATE_ROWS
+
+# Mersenne prime larger than any 32-bit shingle hash
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Fixed seed: signatures are persisted, so the permutations must never change
+_rng = random.Random(1)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+# Function words carry no meaning for "is this the same question". Question
+# words and negations do ("why ..." vs "how ...", "... not ..."), so they are
+# kept; that includes the "t" of "don't" / "can't".
+STOPWORDS = frozenset("""
+a about an and are as at be been but by can could do does did for from had has
+have i if in into is it its me my of on or please s should so tell than that
+the their them then there these this those to was we were will with would you
+your
+""".split())
+
+# Question words: kept for matching questions, but not content for other uses
+QUESTION_WORDS = frozenset("how what when where which who why".split())
+
+# Candidates compared in full per lookup; bounds latency on hot buckets
+MAX_CANDIDATES = 200
+
+
+def normalize(text: str) -> List[str]:
+    """
+    Reduce a query to its content words.
+
+    Lowercases, drops punctuation and stopwords, so trivial rewordings
+    ("What is X?" / "what's x") normalize to the same tokens.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        List of content-word tokens in order
+    """
+    words = _NON_WORD.sub(" ", text.lower()).split()
+    return [w for w in words if w not in STOPWORDS]
+
+
+def shingles(text: str) -> set:
+    """
+    Hash the word unigrams and bigrams of a query's content words.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        Set of 32-bit shingle hashes
+    """
+    words = normalize(text) or text.lower().split() or [""]
+    grams = set(words)
+    grams.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return {zlib.crc32(gram.encode("utf-8")) for gram in grams}
+
+
+def signature(text: str) -> List[int]:
+    """
+    Compute the MinHash signature of a query.
+
+    Args:
+        text: Raw query text
+
+    Returns:
+        List of NUM_PERMUTATIONS 32-bit min-hash values
+    """
+    hashes = shingles(text)
+    return [
+        min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimate Jaccard similarity from two signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def _band_buckets(sig: List[int], config_key: str) -> List[tuple]:
+    """LSH bucket per band, salted with the council configuration."""
+    salt = config_key.encode("utf-8")
+    buckets = []
+    for band in range(NEAR_DUPLICATE_BANDS):
+        rows = sig[band * NEAR_DUPLICATE_ROWS:(band + 1) * NEAR_DUPLICATE_ROWS]
+        bucket = zlib.crc32(array("I", rows).tobytes(), zlib.crc32(salt))
+        buckets.append((band, bucket))
+    return buckets
+
+
+def config_key(council_models: List[str], chairman_model: Optional[str]) -> str:
+    """
+    Identify a council configuration; results are only reused within one.
+
+    Args:
+        council_models: Council member identifiers
+        chairman_model: Chairman identifier
+
+    Returns:
+        Canonical string for the configuration
+    """
+    members = sorted(m for m in council_models if m and m.strip())
+    return json.dumps({"council": members, "chairman": chairman_model or ""}, sort_keys=True)
+
+
+class NearDuplicateIndex:
+    """SQLite-backed LSH index of past queries and their council results."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY,
+                    config_key TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    signature BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    result TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS buckets (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    entry_id INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_buckets ON buckets(band, bucket);
+                """
+            )
+        return self.conn
+
+    def add(self, query: str, key: str, result: Dict[str, Any]):
+        """
+        Index a query and its full council result.
+
+        Args:
+            query: User query text
+            key: Council configuration key from config_key
+            result: JSON-serializable council result
+        """
+        sig = signature(query)
+        with self.lock:
+            conn = self._connect()
+            cursor = conn.execute(
+                "INSERT INTO entries (config_key, query, signature, created_at, result) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, query, array("I", sig).tobytes(), time.time(), serialization.dumps(result))
+            )
+            conn.executemany(
+                "INSERT INTO buckets (band, bucket, entry_id) VALUES (?, ?, ?)",
+                [(band, bucket, cursor.lastrowid) for band, bucket in _band_buckets(sig, key)]
+            )
+            conn.commit()
+
+    def lookup(
+        self,
+        query: str,
+        key: str,
+        threshold: float = NEAR_DUPLICATE_THRESHOLD
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar indexed query with the same configuration.
+
+        Args:
+            query: User query text
+            key: Council configuration key from config_key
+            threshold: Minimum estimated Jaccard similarity
+
+        Returns:
+            Dict with 'query', 'similarity', 'created_at' and 'result', or None
+        """
+        sig = signature(query)
+        buckets = _band_buckets(sig, key)
+        # One indexed probe per band; entries sharing more bands are more similar
+        probes = " UNION ALL ".join(
+            "SELECT entry_id FROM buckets WHERE band = ? AND bucket = ?" for _ in buckets
+        )
+        params = [value for pair in buckets for value in pair]
+
+        with self.lock:
+            conn = self._connect()
+            rows = conn.execute(
+                f"SELECT e.id, e.signature FROM ("
+                f"SELECT entry_id, COUNT(*) AS hits FROM ({probes}) "
+                f"GROUP BY entry_id ORDER BY hits DESC LIMIT ?) AS c "
+                f"JOIN entries AS e ON e.id = c.entry_id WHERE e.config_key = ?",
+                [*params, MAX_CANDIDATES, key]
+            ).fetchall()
+
+            best_id, best_score = None, threshold
+            for entry_id, blob in rows:
+                score = similarity(sig, array("I", blob).tolist())
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+            if best_id is None:
+                return None
+
+            matched_query, created_at, result = conn.execute(
+                "SELECT query, created_at, result FROM entries WHERE id = ?",
+                (best_id,)
+            ).fetchone()
+
+        return {
+            "query": matched_query,
+            "similarity": round(best_score, 3),
+            "created_at": created_at,
+            "result": serialization.loads(result),
+        }
+
+
+_index: Optional[NearDuplicateIndex] = None
+
+
+def get_index() -> NearDuplicateIndex:
+    """Get the process-wide near-duplicate index."""
+    global _index
+    if _index is None:
+        _index = NearDuplicateIndex(NEAR_DUPLICATE_DB_PATH)
+    return _index
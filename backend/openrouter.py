@@ -1,61 +1,781 @@
 """OpenRouter API client for making LLM requests."""
 
+import asyncio
+import time
 import httpx
-from typing import List, Dict, Any, Optional
-from .config import OPENROUTER_API_KEY, OPENROUTER_API_URL
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Callable, AsyncIterator
+from .config import (
+    OPENROUTER_API_KEY,
+    OPENROUTER_API_URL,
+    AVAILABLE_MODELS,
+    HTTP2_ENABLED,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONCURRENT_REQUESTS,
+    HTTP_POOL_TIMEOUT,
+    HTTP_PREWARM_CONNECTIONS,
+    HEDGING_ENABLED,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_HISTORY_SIZE,
+    HEDGE_DEFAULT_DELAY,
+    HEDGE_MIN_DELAY,
+    HEDGE_FALLBACK_MODELS,
+    RETRY_MAX_ATTEMPTS,
+)
+from . import cache
+from . import serialization
+from .scheduler import upstream_slot
+from .resilience import (
+    UpstreamError,
+    classify_error,
+    backoff_delay,
+    get_breaker,
+    record_retry,
+    record_gave_up,
+)
 
+# Process-wide client, owned by the FastAPI lifespan (see main.py)
+_client: Optional[httpx.AsyncClient] = None
 
-async def query_model(
+# Bounds in-flight requests so pool pressure shows up as queue wait
+_request_slots: Optional[asyncio.Semaphore] = None
+
+_pool_stats = {
+    "requests": 0,
+    "in_flight": 0,
+    "waiting": 0,
+    "max_waiting": 0,
+    "total_wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+    "pool_timeouts": 0,
+}
+
+# Recent time-to-first-byte samples (seconds) per model, used for hedge delays
+_first_byte_latency: Dict[str, deque] = defaultdict(lambda: deque(maxlen=HEDGE_HISTORY_SIZE))
+
+_hedge_stats: Dict[str, Dict[str, int]] = defaultdict(
+    lambda: {"requests": 0, "hedges_fired": 0, "hedges_won": 0}
+)
+
+_singleflight_stats = {"flights": 0, "coalesced": 0, "abandoned": 0}
+
+
+def _http2_available() -> bool:
+    """Check whether the optional HTTP/2 dependency is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _create_client() -> httpx.AsyncClient:
+    """Build the pooled client from the configured limits."""
+    http2 = HTTP2_ENABLED and _http2_available()
+    if HTTP2_ENABLED and not http2:
+        print("HTTP2_ENABLED is set but 'h2' is not installed; falling back to HTTP/1.1")
+
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        timeout=httpx.Timeout(120.0, pool=HTTP_POOL_TIMEOUT),
+        headers={"Authorization": f"Bearer {OPENROUTER_API_KEY}"},
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared HTTP client, creating it lazily if the app did not start it.
+
+    Returns:
+        The process-wide httpx.AsyncClient
+    """
+    global _client, _request_slots
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    if _request_slots is None:
+        _request_slots = asyncio.Semaphore(HTTP_MAX_CONCURRENT_REQUESTS)
+    return _client
+
+
+async def start_client():
+    """Create the shared client and prewarm connections to OpenRouter."""
+    get_client()
+    if HTTP_PREWARM_CONNECTIONS > 0:
+        await prewarm_connections(HTTP_PREWARM_CONNECTIONS)
+
+
+async def close_client():
+    """Close the shared client and release its pooled connections."""
+    global _client, _request_slots
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _request_slots = None
+
+
+async def prewarm_connections(count: int, timeout: float = 5.0):
+    """
+    Open connections to OpenRouter ahead of the first council run.
+
+    Concurrent HEAD requests force separate TCP/TLS handshakes; the
+    connections are then kept alive in the pool. Failures are ignored.
+
+    Args:
+        count: Number of connections to open
+        timeout: Per-request timeout in seconds
+    """
+    client = get_client()
+    results = await asyncio.gather(
+        *[client.head(OPENROUTER_API_URL, timeout=timeout) for _ in range(count)],
+        return_exceptions=True
+    )
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        print(f"Prewarmed {count - len(failures)}/{count} connections: {failures[0]}")
+
+
+@asynccontextmanager
+async def _request_slot():
+    """Acquire an in-flight request slot, recording how long we queued."""
+    get_client()
+    start = time.monotonic()
+    if _request_slots.locked():
+        _pool_stats["waiting"] += 1
+        _pool_stats["max_waiting"] = max(_pool_stats["max_waiting"], _pool_stats["waiting"])
+        try:
+            await _request_slots.acquire()
+        finally:
+            _pool_stats["waiting"] -= 1
+    else:
+        await _request_slots.acquire()
+
+    waited = time.monotonic() - start
+    _pool_stats["requests"] += 1
+    _pool_stats["total_wait_seconds"] += waited
+    _pool_stats["max_wait_seconds"] = max(_pool_stats["max_wait_seconds"], waited)
+    _pool_stats["in_flight"] += 1
+    try:
+        yield
+    finally:
+        _pool_stats["in_flight"] -= 1
+        _request_slots.release()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Get connection pool and request queue statistics.
+
+    Returns:
+        Dict with request counts, current queue depth and wait times
+    """
+    stats = dict(_pool_stats)
+    requests = stats["requests"]
+    stats["avg_wait_seconds"] = round(stats["total_wait_seconds"] / requests, 4) if requests else 0.0
+    stats["total_wait_seconds"] = round(stats["total_wait_seconds"], 4)
+    stats["max_wait_seconds"] = round(stats["max_wait_seconds"], 4)
+    stats["max_concurrent_requests"] = HTTP_MAX_CONCURRENT_REQUESTS
+    stats["http2"] = bool(_client is not None and HTTP2_ENABLED and _http2_available())
+    return stats
+
+
+def _parse_completion(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the response dict from a non-streamed completion body."""
+    message = data['choices'][0]['message']
+    return {
+        'content': message.get('content'),
+        'reasoning_details': message.get('reasoning_details')
+    }
+
+
+async def _read_stream(
+    response: httpx.Response,
+    on_delta: Callable[[str], None],
+    on_first_byte: Callable[[], None]
+) -> Dict[str, Any]:
+    """
+    Consume an OpenRouter SSE stream, forwarding content deltas.
+
+    Args:
+        response: Streaming response with `stream: true` completion chunks
+        on_delta: Callback invoked with each content delta
+        on_first_byte: Callback invoked when the first data chunk arrives
+
+    Returns:
+        Response dict in the same shape as a non-streamed completion
+    """
+    content_parts = []
+    reasoning_details = []
+    started = False
+
+    async for line in response.aiter_lines():
+        # Skip blank separators and keep-alive comments (": OPENROUTER PROCESSING")
+        if not line.startswith("data:"):
+            continue
+        if not started:
+            started = True
+            on_first_byte()
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+
+        chunk = serialization.loads(data)
+        if 'error' in chunk:
+            raise RuntimeError(chunk['error'].get('message', chunk['error']))
+        if not chunk.get('choices'):
+            continue
+
+        delta = chunk['choices'][0].get('delta') or {}
+        if delta.get('content'):
+            content_parts.append(delta['content'])
+            on_delta(delta['content'])
+        if delta.get('reasoning_details'):
+            reasoning_details.extend(delta['reasoning_details'])
+
+    return {
+        'content': "".join(content_parts) if content_parts else None,
+        'reasoning_details': reasoning_details or None
+    }
+
+
+async def _read_body(
+    response: httpx.Response,
+    on_first_byte: Callable[[], None]
+) -> Dict[str, Any]:
+    """Read a non-streamed completion body, noting when content starts."""
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        # OpenRouter may pad slow responses with whitespace to keep the connection open
+        if not body.strip() and chunk.strip():
+            on_first_byte()
+        body.extend(chunk)
+    return _parse_completion(serialization.loads(body))
+
+
+async def _send_request(
     model: str,
     messages: List[Dict[str, str]],
-    timeout: float = 120.0
-) -> Optional[Dict[str, Any]]:
+    timeout: float,
+    on_delta: Optional[Callable[[str], None]] = None,
+    on_first_byte: Optional[Callable[[], None]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
     """
-    Query a single model via OpenRouter API.
+    Send one completion request upstream, raising on any failure.
 
     Args:
-        model: OpenRouter model identifier (e.g., "openai/gpt-4o")
+        model: OpenRouter model identifier
         messages: List of message dicts with 'role' and 'content'
-        timeout: Request timeout in seconds
+        timeout: Request timeout in seconds, including time queued for a
+            scheduler slot
+        on_delta: Optional callback for content deltas (enables streaming)
+        on_first_byte: Optional callback invoked when content starts arriving
+        params: Optional extra request body fields (e.g. 'response_format')
 
     Returns:
-        Response dict with 'content' and optional 'reasoning_details', or None if failed
+        Response dict with 'content' and optional 'reasoning_details'
     """
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
     payload = {
+        **(params or {}),
         "model": model,
         "messages": messages,
     }
+    if on_delta is not None:
+        payload["stream"] = True
 
-    try:
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(
-                OPENROUTER_API_URL,
-                headers=headers,
-                json=payload
+    start = time.monotonic()
+
+    def first_byte():
+        _first_byte_latency[model].append(time.monotonic() - start)
+        if on_first_byte:
+            on_first_byte()
+
+    async with upstream_slot(model, messages, timeout), _request_slot():
+        # Queueing for a slot spends part of the call's time budget
+        remaining = timeout - (time.monotonic() - start)
+        if remaining <= 0:
+            raise UpstreamError(
+                model,
+                "queue_timeout",
+                f"no time left after queueing for {timeout:.1f}s",
+                counts_as_failure=False
             )
+        async with get_client().stream(
+            "POST",
+            OPENROUTER_API_URL,
+            json=payload,
+            timeout=httpx.Timeout(remaining, pool=HTTP_POOL_TIMEOUT)
+        ) as response:
             response.raise_for_status()
+            if on_delta is None:
+                return await _read_body(response, first_byte)
+            return await _read_stream(response, on_delta, first_byte)
+
+
+def get_hedge_delay(model: str) -> float:
+    """
+    Get how long to wait for a first byte before hedging a request.
+
+    Args:
+        model: OpenRouter model identifier
+
+    Returns:
+        Delay in seconds: the configured percentile of the model's recent
+        time-to-first-byte, or the default until enough samples exist
+    """
+    samples = _first_byte_latency.get(model)
+    if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(HEDGE_PERCENTILE * len(ordered)))
+    return max(HEDGE_MIN_DELAY, ordered[index])
+
+
+def _hedge_target(model: str) -> str:
+    """Pick the model the hedged duplicate is sent to."""
+    fallback = HEDGE_FALLBACK_MODELS.get(model)
+    if fallback and fallback in AVAILABLE_MODELS:
+        return fallback
+    return model
+
+
+async def _hedged_request(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    on_delta: Optional[Callable[[str], None]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Send a request, duplicating it if no first byte arrives in time.
+
+    The attempt that produces a first byte first wins: the other attempt is
+    cancelled and only the winner's deltas are forwarded. A win by a
+    HEDGE_FALLBACK_MODELS target is marked with 'answered_by'.
+
+    Args:
+        model: OpenRouter model identifier
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Request timeout in seconds
+        on_delta: Optional callback for content deltas (enables streaming)
+        params: Optional extra request body fields
+
+    Returns:
+        Response dict from whichever attempt won, with 'answered_by' set to
+        the fallback model if the hedge went to one and won
+    """
+    stats = _hedge_stats[model]
+    stats["requests"] += 1
+    attempts: Dict[str, asyncio.Task] = {}
+    state = {"winner": None}
+
+    def start_attempt(label: str, target: str) -> asyncio.Task:
+        def on_first_byte():
+            if state["winner"] is None:
+                state["winner"] = label
+                for other, task in attempts.items():
+                    if other != label:
+                        task.cancel()
+
+        def forward(delta: str):
+            if state["winner"] == label:
+                on_delta(delta)
+
+        task = asyncio.create_task(_send_request(
+            target,
+            messages,
+            timeout,
+            on_delta=forward if on_delta else None,
+            on_first_byte=on_first_byte,
+            params=params
+        ))
+        attempts[label] = task
+        return task
+
+    primary = start_attempt("primary", model)
+    try:
+        await asyncio.wait_for(asyncio.shield(primary), timeout=get_hedge_delay(model))
+    except asyncio.TimeoutError:
+        pass
+    except asyncio.CancelledError:
+        # The caller gave up (quorum, soft deadline, no singleflight waiters
+        # left); the shield would otherwise keep the upstream call running
+        primary.cancel()
+        raise
+    except Exception:
+        # The primary failed outright; let the caller see its error
+        pass
+
+    if primary.done() or state["winner"] is not None:
+        return await primary
+
+    stats["hedges_fired"] += 1
+    target = _hedge_target(model)
+    start_attempt("hedge", target)
+
+    error: Optional[BaseException] = None
+    pending = set(attempts.values())
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled():
+                    continue
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                if task is attempts["hedge"]:
+                    stats["hedges_won"] += 1
+                    if target != model:
+                        return {**task.result(), 'answered_by': target}
+                return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
 
-            data = response.json()
-            message = data['choices'][0]['message']
+    raise error or RuntimeError("All hedged attempts were cancelled")
 
-            return {
-                'content': message.get('content'),
-                'reasoning_details': message.get('reasoning_details')
-            }
 
-    except Exception as e:
-        print(f"Error querying model {model}: {e}")
+def get_hedge_stats() -> Dict[str, Any]:
+    """
+    Get how often hedges fired and won, per model and in total.
+
+    Returns:
+        Dict with 'enabled', 'totals' and 'models' (including current hedge delays)
+    """
+    totals = {"requests": 0, "hedges_fired": 0, "hedges_won": 0}
+    models = {}
+    for model, stats in _hedge_stats.items():
+        for key in totals:
+            totals[key] += stats[key]
+        models[model] = {**stats, "hedge_delay_seconds": round(get_hedge_delay(model), 3)}
+    return {"enabled": HEDGING_ENABLED, "totals": totals, "models": models}
+
+
+async def _attempt(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    on_delta: Optional[Callable[[str], None]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Make one (possibly hedged) upstream attempt, raising on failure."""
+    if HEDGING_ENABLED:
+        return await _hedged_request(model, messages, timeout, on_delta, params)
+    return await _send_request(model, messages, timeout, on_delta, params=params)
+
+
+async def _resilient_request(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    on_delta: Optional[Callable[[str], None]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Query a model with bounded retries behind its circuit breaker.
+
+    Transient failures are retried with jittered backoff (honoring
+    Retry-After) while the overall timeout allows. Streamed calls are only
+    retried if no delta has been forwarded yet, so callers never see
+    duplicated text.
+
+    Args:
+        model: OpenRouter model identifier
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Overall time budget in seconds, across retries
+        on_delta: Optional callback for content deltas (enables streaming)
+        params: Optional extra request body fields
+
+    Returns:
+        Response dict with 'content' and optional 'reasoning_details'
+
+    Raises:
+        UpstreamError: Classified final failure (CircuitOpenError when failing fast)
+    """
+    breaker = get_breaker(model)
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    emitted = False
+
+    def forward(delta: str):
+        nonlocal emitted
+        emitted = True
+        on_delta(delta)
+
+    while True:
+        breaker.before_call()
+        try:
+            result = await _attempt(
+                model,
+                messages,
+                max(1.0, deadline - time.monotonic()),
+                on_delta=forward if on_delta else None,
+                params=params
+            )
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as exc:
+            error = classify_error(model, exc)
+            if isinstance(exc, httpx.PoolTimeout):
+                _pool_stats["pool_timeouts"] += 1
+            if error.counts_as_failure:
+                breaker.record_failure()
+            else:
+                breaker.release()
+
+            delay = backoff_delay(attempt, error.retry_after) if error.retryable else None
+            if (
+                delay is None
+                or emitted
+                or attempt >= RETRY_MAX_ATTEMPTS
+                or time.monotonic() + delay >= deadline
+            ):
+                if error.retryable:
+                    record_gave_up()
+                raise error from exc
+
+            record_retry()
+            print(f"Retrying model {model} in {delay:.1f}s after {error.kind}")
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+
+        breaker.record_success()
+        return result
+
+
+class _Flight:
+    """One shared upstream call and the callers waiting on it."""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.streamed = False
+        self.deltas: List[str] = []
+        self.subscribers: List[Callable[[str], None]] = []
+        self.waiters = 0
+
+    def publish(self, delta: str):
+        """Record a delta and forward it to every streaming waiter."""
+        self.deltas.append(delta)
+        for subscriber in list(self.subscribers):
+            subscriber(delta)
+
+
+# In-flight upstream calls keyed by cache.make_key(model, messages, params)
+_flights: Dict[str, _Flight] = {}
+
+
+async def _run_flight(
+    flight: _Flight,
+    key: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    store: bool,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Make the shared upstream call and cache its result once.
+
+    An answer from a hedge fallback model is cached under that model's key,
+    never as `model`'s own answer.
+    """
+    result = await _resilient_request(
+        model,
+        messages,
+        timeout,
+        flight.publish if flight.streamed else None,
+        params
+    )
+    if store and result.get('content'):
+        answered_by = result.get('answered_by')
+        if answered_by:
+            answer = {k: v for k, v in result.items() if k != 'answered_by'}
+            await cache.put(cache.make_key(answered_by, messages, params), answered_by, answer)
+        else:
+            await cache.put(key, model, result)
+    return result
+
+
+async def _singleflight(
+    key: str,
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    on_delta: Optional[Callable[[str], None]],
+    store: bool,
+    params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Join the in-flight call for `key`, or start one.
+
+    The upstream call runs in its own task so a cancelled caller (e.g. a
+    straggler dropped at quorum) doesn't abort it for the others; it is only
+    cancelled once every waiter has gone. Streaming waiters that join late
+    get the deltas received so far replayed before live ones.
+
+    Args:
+        key: Call key from cache.make_key
+        model: OpenRouter model identifier
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Request timeout in seconds (the first caller's applies)
+        on_delta: Optional callback invoked with each content delta
+        store: Whether the result should be written to the response cache
+        params: Optional extra request body fields (part of `key`)
+
+    Returns:
+        Response dict shared by all waiters
+
+    Raises:
+        UpstreamError: The shared call's failure, raised to every waiter
+    """
+    flight = _flights.get(key)
+    if flight is None:
+        flight = _Flight()
+        flight.streamed = on_delta is not None
+        flight.task = asyncio.create_task(_run_flight(
+            flight, key, model, messages, timeout, store, params
+        ))
+        flight.task.add_done_callback(
+            lambda _: _flights.pop(key) if _flights.get(key) is flight else None
+        )
+        _flights[key] = flight
+        _singleflight_stats["flights"] += 1
+    else:
+        _singleflight_stats["coalesced"] += 1
+
+    if on_delta is not None:
+        for delta in flight.deltas:
+            on_delta(delta)
+        flight.subscribers.append(on_delta)
+    flight.waiters += 1
+
+    try:
+        result = await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        if flight.waiters == 1 and not flight.task.done():
+            flight.task.cancel()
+            _singleflight_stats["abandoned"] += 1
+        raise
+    finally:
+        flight.waiters -= 1
+        if on_delta is not None:
+            flight.subscribers.remove(on_delta)
+
+    # Joined a non-streamed call: deliver the answer as a single delta
+    if on_delta is not None and not flight.streamed and result.get('content'):
+        on_delta(result['content'])
+    return result
+
+
+def get_singleflight_stats() -> Dict[str, Any]:
+    """
+    Get request coalescing counters.
+
+    Returns:
+        Dict with upstream 'flights' started, calls 'coalesced' onto an
+        existing flight, flights 'abandoned' by all waiters, and 'in_flight'
+    """
+    return {**_singleflight_stats, "in_flight": len(_flights)}
+
+
+async def query_model(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float = 120.0,
+    on_delta: Optional[Callable[[str], None]] = None,
+    params: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Query a single model via OpenRouter API.
+
+    Args:
+        model: OpenRouter model identifier (e.g., "openai/gpt-4o")
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Request timeout in seconds (shared by retries)
+        on_delta: Optional callback invoked with each content delta; when set,
+            the request is streamed from upstream
+        params: Optional extra request body fields, e.g. 'response_format'
+            for structured output (they are part of the cache key)
+
+    Returns:
+        Response dict with 'content' and optional 'reasoning_details' (plus
+        'cached': True when served from the response cache, and
+        'answered_by' when a hedge fallback model answered instead), or None
+        if failed.
+        Concurrent identical calls share one upstream request and result.
+    """
+    key = cache.make_key(model, messages, params)
+    use_cache = cache.is_active()
+    if use_cache:
+        cached = await cache.get(key)
+        if cached is not None:
+            if on_delta and cached.get('content'):
+                on_delta(cached['content'])
+            return {**cached, 'cached': True}
+
+    # Identical concurrent calls share one upstream request
+    try:
+        result = await _singleflight(
+            key, model, messages, timeout, on_delta, use_cache, params
+        )
+    except UpstreamError as e:
+        print(f"Error querying model {e}")
         return None
 
+    return dict(result)
+
+
+async def query_model_stream(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float = 120.0
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a single model's answer as it is generated.
+
+    Args:
+        model: OpenRouter model identifier
+        messages: List of message dicts with 'role' and 'content'
+        timeout: Request timeout in seconds
+
+    Yields:
+        {'type': 'delta', 'content': str} for each content delta, then a final
+        {'type': 'complete', 'response': dict or None} with the same value
+        query_model would have returned
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    task = asyncio.create_task(query_model(
+        model,
+        messages,
+        timeout,
+        on_delta=lambda delta: queue.put_nowait({'type': 'delta', 'content': delta})
+    ))
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+
+    try:
+        while (event := await queue.get()) is not None:
+            yield event
+        yield {'type': 'complete', 'response': task.result()}
+    finally:
+        task.cancel()
+
 
 async def query_models_parallel(
     models: List[str],
-    messages: List[Dict[str, str]]
+    messages: List[Dict[str, str]],
+    on_delta: Optional[Callable[[str, str], None]] = None
 ) -> Dict[str, Optional[Dict[str, Any]]]:
     """
     Query multiple models in parallel.
@@ -63,17 +783,29 @@ async def query_models_parallel(
     Args:
         models: List of OpenRouter model identifiers
         messages: List of message dicts to send to each model
+        on_delta: Optional callback invoked with (model, delta) while streaming
 
     Returns:
         Dict mapping model identifier to response dict (or None if failed)
     """
-    import asyncio
-
     # Create tasks for all models
-    tasks = [query_model(model, messages) for model in models]
+    tasks = [
+        query_model(model, messages, on_delta=_bind_model(on_delta, model))
+        for model in models
+    ]
 
     # Wait for all to complete
     responses = await asyncio.gather(*tasks)
 
     # Map models to their responses
     return {model: response for model, response in zip(models, responses)}
+
+
+def _bind_model(
+    on_delta: Optional[Callable[[str, str], None]],
+    model: str
+) -> Optional[Callable[[str], None]]:
+    """Adapt a (model, delta) callback to a single model's delta callback."""
+    if on_delta is None:
+        return None
+    return lambda delta: on_delta(model, delta)
@@ -0,0 +1,164 @@
+"""
+Sharded stage 2 review.
+
+With every member reviewing every answer, stage 2 prompt size grows with the
+number of answers and total stage 2 tokens with its square. In sharded
+review each reviewer is shown a block of the answers instead, chosen so that
+every pair of answers is still compared by at least `pair_coverage`
+reviewers and no reviewer is shown its own answer. The resulting rankings
+are partial by design; backend/aggregation.py takes each reviewer's block
+as the scope of its ranking.
+
+When reviewers and answers correspond one to one, blocks are the shifts of
+a difference cover (an offset set D in 1..n-1 whose pairwise differences
+cover every nonzero residue at least `pair_coverage` times), which gives
+every answer the same number of reviews and every pair close to the same
+number of comparisons. Otherwise blocks are built greedily.
+"""
+
+from functools import lru_cache
+from itertools import combinations
+from typing import List, Dict, Any, Optional, Tuple
+
+# Largest offset-set search before falling back to the greedy design
+_MAX_DIFFERENCE_COVER_CANDIDATES = 200000
+
+
+def pair_counts(blocks: List[List[int]], n: int) -> List[List[int]]:
+    """Count, for each pair of answers, the blocks containing both."""
+    counts = [[0] * n for _ in range(n)]
+    for block in blocks:
+        for a, b in combinations(block, 2):
+            counts[a][b] += 1
+            counts[b][a] += 1
+    return counts
+
+
+def min_pair_coverage(blocks: List[List[int]], n: int) -> int:
+    """Fewest blocks any pair of answers appears in together."""
+    if n < 2:
+        return 0
+    counts = pair_counts(blocks, n)
+    return min(counts[a][b] for a, b in combinations(range(n), 2))
+
+
+def _difference_cover(n: int, k: int, coverage: int) -> Optional[Tuple[int, ...]]:
+    """Find k offsets in 1..n-1 whose differences cover every residue mod n `coverage` times."""
+    def covers(offsets: Tuple[int, ...]) -> bool:
+        hits = [0] * n
+        for a, b in combinations(offsets, 2):
+            hits[(a - b) % n] += 1
+            hits[(b - a) % n] += 1
+        return min(hits[1:]) >= coverage
+
+    if _combination_count(n - 1, k) <= _MAX_DIFFERENCE_COVER_CANDIDATES:
+        return next(filter(covers, combinations(range(1, n), k)), None)
+    return None
+
+
+def _combination_count(n: int, k: int) -> int:
+    count = 1
+    for i in range(k):
+        count = count * (n - i) // (i + 1)
+    return count
+
+
+def _greedy_blocks(n: int, owners: Tuple[Optional[int], ...], k: int, coverage: int) -> List[List[int]]:
+    """Build blocks one reviewer at a time, each time covering the pairs furthest short of `coverage`."""
+    counts = [[0] * n for _ in range(n)]
+    shown = [0] * n
+    blocks = []
+    for owner in owners:
+        allowed = [a for a in range(n) if a != owner]
+        block = [min(allowed, key=lambda a: (shown[a], a))]
+        while len(block) < min(k, len(allowed)):
+            block.append(max(
+                (a for a in allowed if a not in block),
+                key=lambda a: (
+                    sum(max(0, coverage - counts[a][b]) for b in block),
+                    -shown[a],
+                    -a,
+                )
+            ))
+        for a, b in combinations(block, 2):
+            counts[a][b] += 1
+            counts[b][a] += 1
+        for a in block:
+            shown[a] += 1
+        blocks.append(sorted(block))
+    return blocks
+
+
+@lru_cache(maxsize=256)
+def design_blocks(
+    n: int,
+    owners: Tuple[Optional[int], ...],
+    pair_coverage: int = 2,
+    block_size: Optional[int] = None
+) -> Optional[List[List[int]]]:
+    """
+    Choose which answers each reviewer is shown.
+
+    The block size is the smallest (and at least `block_size`) for which a
+    design covering every pair `pair_coverage` times is found.
+
+    Args:
+        n: Number of answers
+        owners: For each reviewer, the index of its own answer (None if it
+            has none)
+        pair_coverage: Reviewers that must compare each pair of answers
+        block_size: Optional minimum number of answers per reviewer
+
+    Returns:
+        One sorted list of answer indices per reviewer, or None if only
+        full review (every reviewer shown everything) can meet the coverage
+    """
+    b = len(owners)
+    k = max(2, block_size or 2)
+    # Every block covers k(k-1)/2 pairs; there are n(n-1)/2 pairs to cover
+    while b * k * (k - 1) < pair_coverage * n * (n - 1):
+        k += 1
+    cyclic = owners == tuple(range(n))
+    while k < n - 1:
+        if cyclic:
+            offsets = _difference_cover(n, k, pair_coverage)
+            if offsets is not None:
+                return [sorted((r + d) % n for d in offsets) for r in range(n)]
+        blocks = _greedy_blocks(n, owners, k, pair_coverage)
+        if min_pair_coverage(blocks, n) >= pair_coverage:
+            return blocks
+        k += 1
+    return None
+
+
+def plan_review(
+    reviewers: List[str],
+    authors: List[str],
+    policy: Dict[str, Any]
+) -> Optional[Dict[str, List[int]]]:
+    """
+    Assign stage 2 blocks for a review policy.
+
+    Args:
+        reviewers: Models asked to rank
+        authors: Model behind each stage 1 answer, in label order
+        policy: Review policy (see DEFAULT_REVIEW_POLICY in config.py)
+
+    Returns:
+        Answer indices shown to each reviewer, or None for full review
+        (sharding off, too few answers, or no smaller design meets the
+        coverage)
+    """
+    n = len(authors)
+    if not policy.get("sharded") or n < max(3, policy.get("min_responses") or 0):
+        return None
+    owner_of = {model: i for i, model in enumerate(authors)}
+    blocks = design_blocks(
+        n,
+        tuple(owner_of.get(model) for model in reviewers),
+        policy.get("pair_coverage") or 1,
+        policy.get("block_size")
+    )
+    if blocks is None:
+        return None
+    return {model: list(block) for model, block in zip(reviewers, blocks)}
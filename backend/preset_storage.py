@@ -2,11 +2,21 @@
 
 import json
 import os
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
+from .config import MODEL_PRESETS
+from .storage.files import atomic_write
 
 CUSTOM_PRESETS_FILE = "data/custom_presets.json"
 
+# Serializes read-modify-write cycles on the presets file
+_write_lock = threading.Lock()
+
+# (file mtime_ns, parsed presets) of the last read or write, replaced as a
+# whole so readers never see a mismatched pair
+_cache: Tuple[Optional[int], Dict[str, Any]] = (None, {})
+
 
 def ensure_custom_presets_file():
     """Ensure the custom presets file exists."""
@@ -19,14 +29,45 @@ def ensure_custom_presets_file():
 def get_custom_presets() -> Dict[str, Any]:
     """
     Get all custom presets.
+
+    The file is only re-parsed when its modification time changes.
     
     Returns:
         Dict of custom presets
     """
+    global _cache
     ensure_custom_presets_file()
-    
-    with open(CUSTOM_PRESETS_FILE, 'r') as f:
-        return json.load(f)
+
+    mtime_ns = os.stat(CUSTOM_PRESETS_FILE).st_mtime_ns
+    cached_mtime_ns, presets = _cache
+    if cached_mtime_ns != mtime_ns:
+        with open(CUSTOM_PRESETS_FILE, 'r') as f:
+            presets = json.load(f)
+        _cache = (mtime_ns, presets)
+    return dict(presets)
+
+
+def _write_presets(presets: Dict[str, Any]):
+    global _cache
+    atomic_write(CUSTOM_PRESETS_FILE, json.dumps(presets, indent=2))
+    _cache = (os.stat(CUSTOM_PRESETS_FILE).st_mtime_ns, presets)
+
+
+def get_preset(preset_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Look up a built-in or custom preset.
+
+    Args:
+        preset_id: Preset identifier (built-in key or "custom_..." id)
+
+    Returns:
+        Preset dict, or None if no such preset exists
+    """
+    if not preset_id:
+        return None
+    if preset_id in MODEL_PRESETS:
+        return MODEL_PRESETS[preset_id]
+    return get_custom_presets().get(preset_id)
 
 
 def save_custom_preset(preset_id: str, preset_data: Dict[str, Any]):
@@ -35,15 +76,15 @@ def save_custom_preset(preset_id: str, preset_data: Dict[str, Any]):
     
     Args:
         preset_id: Unique identifier for the preset
-        preset_data: Preset configuration dict with name, description, council_models, chairman_model
+        preset_data: Preset configuration dict with name, description, council_models,
+            chairman_model and optional stage_policy
     """
     ensure_custom_presets_file()
     
-    presets = get_custom_presets()
-    presets[preset_id] = preset_data
-    
-    with open(CUSTOM_PRESETS_FILE, 'w') as f:
-        json.dump(presets, f, indent=2)
+    with _write_lock:
+        presets = get_custom_presets()
+        presets[preset_id] = preset_data
+        _write_presets(presets)
 
 
 def delete_custom_preset(preset_id: str):
@@ -55,9 +96,8 @@ def delete_custom_preset(preset_id: str):
     """
     ensure_custom_presets_file()
     
-    presets = get_custom_presets()
-    if preset_id in presets:
-        del presets[preset_id]
-        
-        with open(CUSTOM_PRESETS_FILE, 'w') as f:
-            json.dump(presets, f, indent=2)
+    with _write_lock:
+        presets = get_custom_presets()
+        if preset_id in presets:
+            del presets[preset_id]
+            _write_presets(presets)
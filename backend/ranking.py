@@ -0,0 +1,245 @@
+"""
+Stage 2 ranking extraction.
+
+Council members are asked to end their evaluation with a "FINAL RANKING:"
+section listing the anonymized responses best first. Models deviate from
+that format in predictable ways (markdown emphasis, a lower-case or
+decorated heading, a label repeated or left out, the heading echoed in the
+evaluation itself), so extraction tries the strictest reading first and
+falls back step by step. Members listed in STRUCTURED_RANKING_MODELS answer
+with a JSON object instead (see ranking_response_format), which is turned
+back into the same text form so everything downstream sees one format.
+
+Accuracy and speed on a labeled corpus: python -m benchmarks.ranking
+"""
+
+import re
+from typing import List, Dict, Any, Optional
+
+from . import serialization
+
+LABEL_PREFIX = "Response "
+
+_MARKDOWN = re.compile(r"[*_`]+")
+_HEADING = re.compile(r"FINAL\s+RANKINGS?\b\s*:?", re.IGNORECASE)
+_NUMBERED = re.compile(
+    r"(?:(?<![\w.])\d+[ \t]*[.):-]|^[ \t>]*[-+•])[ \t]*[Rr]esponse\s+([A-Z]{1,3})\b",
+    re.MULTILINE
+)
+_LABEL = re.compile(r"\b[Rr]esponse\s+([A-Z]{1,3})\b")
+_BARE_LABEL = re.compile(r"[A-Z]{1,3}")
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```$", re.DOTALL)
+
+
+def label_letters(index: int) -> str:
+    """
+    Get the letters of the index-th label: A..Z, then AA, AB, ...
+
+    Args:
+        index: Zero-based response position
+
+    Returns:
+        Label letters
+    """
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def response_labels(count: int) -> List[str]:
+    """Get the anonymized labels ("Response A", ...) for `count` responses."""
+    return [LABEL_PREFIX + label_letters(i) for i in range(count)]
+
+
+def _normalize_label(value: Any) -> Optional[str]:
+    """Turn a structured-output entry ("C", "Response C") into a label."""
+    if not isinstance(value, str):
+        return None
+    value = _MARKDOWN.sub("", value).strip()
+    match = _LABEL.fullmatch(value)
+    if match:
+        return LABEL_PREFIX + match.group(1)
+    return LABEL_PREFIX + value if _BARE_LABEL.fullmatch(value) else None
+
+
+def _parse_structured(text: str) -> Optional[Dict[str, Any]]:
+    """Decode a structured ranking answer, or None if `text` is not one."""
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        fenced = _JSON_FENCE.match(stripped)
+        stripped = fenced.group(1) if fenced else stripped
+    if not stripped.startswith("{"):
+        return None
+    try:
+        data = serialization.loads(stripped)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get("ranking"), list):
+        return None
+    return data
+
+
+def extract_ranking(text: str, labels: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Extract a ranking from a council member's stage 2 answer.
+
+    Tried in order: a structured (JSON) answer, numbered entries after the
+    last "FINAL RANKING" heading that has any, every label mentioned after
+    that heading, and finally every label mentioned anywhere. Repeated
+    labels keep their first position. If exactly one of `labels` is left
+    out, it is taken to be ranked last.
+
+    Args:
+        text: The member's full answer
+        labels: The labels that were shown (unknown labels are dropped);
+            None accepts any label
+
+    Returns:
+        Dict with 'ranking' (labels best first), 'method' ("json",
+        "numbered", "section", "anywhere" or "none"), 'duplicates' (repeated
+        mentions dropped), 'missing' (labels not ranked) and 'inferred'
+        (the label placed last by elimination, or None)
+    """
+    valid = set(labels) if labels is not None else None
+    letters: List[str] = []
+    method = "none"
+
+    structured = _parse_structured(text)
+    if structured is not None:
+        ranked = [_normalize_label(entry) for entry in structured["ranking"]]
+        letters = [label[len(LABEL_PREFIX):] for label in ranked if label]
+        method = "json"
+    else:
+        # Fast path: the heading exactly as requested, followed by a numbered list
+        position = text.rfind("FINAL RANKING")
+        if position >= 0:
+            letters = _NUMBERED.findall(_MARKDOWN.sub("", text[position + 13:]))
+            method = "numbered"
+    if not letters and structured is None:
+        plain = _MARKDOWN.sub("", text)
+        for heading in reversed(list(_HEADING.finditer(plain))):
+            section = plain[heading.end():]
+            letters = _NUMBERED.findall(section)
+            if letters:
+                method = "numbered"
+                break
+            letters = _LABEL.findall(section)
+            if letters:
+                method = "section"
+                break
+        if not letters:
+            letters = _LABEL.findall(plain)
+            method = "anywhere" if letters else "none"
+
+    mentioned = [LABEL_PREFIX + letter for letter in letters]
+    if valid is not None:
+        mentioned = [label for label in mentioned if label in valid]
+    # First mention wins
+    ranking = list(dict.fromkeys(mentioned))
+    duplicates = len(mentioned) - len(ranking)
+
+    missing = [label for label in labels if label not in ranking] if labels is not None else []
+    inferred = None
+    if len(missing) == 1 and ranking:
+        inferred = missing.pop()
+        ranking.append(inferred)
+
+    return {
+        "ranking": ranking,
+        "method": method,
+        "duplicates": duplicates,
+        "missing": missing,
+        "inferred": inferred,
+    }
+
+
+def parse_ranking(text: str, labels: Optional[List[str]] = None) -> List[str]:
+    """Extract just the ranked labels from an answer; see extract_ranking."""
+    return extract_ranking(text, labels)["ranking"]
+
+
+def ranking_response_format(
+    labels: List[str],
+    evaluation: bool = True,
+    notes: bool = False
+) -> Dict[str, Any]:
+    """
+    Build the OpenRouter 'response_format' asking for a JSON ranking.
+
+    Args:
+        labels: The labels being ranked
+        evaluation: Ask for an 'evaluation' string before the ranking
+        notes: Ask for a 'notes' array with one line per ranked label
+
+    Returns:
+        A json_schema response format with the requested fields and a
+        'ranking' array restricted to the labels
+    """
+    properties: Dict[str, Any] = {}
+    if evaluation:
+        properties["evaluation"] = {"type": "string"}
+    properties["ranking"] = {
+        "type": "array",
+        "items": {"type": "string", "enum": list(labels)},
+    }
+    if notes:
+        properties["notes"] = {"type": "array", "items": {"type": "string"}}
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "council_ranking",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": properties,
+                "required": list(properties),
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def format_ranking(
+    evaluation: str,
+    ranking: List[str],
+    notes: Optional[Dict[str, str]] = None
+) -> str:
+    """Render an evaluation and ranking (with optional one-line notes per label) in the FINAL RANKING text format."""
+    notes = notes or {}
+    lines = "\n".join(
+        f"{position}. {label} - {notes[label]}" if notes.get(label) else f"{position}. {label}"
+        for position, label in enumerate(ranking, start=1)
+    )
+    return f"{evaluation.strip()}\n\nFINAL RANKING:\n{lines}".lstrip()
+
+
+def structured_to_text(content: str, labels: Optional[List[str]] = None) -> str:
+    """
+    Convert a structured ranking answer to the FINAL RANKING text format.
+
+    Args:
+        content: Raw answer from a structured-output request
+        labels: The labels that were shown
+
+    Returns:
+        The text form, or `content` unchanged if it is not a structured answer
+    """
+    data = _parse_structured(content)
+    if data is None:
+        return content
+    evaluation = data.get("evaluation")
+    notes: Dict[str, str] = {}
+    if isinstance(data.get("notes"), list):
+        # Notes follow the order of the model's own ranking entries
+        for entry, note in zip(data["ranking"], data["notes"]):
+            label = _normalize_label(entry)
+            if label and isinstance(note, str):
+                notes.setdefault(label, " ".join(note.split()))
+    return format_ranking(
+        evaluation if isinstance(evaluation, str) else "",
+        extract_ranking(content, labels)["ranking"],
+        notes
+    )
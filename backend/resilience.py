@@ -0,0 +1,270 @@
+"""Error classification, retry backoff and per-model circuit breakers for upstream calls."""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional
+
+import httpx
+
+from .config import (
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+)
+
+# HTTP statuses worth retrying: timeouts, rate limits and provider-side errors
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 520, 522, 524, 529}
+
+
+class UpstreamError(Exception):
+    """A classified failure of an upstream model call."""
+
+    def __init__(
+        self,
+        model: str,
+        kind: str,
+        message: str,
+        retryable: bool = False,
+        counts_as_failure: bool = True,
+        retry_after: Optional[float] = None,
+        status_code: Optional[int] = None
+    ):
+        super().__init__(f"{model}: {kind}: {message}")
+        self.model = model
+        self.kind = kind
+        self.retryable = retryable
+        self.counts_as_failure = counts_as_failure
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class CircuitOpenError(UpstreamError):
+    """Raised without calling upstream while a model's circuit is open."""
+
+    def __init__(self, model: str, retry_in: float):
+        super().__init__(
+            model,
+            "circuit_open",
+            f"failing fast for another {retry_in:.1f}s",
+            counts_as_failure=False
+        )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: Header value, either delay-seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(model: str, exc: BaseException) -> UpstreamError:
+    """
+    Classify an exception raised by an upstream call.
+
+    Args:
+        model: OpenRouter model identifier
+        exc: The exception raised while querying the model
+
+    Returns:
+        UpstreamError describing whether the failure is retryable and
+        whether it should count against the model's circuit breaker
+    """
+    if isinstance(exc, UpstreamError):
+        return exc
+
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        retryable = status in RETRYABLE_STATUS_CODES
+        return UpstreamError(
+            model,
+            "rate_limited" if status == 429 else f"http_{status}",
+            str(exc),
+            retryable=retryable,
+            # Client errors (bad request, auth) say nothing about provider health
+            counts_as_failure=retryable,
+            retry_after=parse_retry_after(exc.response.headers.get("Retry-After")),
+            status_code=status
+        )
+
+    if isinstance(exc, httpx.PoolTimeout):
+        # Local congestion: retrying would only deepen the queue
+        return UpstreamError(model, "pool_timeout", str(exc), counts_as_failure=False)
+
+    if isinstance(exc, httpx.TimeoutException):
+        return UpstreamError(model, "timeout", str(exc) or type(exc).__name__, retryable=True)
+
+    if isinstance(exc, httpx.TransportError):
+        return UpstreamError(model, "connection_error", str(exc) or type(exc).__name__, retryable=True)
+
+    if isinstance(exc, (ValueError, KeyError, IndexError, TypeError, RuntimeError)):
+        # Malformed body or an error reported inside the stream
+        return UpstreamError(model, "bad_response", str(exc), retryable=True)
+
+    return UpstreamError(model, "unknown", str(exc) or type(exc).__name__)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> Optional[float]:
+    """
+    Compute the wait before a retry.
+
+    Uses exponential backoff with full jitter, honoring Retry-After when the
+    provider sends one.
+
+    Args:
+        attempt: Zero-based index of the retry about to happen
+        retry_after: Provider-requested delay in seconds, if any
+
+    Returns:
+        Seconds to wait, or None if the provider asked for longer than
+        RETRY_MAX_DELAY (not worth waiting for)
+    """
+    jittered = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+    if retry_after is None:
+        return jittered
+    if retry_after > RETRY_MAX_DELAY:
+        return None
+    return retry_after + jittered * 0.1
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one model.
+
+    closed: calls flow normally. After CIRCUIT_FAILURE_THRESHOLD consecutive
+    failures the circuit opens and calls fail fast. Once CIRCUIT_RESET_TIMEOUT
+    has passed it goes half-open and lets a single probe through; the probe's
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def _retry_in(self) -> float:
+        return max(0.0, self.opened_at + CIRCUIT_RESET_TIMEOUT - time.monotonic())
+
+    def is_available(self) -> bool:
+        """Whether a call would currently be let through."""
+        if self.state == "open":
+            return self._retry_in() == 0.0
+        if self.state == "half_open":
+            return not self.probe_in_flight
+        return True
+
+    def before_call(self):
+        """
+        Admit a call or fail fast.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or a probe is already running
+        """
+        if self.state == "open" and self._retry_in() == 0.0:
+            self.state = "half_open"
+
+        if self.state == "open" or (self.state == "half_open" and self.probe_in_flight):
+            self.stats["rejected"] += 1
+            raise CircuitOpenError(self.model, self._retry_in())
+
+        if self.state == "half_open":
+            self.probe_in_flight = True
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        self.stats["successes"] += 1
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.state = "closed"
+
+    def record_failure(self):
+        """Count a failure, opening the circuit at the threshold or on a failed probe."""
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        self.probe_in_flight = False
+        if self.state == "half_open" or self.consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            if self.state != "open":
+                self.stats["opened"] += 1
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a call that says nothing about provider health (cancelled, client error)."""
+        self.probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and counters for metrics."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": round(self._retry_in(), 1) if self.state == "open" else 0.0,
+            **self.stats,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+_retry_stats = {"retries": 0, "gave_up": 0}
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    """Get (or create) the circuit breaker for a model."""
+    if model not in _breakers:
+        _breakers[model] = CircuitBreaker(model)
+    return _breakers[model]
+
+
+def is_available(model: str) -> bool:
+    """
+    Check whether a model's circuit currently admits calls.
+
+    Args:
+        model: OpenRouter model identifier
+
+    Returns:
+        False while the model's circuit is open (or its probe is running)
+    """
+    breaker = _breakers.get(model)
+    return breaker is None or breaker.is_available()
+
+
+def record_retry():
+    """Count a retry attempt."""
+    _retry_stats["retries"] += 1
+
+
+def record_gave_up():
+    """Count a call that failed after exhausting its retries."""
+    _retry_stats["gave_up"] += 1
+
+
+def get_resilience_stats() -> Dict[str, Any]:
+    """
+    Get retry counters and circuit breaker states.
+
+    Returns:
+        Dict with 'retries' counters and per-model 'circuit_breakers'
+    """
+    return {
+        "retries": dict(_retry_stats),
+        "circuit_breakers": {model: breaker.snapshot() for model, breaker in _breakers.items()},
+    }
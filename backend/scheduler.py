@@ -0,0 +1,335 @@
+"""Fair upstream call scheduler with global/per-model concurrency caps and rate limits."""
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+
+from .config import SCHEDULER_MAX_CONCURRENT, DEFAULT_MODEL_LIMITS, MODEL_LIMITS
+from .resilience import UpstreamError
+from . import budget
+
+# Conversation the current request belongs to; queued calls are served
+# round-robin across conversations so one busy conversation can't starve others
+current_conversation: ContextVar[str] = ContextVar("current_conversation", default="")
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """
+    Roughly estimate the prompt tokens of a message list (see budget.estimate_tokens).
+
+    Args:
+        messages: List of message dicts with 'role' and 'content'
+
+    Returns:
+        Estimated token count (at least 1)
+    """
+    return max(1, sum(budget.estimate_tokens(m.get("content") or "") for m in messages))
+
+
+def get_model_limits(model: str) -> Dict[str, Any]:
+    """
+    Get the concurrency and rate limits for a model.
+
+    Args:
+        model: OpenRouter model identifier
+
+    Returns:
+        Dict with 'max_concurrent', 'requests_per_minute' and 'tokens_per_minute'
+        (None means unlimited)
+    """
+    return {**DEFAULT_MODEL_LIMITS, **MODEL_LIMITS.get(model, {})}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute / 60` tokens per second."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        # Requests larger than the bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        """Remove tokens (may go negative for oversized requests)."""
+        self._refill()
+        self.tokens -= amount
+
+
+class _Waiter:
+    """A queued call waiting for a slot."""
+
+    def __init__(self, model: str, tokens: int, key: str):
+        self.model = model
+        self.tokens = tokens
+        self.key = key
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class Scheduler:
+    """
+    Admission control for upstream calls.
+
+    A call runs once a global slot and a per-model slot are free and the
+    model's request and token buckets allow it. Waiting calls are queued per
+    conversation and dispatched round-robin across conversations. Within a
+    conversation, calls to the same model keep their order, but a call to a
+    model at its cap or rate limit does not hold up calls to other models.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self.running = 0
+        self.running_per_model: Dict[str, int] = defaultdict(int)
+        self.queues: Dict[str, deque] = {}
+        self.order: deque = deque()
+        self.request_buckets: Dict[str, TokenBucket] = {}
+        self.token_buckets: Dict[str, TokenBucket] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.stats = {
+            "admitted": 0,
+            "queued": 0,
+            "timeouts": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _buckets(self, model: str):
+        limits = get_model_limits(model)
+        if limits["requests_per_minute"] and model not in self.request_buckets:
+            self.request_buckets[model] = TokenBucket(limits["requests_per_minute"])
+        if limits["tokens_per_minute"] and model not in self.token_buckets:
+            self.token_buckets[model] = TokenBucket(limits["tokens_per_minute"])
+        return self.request_buckets.get(model), self.token_buckets.get(model)
+
+    def _rate_wait(self, model: str, tokens: int) -> float:
+        """Seconds until the model's rate limits admit a call (0 if now)."""
+        request_bucket, token_bucket = self._buckets(model)
+        wait = 0.0
+        if request_bucket:
+            wait = max(wait, request_bucket.wait_time(1))
+        if token_bucket:
+            wait = max(wait, token_bucket.wait_time(tokens))
+        return wait
+
+    def _has_slot(self, model: str) -> bool:
+        limits = get_model_limits(model)
+        if self.running >= self.max_concurrent:
+            return False
+        max_model = limits["max_concurrent"]
+        return max_model is None or self.running_per_model[model] < max_model
+
+    def _admit(self, model: str, tokens: int):
+        request_bucket, token_bucket = self._buckets(model)
+        if request_bucket:
+            request_bucket.take(1)
+        if token_bucket:
+            token_bucket.take(tokens)
+        self.running += 1
+        self.running_per_model[model] += 1
+        self.stats["admitted"] += 1
+
+    def _dispatch(self):
+        """Admit queued calls round-robin across conversations while capacity allows."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        next_wake = None
+        progress = True
+        while progress and self.order:
+            progress = False
+            for _ in range(len(self.order)):
+                key = self.order[0]
+                self.order.rotate(-1)
+                queue = self.queues[key]
+                waiter, wait = self._ready_waiter(queue)
+                if waiter is None:
+                    if wait is not None:
+                        next_wake = wait if next_wake is None else min(next_wake, wait)
+                    continue
+
+                queue.remove(waiter)
+                if not queue:
+                    del self.queues[key]
+                    self.order.remove(key)
+                self._admit(waiter.model, waiter.tokens)
+                self._record_wait(waiter)
+                waiter.future.set_result(True)
+                progress = True
+                break
+
+        # Rate-limited calls need a wake-up; slot-limited ones are woken by release()
+        if next_wake is not None and self.order:
+            self._timer = asyncio.get_running_loop().call_later(next_wake, self._dispatch)
+
+    def _ready_waiter(self, queue: deque):
+        """
+        Find the first call in a conversation's queue that may run now.
+
+        Returns:
+            Tuple of (waiter, None), or (None, seconds until a rate-limited
+            call may run, or None if every call waits for a slot)
+        """
+        if self.running >= self.max_concurrent:
+            return None, None
+        next_wake = None
+        skipped = set()
+        for waiter in queue:
+            # Later calls to a model must not overtake its first waiting one
+            if waiter.model in skipped:
+                continue
+            if self._has_slot(waiter.model):
+                wait = self._rate_wait(waiter.model, waiter.tokens)
+                if wait == 0:
+                    return waiter, None
+                next_wake = wait if next_wake is None else min(next_wake, wait)
+            skipped.add(waiter.model)
+        return None, next_wake
+
+    def _record_wait(self, waiter: _Waiter):
+        waited = time.monotonic() - waiter.enqueued_at
+        self.stats["total_wait_seconds"] += waited
+        self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+
+    def _remove(self, waiter: _Waiter):
+        queue = self.queues.get(waiter.key)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self.queues[waiter.key]
+                self.order.remove(waiter.key)
+
+    def release(self, model: str):
+        """Free the slots held by a finished call and admit waiting calls."""
+        self.running -= 1
+        self.running_per_model[model] -= 1
+        if self.order:
+            self._dispatch()
+
+    async def acquire(self, model: str, tokens: int, key: str, timeout: Optional[float] = None):
+        """
+        Wait until a call to `model` may run.
+
+        Args:
+            model: OpenRouter model identifier
+            tokens: Estimated tokens the call consumes
+            key: Fairness key (conversation id)
+            timeout: Longest time to queue, in seconds
+
+        Raises:
+            UpstreamError: If the call could not be admitted within `timeout`
+        """
+        # Fast path: nothing queued and capacity available
+        if not self.order and self._has_slot(model) and self._rate_wait(model, tokens) == 0:
+            self._admit(model, tokens)
+            return
+
+        waiter = _Waiter(model, tokens, key)
+        if key not in self.queues:
+            self.queues[key] = deque()
+            self.order.append(key)
+        self.queues[key].append(waiter)
+        self.stats["queued"] += 1
+        self._dispatch()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            self._remove(waiter)
+            if waiter.future.done():
+                # Admitted just as we gave up: hand the slot back
+                self.release(model)
+            self.stats["timeouts"] += 1
+            raise UpstreamError(
+                model,
+                "queue_timeout",
+                f"not scheduled within {timeout:.1f}s",
+                counts_as_failure=False
+            )
+        except asyncio.CancelledError:
+            self._remove(waiter)
+            if waiter.future.done():
+                self.release(model)
+            raise
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current queue depth, running counts and wait statistics."""
+        now = time.monotonic()
+        waiting_per_model: Dict[str, int] = defaultdict(int)
+        oldest = 0.0
+        for queue in self.queues.values():
+            for waiter in queue:
+                waiting_per_model[waiter.model] += 1
+                oldest = max(oldest, now - waiter.enqueued_at)
+
+        queued = self.stats["queued"]
+        return {
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": sum(waiting_per_model.values()),
+            "queued_conversations": len(self.queues),
+            "oldest_wait_seconds": round(oldest, 3),
+            "running_per_model": {m: n for m, n in self.running_per_model.items() if n},
+            "waiting_per_model": dict(waiting_per_model),
+            "admitted": self.stats["admitted"],
+            "queued": queued,
+            "timeouts": self.stats["timeouts"],
+            "avg_queue_wait_seconds": round(self.stats["total_wait_seconds"] / queued, 4) if queued else 0.0,
+            "max_queue_wait_seconds": round(self.stats["max_wait_seconds"], 4),
+        }
+
+
+_scheduler: Optional[Scheduler] = None
+
+
+def get_scheduler() -> Scheduler:
+    """Get the process-wide scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = Scheduler(SCHEDULER_MAX_CONCURRENT)
+    return _scheduler
+
+
+@asynccontextmanager
+async def upstream_slot(model: str, messages: List[Dict[str, str]], timeout: Optional[float] = None):
+    """
+    Hold a scheduler slot for one upstream call.
+
+    Args:
+        model: OpenRouter model identifier
+        messages: Messages being sent (used to estimate token usage)
+        timeout: Longest time to queue, in seconds
+    """
+    scheduler = get_scheduler()
+    await scheduler.acquire(model, estimate_tokens(messages), current_conversation.get(), timeout)
+    try:
+        yield
+    finally:
+        scheduler.release(model)
+
+
+def get_scheduler_stats() -> Dict[str, Any]:
+    """
+    Get scheduler queue depth and wait time statistics.
+
+    Returns:
+        Snapshot dict from the process-wide scheduler
+    """
+    return get_scheduler().snapshot()
@@ -0,0 +1,58 @@
+"""
+JSON encoding for storage, SSE frames and caches.
+
+Uses orjson when the optional `orjson` package is installed (compare on
+your data with `python -m benchmarks.serialization`) and the stdlib
+`json` module otherwise. Output is always compact; the stdlib
+path escapes non-ASCII characters, which keeps it on its fastest code path.
+"""
+
+import json
+from typing import Any, Dict, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENCODER = "orjson" if orjson else "json"
+
+
+def dumps_bytes(obj: Any, sort_keys: bool = False) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Args:
+        obj: JSON-serializable value
+        sort_keys: Sort object keys (for stable hashes)
+
+    Returns:
+        Encoded bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    """Encode a value as a compact JSON string; see dumps_bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0).decode("utf-8")
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"))
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    Decode JSON text or UTF-8 bytes.
+
+    Raises:
+        ValueError: If the input is not valid JSON
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def sse_frame(event: Dict[str, Any]) -> bytes:
+    """Encode an event dict as a ready-to-send Server-Sent Events data frame."""
+    return b"data: " + dumps_bytes(event) + b"\n\n"
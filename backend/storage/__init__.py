@@ -0,0 +1,166 @@
+"""
+Conversation storage.
+
+The module-level functions delegate to the backend selected by
+STORAGE_BACKEND ("jsonl", "json" or "sqlite"); see base.StorageBackend.
+"""
+
+from typing import List, Dict, Any, Optional, Callable
+
+from ..config import STORAGE_BACKEND
+from ..io_pool import run_blocking
+from .base import StorageBackend, conversation_version
+from .json_backend import JsonStorage
+from .log_backend import LogStorage
+from .sqlite_backend import SqliteStorage
+from .session import ConversationSession
+from .locks import conversation_locks
+
+BACKENDS = {
+    "jsonl": LogStorage,
+    "json": JsonStorage,
+    "sqlite": SqliteStorage,
+}
+
+_backend: Optional[StorageBackend] = None
+
+
+def get_backend() -> StorageBackend:
+    """Get the process-wide storage backend."""
+    global _backend
+    if _backend is None:
+        if STORAGE_BACKEND not in BACKENDS:
+            raise ValueError(
+                f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}; expected one of {sorted(BACKENDS)}"
+            )
+        _backend = BACKENDS[STORAGE_BACKEND]()
+    return _backend
+
+
+async def run_locked(func: Callable[..., Any], conversation_id: str, *args: Any) -> Any:
+    """
+    Run a blocking storage call for one conversation under its lock.
+
+    Calls for the same conversation run one at a time; other conversations
+    are not held up. The call itself runs on the I/O pool.
+
+    Args:
+        func: Storage function taking the conversation id first
+        conversation_id: Conversation identifier
+        *args: Remaining arguments for func
+
+    Returns:
+        Whatever func returns
+    """
+    async with conversation_locks.hold(conversation_id):
+        return await run_blocking(func, conversation_id, *args)
+
+
+def get_lock_stats() -> Dict[str, Any]:
+    """Get per-conversation lock contention counters."""
+    return conversation_locks.snapshot()
+
+
+def open_session(conversation_id: str) -> ConversationSession:
+    """Start a unit-of-work session for one request against a conversation."""
+    return ConversationSession(get_backend(), conversation_id)
+
+
+def create_conversation(conversation_id: str) -> Dict[str, Any]:
+    """Create a new conversation."""
+    return get_backend().create_conversation(conversation_id)
+
+
+def get_conversation(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """Load a conversation, or None if not found."""
+    return get_backend().get_conversation(conversation_id)
+
+
+def get_conversation_header(conversation_id: str) -> Optional[Dict[str, Any]]:
+    """Load a conversation without its messages ('message_count' instead), or None if not found."""
+    return get_backend().get_conversation_header(conversation_id)
+
+
+def get_changes(conversation_id: str, since: str) -> Optional[Dict[str, Any]]:
+    """Get messages and field updates after a version, or None if not found."""
+    return get_backend().get_changes(conversation_id, since)
+
+
+def get_message_page(
+    conversation_id: str,
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """Load one page of message summaries (newest first), or None if not found."""
+    return get_backend().get_message_page(conversation_id, limit, cursor)
+
+
+def get_message(conversation_id: str, index: int) -> Optional[Dict[str, Any]]:
+    """Load one full message by index, or None if not found."""
+    return get_backend().get_message(conversation_id, index)
+
+
+def save_conversation(conversation: Dict[str, Any]):
+    """Save a full conversation."""
+    get_backend().save_conversation(conversation)
+
+
+def prepare():
+    """Bring the backend's indexes up to date (called at startup)."""
+    get_backend().prepare()
+
+
+def list_conversations() -> List[Dict[str, Any]]:
+    """List all conversations (metadata only), newest first."""
+    return get_backend().list_conversations()
+
+
+def list_conversations_page(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    descending: bool = True
+) -> Dict[str, Any]:
+    """List one page of conversation metadata with a cursor for the next."""
+    return get_backend().list_conversations_page(limit, cursor, sort, descending)
+
+
+def add_user_message(conversation_id: str, content: str):
+    """Add a user message to a conversation."""
+    get_backend().add_user_message(conversation_id, content)
+
+
+def add_assistant_message(
+    conversation_id: str,
+    stage1: List[Dict[str, Any]],
+    stage2: List[Dict[str, Any]],
+    stage3: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None
+):
+    """Add an assistant message with all 3 stages to a conversation."""
+    get_backend().add_assistant_message(conversation_id, stage1, stage2, stage3, metadata)
+
+
+def update_conversation_title(conversation_id: str, title: str):
+    """Update the title of a conversation."""
+    get_backend().update_conversation_title(conversation_id, title)
+
+
+def get_conversation_models(conversation_id: str) -> Dict[str, Any]:
+    """Get the model configuration for a conversation."""
+    return get_backend().get_conversation_models(conversation_id)
+
+
+def update_conversation_models(
+    conversation_id: str,
+    council_models: List[str],
+    chairman_model: str,
+    preset_id: Optional[str] = None
+):
+    """Update the model configuration for a conversation."""
+    get_backend().update_conversation_models(conversation_id, council_models, chairman_model, preset_id)
+
+
+def delete_conversation(conversation_id: str):
+    """Delete a conversation from storage."""
+    get_backend().delete_conversation(conversation_id)
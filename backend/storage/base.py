@@ -0,0 +1,357 @@
+"""Storage interface shared by the conversation backends."""
+
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from ..config import COUNCIL_MODELS, CHAIRMAN_MODEL
+
+
+def new_conversation(conversation_id: str) -> Dict[str, Any]:
+    """
+    Build the initial record for a conversation.
+
+    Args:
+        conversation_id: Unique identifier for the conversation
+
+    Returns:
+        Conversation dict with default title and models and no messages
+    """
+    return {
+        "id": conversation_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "title": "New Conversation",
+        "council_models": COUNCIL_MODELS,
+        "chairman_model": CHAIRMAN_MODEL,
+        "edits": 0,
+        "messages": []
+    }
+
+
+def assistant_message(
+    stage1: List[Dict[str, Any]],
+    stage2: List[Dict[str, Any]],
+    stage3: Dict[str, Any],
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Build an assistant message record from the three stage results."""
+    message = {
+        "role": "assistant",
+        "stage1": stage1,
+        "stage2": stage2,
+        "stage3": stage3
+    }
+    if metadata:
+        message["metadata"] = metadata
+    return message
+
+
+# Conversation fields apply_changes may set
+UPDATABLE_FIELDS = ("title", "council_models", "chairman_model", "preset_id")
+
+def conversation_version(conversation: Dict[str, Any]) -> str:
+    """
+    Get the version of a conversation or conversation header.
+
+    Messages are only ever appended and 'edits' counts field updates, so
+    the pair changes on every write and never goes back.
+
+    Args:
+        conversation: Conversation dict, or header with 'message_count'
+
+    Returns:
+        Opaque version string
+    """
+    if "messages" in conversation:
+        message_count = len(conversation["messages"])
+    else:
+        message_count = conversation["message_count"]
+    return f"{message_count}.{conversation.get('edits') or 0}"
+
+
+def parse_version(version: str) -> Tuple[int, int]:
+    """
+    Split a conversation_version string into (message count, edits).
+
+    Raises:
+        ValueError: If the version is malformed
+    """
+    try:
+        message_count, edits = (int(part) for part in version.split("."))
+    except ValueError:
+        raise ValueError(f"Invalid version {version!r}")
+    if message_count < 0 or edits < 0:
+        raise ValueError(f"Invalid version {version!r}")
+    return message_count, edits
+
+
+# Per-model text field of each detail stage; summaries replace it with its length
+STAGE_TEXT_FIELDS = {"stage1": "response", "stage2": "ranking"}
+
+
+def summarize_message(message: Dict[str, Any], index: int) -> Dict[str, Any]:
+    """
+    Strip a message down to what a conversation view shows up front.
+
+    User messages and stage 3 are kept whole; stage 1/2 results keep their
+    model, flags and parsed ranking, but their 'response'/'ranking' text is
+    replaced by its 'length'. Packed records (see storage/blobs.py) are
+    summarized from their stored lengths, without their texts.
+
+    Args:
+        message: Stored message record, with or without its stage texts
+        index: Position of the message in its conversation
+
+    Returns:
+        Summary dict with an added 'index'
+    """
+    summary = {"index": index, **message}
+    for stage, text_field in STAGE_TEXT_FIELDS.items():
+        if stage in summary:
+            stored = (text_field, f"{text_field}_blob", f"{text_field}_length")
+            summary[stage] = [
+                {
+                    **{key: value for key, value in result.items() if key not in stored},
+                    "length": result.get(f"{text_field}_length", len(result.get(text_field) or ""))
+                }
+                for result in summary[stage] or []
+            ]
+    return summary
+
+
+class StorageBackend(ABC):
+    """
+    Conversation storage operations.
+
+    Conversations are dicts with 'id', 'created_at', 'title',
+    'council_models', 'chairman_model', optional 'preset_id', 'edits'
+    (the number of field updates so far) and a 'messages' list; every
+    backend returns that shape.
+    Mutations raise ValueError when the conversation does not exist.
+
+    Backends implement the abstract methods, apply_changes among them; the
+    single-change mutations are expressed in terms of it.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """Create and persist a new, empty conversation."""
+
+    @abstractmethod
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load a full conversation, or None if not found."""
+
+    @abstractmethod
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """Persist a full conversation, replacing any stored version."""
+
+    def get_conversation_header(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation's fields without its messages.
+
+        Backends override this to avoid reading the messages at all.
+
+        Returns:
+            Conversation dict with 'message_count' instead of 'messages',
+            or None if not found
+        """
+        conversation = self.get_conversation(conversation_id)
+        if conversation is None:
+            return None
+        conversation["message_count"] = len(conversation.pop("messages"))
+        return conversation
+
+    def get_messages(
+        self,
+        conversation_id: str,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        texts: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a slice of a conversation's messages.
+
+        start/stop follow slice semantics (negative values count from the
+        end). Backends override this to avoid reading messages outside it.
+        With texts=False, backends that keep stage texts in a blob store may
+        return packed records (text lengths only, see summarize_message).
+
+        Returns:
+            Dict with 'messages', 'offset' (index of the first one) and
+            'total' (message count), or None if not found
+        """
+        conversation = self.get_conversation(conversation_id)
+        if conversation is None:
+            return None
+        messages = conversation["messages"]
+        first, last, _ = slice(start, stop).indices(len(messages))
+        return {"messages": messages[first:last], "offset": first, "total": len(messages)}
+
+    def get_message_page(
+        self,
+        conversation_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load one page of message summaries, newest first.
+
+        Args:
+            conversation_id: Conversation identifier
+            limit: Page size, or None for every message before the cursor
+            cursor: Index from a previous page's 'next_cursor'; the page
+                holds the messages before it
+
+        Returns:
+            Dict with 'messages' (see summarize_message), 'next_cursor'
+            (None on the last page) and 'total', or None if not found
+        """
+        if cursor is None:
+            start, stop = (-limit if limit else None), None
+        else:
+            start, stop = (max(cursor - limit, 0) if limit else 0), cursor
+        result = self.get_messages(conversation_id, start, stop, texts=False)
+        if result is None:
+            return None
+
+        offset = result["offset"]
+        messages = [
+            summarize_message(message, offset + i) for i, message in enumerate(result["messages"])
+        ]
+        messages.reverse()
+        return {
+            "messages": messages,
+            "next_cursor": offset if messages and offset > 0 else None,
+            "total": result["total"]
+        }
+
+    def get_message(self, conversation_id: str, index: int) -> Optional[Dict[str, Any]]:
+        """Load one full message by index, or None if it (or the conversation) does not exist."""
+        if index < 0:
+            return None
+        result = self.get_messages(conversation_id, index, index + 1)
+        if result is None or not result["messages"]:
+            return None
+        return result["messages"][0]
+
+    def prepare(self):
+        """Bring derived state (indexes) up to date; called once at startup."""
+
+    def list_conversations(self) -> List[Dict[str, Any]]:
+        """List all conversation metadata, newest first."""
+        return self.list_conversations_page()["conversations"]
+
+    @abstractmethod
+    def list_conversations_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: str = "created_at",
+        descending: bool = True
+    ) -> Dict[str, Any]:
+        """
+        List one page of conversation metadata.
+
+        Items have 'id', 'created_at', 'updated_at', 'title' and
+        'message_count'. Returns a dict with 'conversations' and
+        'next_cursor' (None on the last page); raises ValueError for an
+        unknown sort field or invalid cursor.
+        """
+
+    @abstractmethod
+    def apply_changes(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        fields: Dict[str, Any]
+    ):
+        """
+        Append messages and update fields in a single write.
+
+        Args:
+            conversation_id: Conversation identifier
+            messages: Message records to append, in order
+            fields: New values for any of UPDATABLE_FIELDS
+        """
+
+    def add_user_message(self, conversation_id: str, content: str):
+        """Append a user message."""
+        self.apply_changes(conversation_id, [{"role": "user", "content": content}], {})
+
+    def add_assistant_message(
+        self,
+        conversation_id: str,
+        stage1: List[Dict[str, Any]],
+        stage2: List[Dict[str, Any]],
+        stage3: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Append an assistant message with all three stages."""
+        self.apply_changes(conversation_id, [assistant_message(stage1, stage2, stage3, metadata)], {})
+
+    def update_conversation_title(self, conversation_id: str, title: str):
+        """Set a conversation's title."""
+        self.apply_changes(conversation_id, [], {"title": title})
+
+    def get_changes(self, conversation_id: str, since: str) -> Optional[Dict[str, Any]]:
+        """
+        Get what changed in a conversation after a given version.
+
+        Args:
+            conversation_id: Conversation identifier
+            since: Version the caller already has (see conversation_version)
+
+        Returns:
+            Dict with the current 'version', 'messages' added since (full
+            messages with their 'index') and, if any field was updated,
+            'fields' with the current UPDATABLE_FIELDS values; None if the
+            conversation does not exist
+
+        Raises:
+            ValueError: If `since` is malformed or newer than the conversation
+        """
+        message_count, edits = parse_version(since)
+        header = self.get_conversation_header(conversation_id)
+        if header is None:
+            return None
+        if message_count > header["message_count"] or edits > (header.get("edits") or 0):
+            raise ValueError(f"Version {since} is newer than the conversation")
+
+        changes: Dict[str, Any] = {"version": conversation_version(header), "messages": []}
+        if message_count < header["message_count"]:
+            result = self.get_messages(conversation_id, message_count, header["message_count"])
+            changes["messages"] = [
+                {"index": result["offset"] + i, **message}
+                for i, message in enumerate(result["messages"])
+            ]
+        if edits < (header.get("edits") or 0):
+            changes["fields"] = {field: header.get(field) for field in UPDATABLE_FIELDS}
+        return changes
+
+    @abstractmethod
+    def prune_blobs(self) -> int:
+        """Delete stage-text blobs no conversation references; returns how many."""
+
+    @abstractmethod
+    def get_conversation_models(self, conversation_id: str) -> Dict[str, Any]:
+        """Get 'council_models', 'chairman_model' and 'preset_id'."""
+
+    def update_conversation_models(
+        self,
+        conversation_id: str,
+        council_models: List[str],
+        chairman_model: str,
+        preset_id: Optional[str] = None
+    ):
+        """Set a conversation's model configuration."""
+        self.apply_changes(conversation_id, [], {
+            "council_models": council_models,
+            "chairman_model": chairman_model,
+            "preset_id": preset_id
+        })
+
+    @abstractmethod
+    def delete_conversation(self, conversation_id: str):
+        """Delete a conversation."""
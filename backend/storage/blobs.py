@@ -0,0 +1,359 @@
+"""
+Content-addressed, compressed storage for stage 1/2 texts.
+
+Message records keep a '<field>_blob' key in place of each stage text
+(see STAGE_TEXT_FIELDS), and its length in characters under
+'<field>_length' so that summaries need not load it; the text itself is
+stored once per distinct content, so cached or retried answers cost
+nothing extra.
+
+Blobs no longer referenced by any conversation are removed with:
+    python -m backend.storage.prune
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Set, Tuple
+
+from ..config import STORAGE_BLOB_COMPRESSION
+from .base import STAGE_TEXT_FIELDS
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Preset dictionary for zlib. Stage texts are short, so most of their
+# redundancy is shared boilerplate rather than repetition within one text;
+# seeding the window with it lets even the first occurrence be a back
+# reference. zlib favours matches near the end, so the most common strings
+# come last. Never change this in place: blobs record the dictionary they
+# were written with, so add a new version instead.
+ZLIB_DICTIONARY_V1 = (
+    "In summary, Overall, However, Additionally, For example, In conclusion, "
+    "This approach Key considerations: Here's a breakdown: It's important to note that "
+    "### Example\n```python\n```\n\n| --- | --- |\n> Note: "
+    "**Strengths:** **Weaknesses:** **Accuracy:** **Completeness:** **Clarity:** "
+    "is accurate but lacks depth on provides good detail but misses "
+    "is the most comprehensive and well-structured "
+    "is concise but offers a clear explanation of the "
+    "Response A Response B Response C Response D Response E "
+    "Response A provides Response B provides Response C provides Response D provides "
+    "\n\n## \n\n### \n- **\n1. **\n2. **\n3. **\n"
+    " of the and the to the in the is a that the for the with the "
+    "\n\nFINAL RANKING:\n1. Response A\n2. Response B\n3. Response C\n4. Response D\n"
+).encode("utf-8")
+
+_ZLIB_DICTIONARIES = {"zlib:1": ZLIB_DICTIONARY_V1}
+
+# Codec used for new blobs
+_ZLIB_CODEC = "zlib:1"
+
+# Keys per IN (...) query, below SQLite's bound-parameter limit
+_QUERY_CHUNK = 500
+
+
+def blob_key(text: str) -> str:
+    """Content address of a text: hex BLAKE2b-128 of its UTF-8 bytes."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _codec() -> str:
+    if STORAGE_BLOB_COMPRESSION == "none":
+        return "raw"
+    if STORAGE_BLOB_COMPRESSION == "zstd" or (STORAGE_BLOB_COMPRESSION == "auto" and zstandard):
+        if zstandard is None:
+            raise RuntimeError("STORAGE_BLOB_COMPRESSION=zstd requires the 'zstandard' package")
+        return "zstd"
+    return _ZLIB_CODEC
+
+
+def compress_text(text: str) -> Tuple[str, bytes]:
+    """
+    Compress a text with the configured codec.
+
+    Returns:
+        (codec, data); codec is "raw" when compression would not save space
+    """
+    raw = text.encode("utf-8")
+    codec = _codec()
+    if codec == "zstd":
+        data = zstandard.ZstdCompressor(level=10).compress(raw)
+    elif codec in _ZLIB_DICTIONARIES:
+        compressor = zlib.compressobj(9, zdict=_ZLIB_DICTIONARIES[codec])
+        data = compressor.compress(raw) + compressor.flush()
+    else:
+        data = raw
+    if len(data) >= len(raw):
+        return "raw", raw
+    return codec, data
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    """
+    Reverse compress_text.
+
+    Raises:
+        ValueError: For an unknown codec, or zstd data without `zstandard`
+    """
+    if codec == "raw":
+        raw = data
+    elif codec == "zstd":
+        if zstandard is None:
+            raise ValueError("Blob is zstd-compressed but 'zstandard' is not installed")
+        raw = zstandard.ZstdDecompressor().decompress(data)
+    elif codec in _ZLIB_DICTIONARIES:
+        decompressor = zlib.decompressobj(zdict=_ZLIB_DICTIONARIES[codec])
+        raw = decompressor.decompress(data) + decompressor.flush()
+    else:
+        raise ValueError(f"Unknown blob codec {codec!r}")
+    return bytes(raw).decode("utf-8")
+
+
+class BlobStore:
+    """
+    SQLite table of compressed texts keyed by content hash.
+
+    Each row also records when it was last written or re-referenced, so
+    prune() can tell blobs a concurrent write is about to reference from
+    garbage.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS blobs (
+                    key TEXT PRIMARY KEY,
+                    codec TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    touched_at REAL NOT NULL
+                )"""
+            )
+        return self.conn
+
+    @staticmethod
+    def _select(conn: sqlite3.Connection, query: str, keys: Iterable[str]) -> List[tuple]:
+        """Run `query` + " (?, ...)" over the keys in chunks."""
+        keys = list(keys)
+        rows = []
+        for start in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[start:start + _QUERY_CHUNK]
+            rows += conn.execute(f"{query} ({', '.join('?' * len(chunk))})", chunk).fetchall()
+        return rows
+
+    def put_many(self, texts: Iterable[str]) -> List[str]:
+        """
+        Store texts (each distinct content once) and return their keys.
+
+        Args:
+            texts: Texts to store
+
+        Returns:
+            Keys in the same order as `texts`
+        """
+        texts = list(texts)
+        keys = [blob_key(text) for text in texts]
+        if not texts:
+            return keys
+        now = time.time()
+
+        with self.lock:
+            conn = self._connect()
+            existing = {
+                key for (key,) in self._select(conn, "SELECT key FROM blobs WHERE key IN", set(keys))
+            }
+            rows = {}
+            for key, text in zip(keys, texts):
+                if key not in existing and key not in rows:
+                    codec, data = compress_text(text)
+                    rows[key] = (key, codec, len(text.encode("utf-8")), data, now)
+            with conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO blobs (key, codec, size, data, touched_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    list(rows.values())
+                )
+                conn.executemany(
+                    "UPDATE blobs SET touched_at = ? WHERE key = ?",
+                    [(now, key) for key in existing]
+                )
+        return keys
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Load texts by key.
+
+        Args:
+            keys: Blob keys
+
+        Returns:
+            Dict of key to text (missing keys are left out)
+        """
+        with self.lock:
+            rows = self._select(
+                self._connect(), "SELECT key, codec, data FROM blobs WHERE key IN", set(keys)
+            )
+        return {key: decompress_text(codec, data) for key, codec, data in rows}
+
+    def prune(self, live: Set[str], started_at: float) -> int:
+        """
+        Delete blobs that are not referenced and were not touched since a scan began.
+
+        Args:
+            live: Keys referenced by the conversations scanned
+            started_at: time.time() before the scan, so blobs written
+                during it are kept
+
+        Returns:
+            Number of blobs deleted
+        """
+        with self.lock:
+            conn = self._connect()
+            candidates = [
+                key for (key,) in conn.execute(
+                    "SELECT key FROM blobs WHERE touched_at < ?", (started_at,)
+                )
+                if key not in live
+            ]
+            with conn:
+                conn.executemany("DELETE FROM blobs WHERE key = ?", [(key,) for key in candidates])
+        return len(candidates)
+
+    def stats(self) -> Dict[str, int]:
+        """Get the blob count and total raw/stored sizes in bytes."""
+        with self.lock:
+            count, size, stored = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM blobs"
+            ).fetchone()
+        return {"blobs": count, "text_bytes": size, "stored_bytes": stored}
+
+
+def _stage_texts(message: Dict[str, Any]) -> Iterable[Tuple[Dict[str, Any], str]]:
+    """Yield (stage result, text field) pairs of an assistant message."""
+    if message.get("role") != "assistant":
+        return
+    for stage, field in STAGE_TEXT_FIELDS.items():
+        for result in message.get(stage) or []:
+            yield result, field
+
+
+def pack_messages(messages: List[Dict[str, Any]], blobs: BlobStore) -> List[Dict[str, Any]]:
+    """
+    Move stage texts into the blob store.
+
+    Results already packed are left as they are.
+
+    Args:
+        messages: Message records (not modified)
+        blobs: Store to put the texts in
+
+    Returns:
+        Copies of the messages with '<field>_blob' and '<field>_length' keys
+        in place of the texts
+    """
+    packed = []
+    pending = []
+    for message in messages:
+        if not any(field in result for result, field in _stage_texts(message)):
+            packed.append(message)
+            continue
+        message = dict(message)
+        for stage in STAGE_TEXT_FIELDS:
+            if stage in message:
+                message[stage] = [dict(result) for result in message[stage] or []]
+        for result, field in _stage_texts(message):
+            if field in result:
+                pending.append((result, field))
+        packed.append(message)
+
+    keys = blobs.put_many(result[field] or "" for result, field in pending)
+    for (result, field), key in zip(pending, keys):
+        result[f"{field}_length"] = len(result.pop(field) or "")
+        result[f"{field}_blob"] = key
+    return packed
+
+
+def unpack_messages(messages: List[Dict[str, Any]], blobs: BlobStore) -> List[Dict[str, Any]]:
+    """
+    Restore stage texts from the blob store, in place.
+
+    Args:
+        messages: Message records as stored
+        blobs: Store holding their texts
+
+    Returns:
+        The same list, with each '<field>_blob' key (and its length)
+        replaced by its text
+    """
+    refs = [
+        (result, field) for message in messages
+        for result, field in _stage_texts(message) if f"{field}_blob" in result
+    ]
+    if not refs:
+        return messages
+    texts = blobs.get_many(result[f"{field}_blob"] for result, field in refs)
+    for result, field in refs:
+        key = result.pop(f"{field}_blob")
+        result.pop(f"{field}_length", None)
+        if key not in texts:
+            print(f"Stage text blob {key} is missing")
+        result[field] = texts.get(key, "")
+    return messages
+
+
+def add_text_lengths(messages: List[Dict[str, Any]], blobs: BlobStore) -> List[Dict[str, Any]]:
+    """
+    Make sure packed records carry their text lengths, in place, without loading the texts.
+
+    Only records packed before lengths were stored have their blobs read.
+
+    Args:
+        messages: Message records as stored
+        blobs: Store holding their texts
+
+    Returns:
+        The same list, still packed, with '<field>_length' on every blob reference
+    """
+    refs = [
+        (result, field) for message in messages
+        for result, field in _stage_texts(message)
+        if f"{field}_blob" in result and f"{field}_length" not in result
+    ]
+    if refs:
+        texts = blobs.get_many(result[f"{field}_blob"] for result, field in refs)
+        for result, field in refs:
+            result[f"{field}_length"] = len(texts.get(result[f"{field}_blob"], ""))
+    return messages
+
+
+def result_keys(result: Dict[str, Any]) -> Set[str]:
+    """Get the blob keys referenced by one stored stage result."""
+    return {
+        result[f"{field}_blob"] for field in STAGE_TEXT_FIELDS.values() if f"{field}_blob" in result
+    }
+
+
+def referenced_keys(messages: List[Dict[str, Any]]) -> Set[str]:
+    """Get the blob keys referenced by stored message records."""
+    keys: Set[str] = set()
+    for message in messages:
+        if message.get("role") == "assistant":
+            for stage in STAGE_TEXT_FIELDS:
+                for result in message.get(stage) or []:
+                    keys |= result_keys(result)
+    return keys
+
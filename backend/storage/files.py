@@ -0,0 +1,38 @@
+"""Crash-safe file writes."""
+
+import os
+import tempfile
+
+
+def atomic_write(path: str, data: str, fsync: bool = False):
+    """
+    Replace a file's contents so readers see either the old or new version.
+
+    Writes to a temp file in the same directory and renames it over
+    `path`; a crash mid-write leaves the old file untouched.
+
+    Args:
+        path: Destination file
+        data: Complete new contents
+        fsync: Flush the file (and the rename) to disk before returning
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
@@ -0,0 +1,280 @@
+"""Conversation metadata index and cursor pagination for conversation lists."""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable
+
+# Columns a conversation list can be sorted by
+SORT_FIELDS = ("created_at", "updated_at", "title", "message_count")
+
+METADATA_COLUMNS = "id, created_at, updated_at, title, message_count"
+
+
+def encode_cursor(sort: str, value: Any, conversation_id: str) -> str:
+    """Encode the position after a list item as an opaque cursor."""
+    raw = json.dumps([sort, value, conversation_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str) -> tuple:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Opaque cursor string
+        sort: Sort field of the current request
+
+    Returns:
+        (sort value, conversation id) of the last item already returned
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, conversation_id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was issued for sort '{cursor_sort}', not '{sort}'")
+    return value, conversation_id
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    table: str,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    descending: bool = True
+) -> Dict[str, Any]:
+    """
+    Read one page of conversation metadata using keyset pagination.
+
+    Pages are ordered by (sort, id), so each page is an indexed range scan
+    whatever its offset.
+
+    Args:
+        conn: Connection holding `table` with the metadata columns
+        table: Table name
+        limit: Page size, or None for everything after the cursor
+        cursor: Cursor from a previous page's 'next_cursor'
+        sort: One of SORT_FIELDS
+        descending: Newest/largest first
+
+    Returns:
+        Dict with 'conversations' (metadata dicts) and 'next_cursor'
+        (None on the last page)
+
+    Raises:
+        ValueError: For an unknown sort field or invalid cursor
+    """
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"Unknown sort '{sort}'; expected one of {', '.join(SORT_FIELDS)}")
+
+    direction = "DESC" if descending else "ASC"
+    params: List[Any] = []
+    where = ""
+    if cursor:
+        value, conversation_id = decode_cursor(cursor, sort)
+        where = f"WHERE ({sort}, id) {'<' if descending else '>'} (?, ?)"
+        params += [value, conversation_id]
+    params.append(limit + 1 if limit else -1)
+
+    rows = conn.execute(
+        f"SELECT {METADATA_COLUMNS} FROM {table} {where} "
+        f"ORDER BY {sort} {direction}, id {direction} LIMIT ?",
+        params
+    ).fetchall()
+
+    conversations = [
+        {"id": r[0], "created_at": r[1], "updated_at": r[2], "title": r[3], "message_count": r[4]}
+        for r in rows
+    ]
+    next_cursor = None
+    if limit and len(conversations) > limit:
+        conversations = conversations[:limit]
+        last = conversations[-1]
+        next_cursor = encode_cursor(sort, last[sort], last["id"])
+    return {"conversations": conversations, "next_cursor": next_cursor}
+
+
+def create_sort_indexes(conn: sqlite3.Connection, table: str):
+    """Create the (sort, id) indexes fetch_page relies on."""
+    for field in SORT_FIELDS:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{field} ON {table}({field}, id)")
+
+
+class MetadataIndex:
+    """
+    SQLite index of conversation metadata for the JSON backend.
+
+    Each row remembers the mtime of the file it was read from, so a
+    reconcile pass only re-parses files that changed behind the index's
+    back (edits, crashes between the file write and the index update).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS conversation_index (
+                    id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    title TEXT NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL
+                )"""
+            )
+            create_sort_indexes(self.conn, "conversation_index")
+        return self.conn
+
+    @staticmethod
+    def _row(conversation: Dict[str, Any], mtime_ns: int) -> tuple:
+        return (
+            conversation["id"],
+            conversation["created_at"],
+            datetime.utcfromtimestamp(mtime_ns / 1e9).isoformat(),
+            conversation.get("title", "New Conversation"),
+            len(conversation.get("messages", [])),
+            mtime_ns,
+        )
+
+    def upsert(self, conversation: Dict[str, Any], mtime_ns: int):
+        """
+        Record a conversation's metadata after its file was written.
+
+        Args:
+            conversation: Conversation dict as written
+            mtime_ns: Modification time of the written file
+        """
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO conversation_index "
+                    "(id, created_at, updated_at, title, message_count, mtime_ns) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self._row(conversation, mtime_ns)
+                )
+
+    def record_append(
+        self,
+        conversation_id: str,
+        mtime_ns: int,
+        added_messages: int = 0,
+        title: Optional[str] = None
+    ):
+        """
+        Update a conversation's entry after an append, without its full record.
+
+        Args:
+            conversation_id: Conversation identifier
+            mtime_ns: Modification time of the appended file
+            added_messages: Number of messages appended
+            title: New title, if the append changed it
+        """
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "UPDATE conversation_index SET message_count = message_count + ?, "
+                    "title = COALESCE(?, title), updated_at = ?, mtime_ns = ? WHERE id = ?",
+                    (
+                        added_messages,
+                        title,
+                        datetime.utcfromtimestamp(mtime_ns / 1e9).isoformat(),
+                        mtime_ns,
+                        conversation_id,
+                    )
+                )
+
+    def remove(self, conversation_id: str):
+        """Drop a deleted conversation from the index."""
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM conversation_index WHERE id = ?", (conversation_id,))
+
+    def reconcile(
+        self,
+        data_dir: str,
+        read: Callable[[str], Dict[str, Any]],
+        suffixes: tuple = (".json",)
+    ) -> Dict[str, int]:
+        """
+        Bring the index in line with the files in a directory.
+
+        Only files whose mtime differs from the indexed one are parsed.
+
+        Args:
+            data_dir: Directory of <conversation_id><suffix> files
+            read: Function loading a conversation dict from a file path
+            suffixes: Conversation file suffixes; when a conversation has
+                files with several, the one listed last wins
+
+        Returns:
+            Dict with 'indexed', 'refreshed' and 'removed' counts
+        """
+        found: Dict[str, Dict[str, tuple]] = {}
+        if os.path.isdir(data_dir):
+            for entry in os.scandir(data_dir):
+                for suffix in suffixes:
+                    if entry.name.endswith(suffix) and entry.is_file():
+                        found.setdefault(entry.name[:-len(suffix)], {})[suffix] = (
+                            entry.path, entry.stat().st_mtime_ns
+                        )
+        on_disk = {
+            conversation_id: [files[s] for s in suffixes if s in files][-1]
+            for conversation_id, files in found.items()
+        }
+
+        with self.lock:
+            conn = self._connect()
+            indexed = dict(conn.execute("SELECT id, mtime_ns FROM conversation_index").fetchall())
+
+            rows = []
+            for conversation_id, (path, mtime_ns) in on_disk.items():
+                if indexed.get(conversation_id) == mtime_ns:
+                    continue
+                try:
+                    rows.append(self._row(read(path), mtime_ns))
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Not indexing unreadable conversation file {path}: {e}")
+            removed = [(cid,) for cid in indexed if cid not in on_disk]
+
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO conversation_index "
+                    "(id, created_at, updated_at, title, message_count, mtime_ns) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.executemany("DELETE FROM conversation_index WHERE id = ?", removed)
+
+        return {"indexed": len(on_disk), "refreshed": len(rows), "removed": len(removed)}
+
+    def page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: str = "created_at",
+        descending: bool = True
+    ) -> Dict[str, Any]:
+        """Read one page of indexed metadata; see fetch_page."""
+        with self.lock:
+            return fetch_page(self._connect(), "conversation_index", limit, cursor, sort, descending)
@@ -0,0 +1,256 @@
+"""JSON-file storage for conversations (one file per conversation)."""
+
+import os
+import time
+from typing import List, Dict, Any, Optional
+from pathlib import Path
+
+from ..config import DATA_DIR, STORAGE_FSYNC, COUNCIL_MODELS, CHAIRMAN_MODEL
+from .. import serialization
+from .base import StorageBackend, new_conversation
+from .index import MetadataIndex
+from .files import atomic_write
+from .locks import KeyedLock
+from .blobs import BlobStore, pack_messages, unpack_messages, add_text_lengths, referenced_keys
+
+
+def _read_file(path: str) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        return serialization.loads(f.read())
+
+
+class JsonStorage(StorageBackend):
+    """
+    Stores each conversation as a JSON file in a directory.
+
+    Listing is served from a metadata index kept next to the files, so it
+    never parses conversation files that have not changed. Stage texts live
+    in a blob store in the same directory.
+    """
+
+    name = "json"
+    suffixes = (".json",)
+
+    def __init__(self, data_dir: str = DATA_DIR, fsync: bool = STORAGE_FSYNC):
+        self.data_dir = data_dir
+        self.fsync = fsync
+        self.index = MetadataIndex(os.path.join(data_dir, ".index.sqlite3"))
+        self.locks = KeyedLock()
+        self.blobs = BlobStore(os.path.join(data_dir, ".blobs.sqlite3"))
+        self.reconciled = False
+
+    def ensure_data_dir(self):
+        """Ensure the data directory exists."""
+        Path(self.data_dir).mkdir(parents=True, exist_ok=True)
+
+    def read_path(self, path: str) -> Dict[str, Any]:
+        """Load a conversation dict, as stored, from one of this backend's files."""
+        return _read_file(path)
+
+    def _read_raw(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Load a conversation as stored (stage texts as blob keys), or None."""
+        path = self.get_conversation_path(conversation_id)
+        if not os.path.exists(path):
+            return None
+        return _read_file(path)
+
+    def get_conversation_path(self, conversation_id: str) -> str:
+        """Get the file path for a conversation."""
+        return os.path.join(self.data_dir, f"{conversation_id}.json")
+
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Create a new conversation.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            New conversation dict
+        """
+        conversation = new_conversation(conversation_id)
+        self.save_conversation(conversation)
+        return conversation
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation from storage.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            Conversation dict or None if not found
+        """
+        conversation = self._read_raw(conversation_id)
+        if conversation is not None:
+            unpack_messages(conversation["messages"], self.blobs)
+        return conversation
+
+    def get_messages(
+        self,
+        conversation_id: str,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        texts: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a slice of a conversation's messages, fetching only their stage texts.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+            start: First index (slice semantics)
+            stop: End index, exclusive (slice semantics)
+            texts: Load stage texts; if False, messages stay packed, with
+                their text lengths
+
+        Returns:
+            Dict with 'messages', 'offset' and 'total', or None if not found
+        """
+        conversation = self._read_raw(conversation_id)
+        if conversation is None:
+            return None
+        messages = conversation["messages"]
+        first, last, _ = slice(start, stop).indices(len(messages))
+        unpack = unpack_messages if texts else add_text_lengths
+        return {
+            "messages": unpack(messages[first:last], self.blobs),
+            "offset": first,
+            "total": len(messages)
+        }
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """
+        Save a conversation to storage.
+
+        Args:
+            conversation: Conversation dict to save (stage texts may be
+                plain or already packed)
+        """
+        self.ensure_data_dir()
+
+        stored = {**conversation, "messages": pack_messages(conversation.get("messages", []), self.blobs)}
+        path = self.get_conversation_path(conversation['id'])
+        with self.locks.hold(conversation['id']):
+            atomic_write(path, serialization.dumps(stored), self.fsync)
+            self.index.upsert(stored, os.stat(path).st_mtime_ns)
+
+    def _load(self, conversation_id: str) -> Dict[str, Any]:
+        conversation = self._read_raw(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+        return conversation
+
+    def prepare(self):
+        """Re-index conversation files that changed since the index was last updated."""
+        counts = self.index.reconcile(self.data_dir, self.read_path, self.suffixes)
+        self.reconciled = True
+        if counts["refreshed"] or counts["removed"]:
+            print(
+                f"Conversation index: refreshed {counts['refreshed']}, "
+                f"removed {counts['removed']} of {counts['indexed']}"
+            )
+
+    def prune_blobs(self) -> int:
+        """
+        Delete stage-text blobs that no conversation file references.
+
+        Returns:
+            Number of blobs deleted (0 if any file could not be read)
+        """
+        started_at = time.time()
+        live = set()
+        if os.path.isdir(self.data_dir):
+            for entry in os.scandir(self.data_dir):
+                if not entry.name.endswith(self.suffixes) or entry.name.startswith("."):
+                    continue
+                try:
+                    live |= referenced_keys(self.read_path(entry.path).get("messages", []))
+                except (OSError, ValueError) as e:
+                    # Its references are unknown, so nothing is safe to delete
+                    print(f"Not pruning blobs: cannot read {entry.path}: {e}")
+                    return 0
+        return self.blobs.prune(live, started_at)
+
+    def list_conversations_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: str = "created_at",
+        descending: bool = True
+    ) -> Dict[str, Any]:
+        """
+        List one page of conversation metadata from the index.
+
+        Args:
+            limit: Page size, or None for all remaining conversations
+            cursor: Cursor from a previous page's 'next_cursor'
+            sort: Field to sort by (see index.SORT_FIELDS)
+            descending: Largest/newest first
+
+        Returns:
+            Dict with 'conversations' and 'next_cursor'
+        """
+        if not self.reconciled:
+            self.prepare()
+        return self.index.page(limit, cursor, sort, descending)
+
+    def apply_changes(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        fields: Dict[str, Any]
+    ):
+        """
+        Append messages and update fields with one read and one rewrite.
+
+        Args:
+            conversation_id: Conversation identifier
+            messages: Message records to append, in order
+            fields: New values for any of UPDATABLE_FIELDS
+        """
+        with self.locks.hold(conversation_id):
+            conversation = self._load(conversation_id)
+            conversation["messages"].extend(messages)
+            conversation.update(fields)
+            if fields:
+                conversation["edits"] = conversation.get("edits", 0) + 1
+            self.save_conversation(conversation)
+
+    def get_conversation_models(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Get the model configuration for a conversation.
+
+        Args:
+            conversation_id: Conversation identifier
+
+        Returns:
+            Dict with 'council_models', 'chairman_model' and 'preset_id' keys
+        """
+        conversation = self._load(conversation_id)
+
+        # Return configured models, or defaults if not set
+        return {
+            "council_models": conversation.get("council_models", COUNCIL_MODELS),
+            "chairman_model": conversation.get("chairman_model", CHAIRMAN_MODEL),
+            "preset_id": conversation.get("preset_id")
+        }
+
+    def delete_conversation(self, conversation_id: str):
+        """
+        Delete a conversation from storage.
+
+        Args:
+            conversation_id: Conversation identifier
+
+        Raises:
+            ValueError: If conversation not found
+        """
+        path = self.get_conversation_path(conversation_id)
+
+        with self.locks.hold(conversation_id):
+            if not os.path.exists(path):
+                raise ValueError(f"Conversation {conversation_id} not found")
+
+            os.remove(path)
+            self.index.remove(conversation_id)
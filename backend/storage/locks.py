@@ -0,0 +1,81 @@
+"""Per-conversation locks: asyncio locks for request handlers, thread locks for backends."""
+
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Any, List
+
+
+class ConversationLocks:
+    """
+    asyncio locks keyed by conversation id.
+
+    Writes to one conversation queue behind each other while other
+    conversations are unaffected. A key's lock is dropped once nobody holds
+    or waits for it, so the table stays as small as the set of busy
+    conversations.
+    """
+
+    def __init__(self):
+        self.locks: Dict[str, asyncio.Lock] = {}
+        self.users: Dict[str, int] = {}
+        self.stats = {"acquired": 0, "contended": 0, "total_wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+    @asynccontextmanager
+    async def hold(self, conversation_id: str):
+        """Hold the conversation's lock for the duration of the block."""
+        lock = self.locks.get(conversation_id)
+        if lock is None:
+            lock = self.locks[conversation_id] = asyncio.Lock()
+        self.users[conversation_id] = self.users.get(conversation_id, 0) + 1
+
+        started = time.monotonic()
+        try:
+            if lock.locked():
+                self.stats["contended"] += 1
+            async with lock:
+                waited = time.monotonic() - started
+                self.stats["acquired"] += 1
+                self.stats["total_wait_seconds"] += waited
+                self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+                yield
+        finally:
+            self.users[conversation_id] -= 1
+            if not self.users[conversation_id]:
+                del self.users[conversation_id]
+                del self.locks[conversation_id]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters plus the number of conversations currently locked or awaited."""
+        return {
+            "active": len(self.locks),
+            **{k: round(v, 4) if isinstance(v, float) else v for k, v in self.stats.items()},
+        }
+
+
+class KeyedLock:
+    """Re-entrant thread locks keyed by conversation id, for backends called from the I/O pool."""
+
+    def __init__(self):
+        self.guard = threading.Lock()
+        self.locks: Dict[str, List] = {}
+
+    @contextmanager
+    def hold(self, conversation_id: str):
+        """Hold the conversation's lock for the duration of the block."""
+        with self.guard:
+            entry = self.locks.setdefault(conversation_id, [threading.RLock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self.locks[conversation_id]
+
+
+# Process-wide: every request writing to a conversation goes through these
+conversation_locks = ConversationLocks()
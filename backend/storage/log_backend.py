@@ -0,0 +1,334 @@
+"""Append-only log storage for conversations (one JSONL file per conversation)."""
+
+import os
+from typing import List, Dict, Any, Optional
+
+from ..config import DATA_DIR, STORAGE_FSYNC, STORAGE_LOG_COMPACT_UPDATES, COUNCIL_MODELS, CHAIRMAN_MODEL
+from .. import serialization
+from .json_backend import JsonStorage
+from .files import atomic_write
+from .blobs import pack_messages, unpack_messages, add_text_lengths
+
+# Conversation fields kept in the header record rather than in messages
+HEADER_FIELDS = ("id", "created_at", "title", "council_models", "chairman_model", "preset_id", "edits")
+
+# Records are written with "type" first, so message lines can be recognized
+# (and skipped when only the header is wanted) without parsing them. Logs
+# written before storage output became compact have a space after the colon.
+_MESSAGE_PREFIXES = ('{"type":"message"', '{"type": "message"')
+
+
+def _encode(record: Dict[str, Any]) -> str:
+    return serialization.dumps(record) + "\n"
+
+
+def fold_log(lines: List[str], headers_only: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Rebuild a conversation from its log records.
+
+    A log is a header record, then any mix of message records (appended to
+    'messages') and update records (merged into the header fields and
+    counted in 'edits'). A torn line left by a crash mid-append is skipped.
+
+    Args:
+        lines: Raw lines of the log file
+        headers_only: Skip message records (their count is still returned
+            as 'message_count')
+
+    Returns:
+        Conversation dict (plus '_updates', the number of update records),
+        or None if the log has no header
+    """
+    conversation: Optional[Dict[str, Any]] = None
+    messages: List[Dict[str, Any]] = []
+    message_count = 0
+    updates = 0
+
+    for number, line in enumerate(lines):
+        if not line.strip():
+            continue
+        if headers_only and line.startswith(_MESSAGE_PREFIXES):
+            message_count += 1
+            continue
+        try:
+            record = serialization.loads(line)
+        except ValueError:
+            # An unterminated last line is an append still in progress (or
+            # torn by a crash); anything else is damage worth reporting
+            if line.endswith("\n"):
+                print(f"Skipping unreadable log record on line {number + 1}")
+            continue
+
+        kind = record.get("type")
+        if kind == "header":
+            conversation = {field: record.get(field) for field in HEADER_FIELDS}
+            conversation["edits"] = conversation["edits"] or 0
+        elif kind == "update" and conversation is not None:
+            conversation.update(record["fields"])
+            conversation["edits"] += 1
+            updates += 1
+        elif kind == "message":
+            messages.append(record["message"])
+            message_count += 1
+
+    if conversation is None:
+        return None
+    if conversation.get("preset_id") is None:
+        conversation.pop("preset_id", None)
+    if headers_only:
+        conversation["message_count"] = message_count
+    else:
+        conversation["messages"] = messages
+    conversation["_updates"] = updates
+    return conversation
+
+
+class LogStorage(JsonStorage):
+    """
+    Stores each conversation as an append-only JSONL log.
+
+    Adding a message appends one line, so a turn costs the same however long
+    the conversation is. Title/model changes append update records; once
+    STORAGE_LOG_COMPACT_UPDATES of them pile up the log is rewritten as a
+    single header plus messages. Legacy <id>.json files are read as-is and
+    converted to a log on their next write.
+    """
+
+    name = "jsonl"
+    suffixes = (".json", ".jsonl")
+
+    def __init__(self, data_dir: str = DATA_DIR, fsync: bool = STORAGE_FSYNC):
+        super().__init__(data_dir, fsync)
+        # Update records appended since each log was last rewritten
+        self.updates: Dict[str, int] = {}
+
+    def get_log_path(self, conversation_id: str) -> str:
+        """Get the log file path for a conversation."""
+        return os.path.join(self.data_dir, f"{conversation_id}.jsonl")
+
+    def read_path(self, path: str) -> Dict[str, Any]:
+        """Load a conversation dict, as stored, from a log or legacy JSON file."""
+        if not path.endswith(".jsonl"):
+            return super().read_path(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            conversation = fold_log(f.readlines())
+        if conversation is None:
+            raise ValueError(f"{path} has no header record")
+        self.updates.setdefault(conversation["id"], conversation.pop("_updates"))
+        return conversation
+
+    def _read_raw(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        path = self.get_log_path(conversation_id)
+        if not os.path.exists(path):
+            return super()._read_raw(conversation_id)
+        return self.read_path(path)
+
+    def _write_append(self, path: str, data: str):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(data)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _write_log(self, conversation: Dict[str, Any]):
+        """Write a complete log (header plus messages) via a temp file and rename."""
+        header = {"type": "header"}
+        header.update({field: conversation.get(field) for field in HEADER_FIELDS})
+        lines = [_encode(header)]
+        messages = pack_messages(conversation.get("messages", []), self.blobs)
+        lines += [_encode({"type": "message", "message": m}) for m in messages]
+
+        atomic_write(self.get_log_path(conversation["id"]), "".join(lines), self.fsync)
+        self.updates[conversation["id"]] = 0
+
+        legacy_path = self.get_conversation_path(conversation["id"])
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
+
+    def _log_for_append(self, conversation_id: str) -> str:
+        """Return the log path, converting a legacy JSON file first if needed."""
+        path = self.get_log_path(conversation_id)
+        if os.path.exists(path):
+            return path
+        legacy = super()._read_raw(conversation_id)
+        if legacy is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+        self._write_log(legacy)
+        return path
+
+    def _append(self, conversation_id: str, records: List[Dict[str, Any]]) -> int:
+        """Append records in one write and return the file's new mtime."""
+        path = self._log_for_append(conversation_id)
+        data = "".join(_encode(record) for record in records)
+        with open(path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size:
+                f.seek(-1, os.SEEK_END)
+                last = f.read(1)
+                # Start on a fresh line if a previous append was torn
+                if last != b"\n":
+                    data = "\n" + data
+        self._write_append(path, data)
+        return os.stat(path).st_mtime_ns
+
+    def apply_changes(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        fields: Dict[str, Any]
+    ):
+        """
+        Append an update record (if any fields changed) and the messages in one write.
+
+        Args:
+            conversation_id: Conversation identifier
+            messages: Message records to append, in order
+            fields: New values for any of UPDATABLE_FIELDS
+        """
+        records = [{"type": "update", "fields": fields}] if fields else []
+        records += [
+            {"type": "message", "message": message}
+            for message in pack_messages(messages, self.blobs)
+        ]
+        if not records:
+            return
+
+        with self.locks.hold(conversation_id):
+            mtime_ns = self._append(conversation_id, records)
+            self.index.record_append(
+                conversation_id, mtime_ns, added_messages=len(messages), title=fields.get("title")
+            )
+            if fields:
+                self.updates[conversation_id] = self.updates.get(conversation_id, 0) + 1
+                if self.updates[conversation_id] >= STORAGE_LOG_COMPACT_UPDATES:
+                    self.compact(conversation_id)
+
+    def compact(self, conversation_id: str):
+        """
+        Rewrite a conversation's log as one header plus its messages.
+
+        Args:
+            conversation_id: Conversation identifier
+        """
+        with self.locks.hold(conversation_id):
+            conversation = self._read_raw(conversation_id)
+            if conversation is None:
+                raise ValueError(f"Conversation {conversation_id} not found")
+            self.save_conversation(conversation)
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """
+        Save a full conversation, replacing its log.
+
+        Args:
+            conversation: Conversation dict to save
+        """
+        self.ensure_data_dir()
+        with self.locks.hold(conversation["id"]):
+            self._write_log(conversation)
+            path = self.get_log_path(conversation["id"])
+            self.index.upsert(conversation, os.stat(path).st_mtime_ns)
+
+    def get_conversation_header(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation's fields from its header and update records.
+
+        Message records are counted but not parsed.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            Conversation dict with 'message_count' instead of 'messages',
+            or None if not found
+        """
+        path = self.get_log_path(conversation_id)
+        if not os.path.exists(path):
+            return super().get_conversation_header(conversation_id)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            conversation = fold_log(f.readlines(), headers_only=True)
+        if conversation is None:
+            return None
+        self.updates.setdefault(conversation_id, conversation.pop("_updates"))
+        return conversation
+
+    def get_messages(
+        self,
+        conversation_id: str,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        texts: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a slice of a conversation's messages, parsing only those records.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+            start: First index (slice semantics)
+            stop: End index, exclusive (slice semantics)
+            texts: Load stage texts; if False, messages stay packed, with
+                their text lengths
+
+        Returns:
+            Dict with 'messages', 'offset' and 'total', or None if not found
+        """
+        path = self.get_log_path(conversation_id)
+        if not os.path.exists(path):
+            return super().get_messages(conversation_id, start, stop, texts)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            # An unterminated last line is an append still in progress
+            records = [
+                line for line in f
+                if line.startswith(_MESSAGE_PREFIXES) and line.endswith("\n")
+            ]
+        first, last, _ = slice(start, stop).indices(len(records))
+        messages = []
+        for line in records[first:last]:
+            try:
+                messages.append(serialization.loads(line)["message"])
+            except ValueError:
+                print(f"Skipping unreadable message record in {path}")
+        (unpack_messages if texts else add_text_lengths)(messages, self.blobs)
+        return {"messages": messages, "offset": first, "total": len(records)}
+
+    def get_conversation_models(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Get the model configuration for a conversation from its header records.
+
+        Args:
+            conversation_id: Conversation identifier
+
+        Returns:
+            Dict with 'council_models', 'chairman_model' and 'preset_id' keys
+        """
+        conversation = self.get_conversation_header(conversation_id)
+        if conversation is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+        council_models = conversation.get("council_models")
+        return {
+            "council_models": COUNCIL_MODELS if council_models is None else council_models,
+            "chairman_model": conversation.get("chairman_model") or CHAIRMAN_MODEL,
+            "preset_id": conversation.get("preset_id")
+        }
+
+    def delete_conversation(self, conversation_id: str):
+        """
+        Delete a conversation's log (and any legacy JSON file).
+
+        Args:
+            conversation_id: Conversation identifier
+
+        Raises:
+            ValueError: If conversation not found
+        """
+        paths = [self.get_log_path(conversation_id), self.get_conversation_path(conversation_id)]
+        with self.locks.hold(conversation_id):
+            existing = [p for p in paths if os.path.exists(p)]
+            if not existing:
+                raise ValueError(f"Conversation {conversation_id} not found")
+            for path in existing:
+                os.remove(path)
+            self.index.remove(conversation_id)
+            self.updates.pop(conversation_id, None)
@@ -0,0 +1,85 @@
+"""
+Import file-based conversations (JSON or JSONL logs) into the SQLite backend.
+
+Usage:
+    python -m backend.storage.migrate [--source DIR] [--db PATH] [--overwrite]
+
+Conversations already present in the database are skipped unless
+--overwrite is given, so the tool can be re-run safely.
+"""
+
+import argparse
+import os
+from datetime import datetime
+from typing import Dict
+
+from ..config import DATA_DIR, STORAGE_DB_PATH
+from .log_backend import LogStorage
+from .sqlite_backend import SqliteStorage
+
+
+def migrate_json_to_sqlite(source_dir: str, db_path: str, overwrite: bool = False) -> Dict[str, int]:
+    """
+    Copy every file-based conversation in a directory into a SQLite database.
+
+    Args:
+        source_dir: Directory of <conversation_id>.json / .jsonl files
+        db_path: SQLite database file (created if missing)
+        overwrite: Replace conversations that already exist in the database
+
+    Returns:
+        Dict with 'imported', 'skipped' and 'failed' counts
+    """
+    source = LogStorage(source_dir)
+    target = SqliteStorage(db_path)
+    counts = {"imported": 0, "skipped": 0, "failed": 0}
+
+    if not os.path.isdir(source_dir):
+        print(f"No conversations found in {source_dir}")
+        return counts
+
+    conversation_ids = sorted({
+        os.path.splitext(filename)[0]
+        for filename in os.listdir(source_dir)
+        if filename.endswith(source.suffixes)
+    })
+    for conversation_id in conversation_ids:
+        try:
+            conversation = source.get_conversation(conversation_id)
+        except (OSError, ValueError) as e:
+            print(f"Skipping unreadable conversation {conversation_id}: {e}")
+            counts["failed"] += 1
+            continue
+
+        if not overwrite and target.get_conversation(conversation["id"]) is not None:
+            counts["skipped"] += 1
+            continue
+
+        # Last activity is when the file was last written
+        path = source.get_log_path(conversation_id)
+        if not os.path.exists(path):
+            path = source.get_conversation_path(conversation_id)
+        conversation["updated_at"] = datetime.utcfromtimestamp(os.path.getmtime(path)).isoformat()
+        target.save_conversation(conversation)
+        counts["imported"] += 1
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import file-based conversations into SQLite storage.")
+    parser.add_argument("--source", default=DATA_DIR, help=f"Conversation file directory (default: {DATA_DIR})")
+    parser.add_argument("--db", default=STORAGE_DB_PATH, help=f"SQLite database path (default: {STORAGE_DB_PATH})")
+    parser.add_argument("--overwrite", action="store_true", help="Replace conversations already in the database")
+    args = parser.parse_args()
+
+    counts = migrate_json_to_sqlite(args.source, args.db, args.overwrite)
+    print(
+        f"Imported {counts['imported']}, skipped {counts['skipped']} existing, "
+        f"{counts['failed']} unreadable"
+    )
+    print("Set STORAGE_BACKEND=sqlite to use the migrated database.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""
+Remove stage-text blobs no longer referenced by any conversation.
+
+Usage:
+    python -m backend.storage.prune
+
+Safe to run while the server is up: blobs written or re-referenced after
+the scan starts are always kept.
+"""
+
+from . import get_backend
+
+
+def main():
+    backend = get_backend()
+    before = backend.blobs.stats()
+    removed = backend.prune_blobs()
+    after = backend.blobs.stats()
+    print(f"Removed {removed} unreferenced blobs of {before['blobs']}")
+    print(
+        f"{after['blobs']} blobs: {after['text_bytes']} bytes of text "
+        f"stored in {after['stored_bytes']} bytes"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Unit-of-work sessions: load a conversation's header once, commit a turn's changes once."""
+
+import asyncio
+from typing import List, Dict, Any, Optional
+
+from ..config import (
+    COUNCIL_MODELS,
+    CHAIRMAN_MODEL,
+    STORAGE_WRITE_BEHIND,
+    STORAGE_WRITE_BEHIND_INTERVAL,
+)
+from ..io_pool import run_blocking
+from .base import StorageBackend, assistant_message
+from .locks import conversation_locks
+
+
+class ConversationSession:
+    """
+    Buffers one request's changes to a conversation.
+
+    The conversation's fields and message count (never its messages) are
+    read once by load(); mutations update that copy and are queued, and
+    commit() writes everything queued so far with a single
+    apply_changes call, under the conversation's lock. In write-behind mode, checkpoint() and a timer
+    flush the queue in the background without the caller waiting on it.
+    """
+
+    def __init__(
+        self,
+        backend: StorageBackend,
+        conversation_id: str,
+        write_behind: bool = STORAGE_WRITE_BEHIND,
+        flush_interval: float = STORAGE_WRITE_BEHIND_INTERVAL
+    ):
+        self.backend = backend
+        self.conversation_id = conversation_id
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.header: Optional[Dict[str, Any]] = None
+        self.pending_messages: List[Dict[str, Any]] = []
+        self.pending_fields: Dict[str, Any] = {}
+        self.commits = 0
+        self._flush_lock = asyncio.Lock()
+        self._background: Optional[asyncio.Task] = None
+        self._timer: Optional[asyncio.Task] = None
+
+    async def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the conversation's header.
+
+        Returns:
+            Conversation dict with 'message_count' instead of 'messages',
+            or None if it does not exist
+        """
+        self.header = await run_blocking(self.backend.get_conversation_header, self.conversation_id)
+        if self.header is not None and self.write_behind:
+            self._timer = asyncio.create_task(self._flush_periodically())
+        return self.header
+
+    @property
+    def is_first_message(self) -> bool:
+        """Whether the conversation had no messages when loaded."""
+        return self.message_count == 0
+
+    @property
+    def message_count(self) -> int:
+        """Messages stored before this session's pending ones."""
+        return self.header["message_count"]
+
+    @property
+    def models(self) -> Dict[str, Any]:
+        """The conversation's 'council_models', 'chairman_model' and 'preset_id'."""
+        return {
+            "council_models": self.header.get("council_models", COUNCIL_MODELS),
+            "chairman_model": self.header.get("chairman_model", CHAIRMAN_MODEL),
+            "preset_id": self.header.get("preset_id")
+        }
+
+    def add_user_message(self, content: str):
+        """Queue a user message."""
+        self.pending_messages.append({"role": "user", "content": content})
+
+    def add_assistant_message(
+        self,
+        stage1: List[Dict[str, Any]],
+        stage2: List[Dict[str, Any]],
+        stage3: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Queue an assistant message with all 3 stages."""
+        self.pending_messages.append(assistant_message(stage1, stage2, stage3, metadata))
+
+    def update_title(self, title: str):
+        """Queue a title change."""
+        self.header["title"] = title
+        self.pending_fields["title"] = title
+
+    async def commit(self):
+        """
+        Write all queued changes in one apply_changes call (no-op if none).
+
+        The write cannot be stopped once its thread has started, so
+        cancelling the caller lets it finish and counts the messages as
+        written rather than queueing them again. They are kept for the
+        next attempt only if the write itself fails.
+        """
+        async with self._flush_lock:
+            if not self.pending_messages and not self.pending_fields:
+                return
+            messages, fields = self.pending_messages, self.pending_fields
+            self.pending_messages, self.pending_fields = [], {}
+            write = asyncio.ensure_future(self._write(messages, fields))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                # Hold the flush lock until the write lands, so the next
+                # commit cannot overtake it
+                await asyncio.wait({write})
+                raise
+
+    async def _write(self, messages: List[Dict[str, Any]], fields: Dict[str, Any]):
+        try:
+            async with conversation_locks.hold(self.conversation_id):
+                await run_blocking(
+                    self.backend.apply_changes, self.conversation_id, messages, fields
+                )
+        except Exception:
+            # Keep them for the next attempt, ahead of anything queued since
+            self.pending_messages[:0] = messages
+            self.pending_fields = {**fields, **self.pending_fields}
+            raise
+        self.header["message_count"] += len(messages)
+        if fields:
+            self.header["edits"] = (self.header.get("edits") or 0) + 1
+        self.commits += 1
+
+    def checkpoint(self):
+        """Stage boundary: in write-behind mode, flush queued changes in the background."""
+        if self.write_behind and (self._background is None or self._background.done()):
+            self._background = asyncio.create_task(self._flush_quietly())
+
+    async def _flush_quietly(self):
+        try:
+            await self.commit()
+        except Exception as e:
+            print(f"Write-behind flush for conversation {self.conversation_id} failed: {e}")
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self._flush_quietly()
+
+    async def close(self):
+        """Stop background flushing and commit whatever is still queued."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._background is not None:
+            await self._background
+        await self.commit()
@@ -0,0 +1,435 @@
+"""SQLite (WAL) storage for conversations with normalized message and stage tables."""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from ..config import STORAGE_DB_PATH, COUNCIL_MODELS, CHAIRMAN_MODEL
+from .. import serialization
+from .base import StorageBackend, new_conversation, UPDATABLE_FIELDS
+from .index import fetch_page, create_sort_indexes
+from .blobs import BlobStore, pack_messages, unpack_messages, add_text_lengths, result_keys
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    title TEXT NOT NULL,
+    council_models TEXT NOT NULL,
+    chairman_model TEXT NOT NULL,
+    preset_id TEXT,
+    message_count INTEGER NOT NULL DEFAULT 0,
+    edits INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    conversation_id TEXT NOT NULL REFERENCES conversations(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT,
+    metadata TEXT,
+    UNIQUE (conversation_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS stage_results (
+    message_id INTEGER NOT NULL REFERENCES messages(id) ON DELETE CASCADE,
+    stage INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    model TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (message_id, stage, position)
+);
+"""
+
+
+class SqliteStorage(StorageBackend):
+    """
+    Stores conversations in SQLite.
+
+    Appending a message inserts its rows and bumps the conversation's
+    message_count in one transaction, so a turn costs the same however
+    long the conversation already is. Stage texts live in a blob table in
+    the same database (written just before the transaction that
+    references them).
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str = STORAGE_DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn: Optional[sqlite3.Connection] = None
+        self.blobs = BlobStore(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("PRAGMA foreign_keys=ON")
+            self.conn.executescript(SCHEMA)
+            self._upgrade(self.conn)
+            create_sort_indexes(self.conn, "conversations")
+        return self.conn
+
+    def _upgrade(self, conn: sqlite3.Connection):
+        """Add columns introduced after a database was created."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(conversations)")}
+        if "updated_at" not in columns:
+            with conn:
+                conn.execute("ALTER TABLE conversations ADD COLUMN updated_at TEXT NOT NULL DEFAULT ''")
+                conn.execute("UPDATE conversations SET updated_at = created_at")
+        if "edits" not in columns:
+            with conn:
+                conn.execute("ALTER TABLE conversations ADD COLUMN edits INTEGER NOT NULL DEFAULT 0")
+
+    def _require(self, conn: sqlite3.Connection, conversation_id: str) -> int:
+        """Return the conversation's message count, or raise ValueError."""
+        row = conn.execute(
+            "SELECT message_count FROM conversations WHERE id = ?", (conversation_id,)
+        ).fetchone()
+        if row is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+        return row[0]
+
+    def _insert_conversation(self, conn: sqlite3.Connection, conversation: Dict[str, Any]):
+        conn.execute(
+            "INSERT INTO conversations "
+            "(id, created_at, updated_at, title, council_models, chairman_model, preset_id, edits) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                conversation["id"],
+                conversation["created_at"],
+                conversation.get("updated_at", conversation["created_at"]),
+                conversation.get("title", "New Conversation"),
+                serialization.dumps(conversation.get("council_models", COUNCIL_MODELS)),
+                conversation.get("chairman_model", CHAIRMAN_MODEL),
+                conversation.get("preset_id"),
+                conversation.get("edits") or 0,
+            )
+        )
+
+    def _insert_message(
+        self,
+        conn: sqlite3.Connection,
+        conversation_id: str,
+        position: int,
+        message: Dict[str, Any]
+    ):
+        metadata = message.get("metadata")
+        cursor = conn.execute(
+            "INSERT INTO messages (conversation_id, position, role, content, metadata) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                conversation_id,
+                position,
+                message["role"],
+                message.get("content"),
+                serialization.dumps(metadata) if metadata else None,
+            )
+        )
+        if message["role"] == "assistant":
+            rows = [(1, i, r) for i, r in enumerate(message.get("stage1") or [])]
+            rows += [(2, i, r) for i, r in enumerate(message.get("stage2") or [])]
+            if message.get("stage3") is not None:
+                rows.append((3, 0, message["stage3"]))
+            conn.executemany(
+                "INSERT INTO stage_results (message_id, stage, position, model, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [
+                    (cursor.lastrowid, stage, i, result.get("model"), serialization.dumps(result))
+                    for stage, i, result in rows
+                ]
+            )
+        conn.execute(
+            "UPDATE conversations SET message_count = ? WHERE id = ?",
+            (position + 1, conversation_id)
+        )
+
+    def create_conversation(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Create a new conversation.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            New conversation dict
+        """
+        conversation = new_conversation(conversation_id)
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                self._insert_conversation(conn, conversation)
+        return conversation
+
+    def _read_header(self, conn: sqlite3.Connection, conversation_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute(
+            "SELECT id, created_at, title, council_models, chairman_model, preset_id, message_count, "
+            "edits FROM conversations WHERE id = ?",
+            (conversation_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        header = {
+            "id": row[0],
+            "created_at": row[1],
+            "title": row[2],
+            "council_models": serialization.loads(row[3]),
+            "chairman_model": row[4],
+            "message_count": row[6],
+            "edits": row[7],
+        }
+        if row[5] is not None:
+            header["preset_id"] = row[5]
+        return header
+
+    def _read_messages(
+        self,
+        conn: sqlite3.Connection,
+        conversation_id: str,
+        first: int,
+        last: int
+    ) -> List[Dict[str, Any]]:
+        """Read messages with positions in [first, last), with their stage results."""
+        messages = conn.execute(
+            "SELECT id, role, content, metadata FROM messages "
+            "WHERE conversation_id = ? AND position >= ? AND position < ? ORDER BY position",
+            (conversation_id, first, last)
+        ).fetchall()
+        stages = conn.execute(
+            "SELECT s.message_id, s.stage, s.data FROM stage_results AS s "
+            "JOIN messages AS m ON m.id = s.message_id "
+            "WHERE m.conversation_id = ? AND m.position >= ? AND m.position < ? "
+            "ORDER BY s.message_id, s.stage, s.position",
+            (conversation_id, first, last)
+        ).fetchall()
+
+        results: Dict[int, Dict[int, List[Dict[str, Any]]]] = {}
+        for message_id, stage, data in stages:
+            results.setdefault(message_id, {}).setdefault(stage, []).append(serialization.loads(data))
+
+        loaded = []
+        for message_id, role, content, metadata in messages:
+            if role != "assistant":
+                loaded.append({"role": role, "content": content})
+                continue
+            stage_results = results.get(message_id, {})
+            message = {
+                "role": "assistant",
+                "stage1": stage_results.get(1, []),
+                "stage2": stage_results.get(2, []),
+                "stage3": (stage_results.get(3) or [None])[0],
+            }
+            if metadata:
+                message["metadata"] = serialization.loads(metadata)
+            loaded.append(message)
+        return loaded
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation with all its messages and stage results.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            Conversation dict or None if not found
+        """
+        with self.lock:
+            conn = self._connect()
+            conversation = self._read_header(conn, conversation_id)
+            if conversation is None:
+                return None
+            count = conversation.pop("message_count")
+            conversation["messages"] = self._read_messages(conn, conversation_id, 0, count)
+        unpack_messages(conversation["messages"], self.blobs)
+        return conversation
+
+    def get_conversation_header(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a conversation's fields without its messages.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+
+        Returns:
+            Conversation dict with 'message_count' instead of 'messages',
+            or None if not found
+        """
+        with self.lock:
+            return self._read_header(self._connect(), conversation_id)
+
+    def get_messages(
+        self,
+        conversation_id: str,
+        start: Optional[int] = None,
+        stop: Optional[int] = None,
+        texts: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load a slice of a conversation's messages with a position range query.
+
+        Args:
+            conversation_id: Unique identifier for the conversation
+            start: First index (slice semantics)
+            stop: End index, exclusive (slice semantics)
+            texts: Load stage texts; if False, messages stay packed, with
+                their text lengths
+
+        Returns:
+            Dict with 'messages', 'offset' and 'total', or None if not found
+        """
+        with self.lock:
+            conn = self._connect()
+            header = self._read_header(conn, conversation_id)
+            if header is None:
+                return None
+            total = header["message_count"]
+            first, last, _ = slice(start, stop).indices(total)
+            messages = self._read_messages(conn, conversation_id, first, last) if first < last else []
+        (unpack_messages if texts else add_text_lengths)(messages, self.blobs)
+        return {"messages": messages, "offset": first, "total": total}
+
+    def save_conversation(self, conversation: Dict[str, Any]):
+        """
+        Save a full conversation, replacing any stored version.
+
+        Args:
+            conversation: Conversation dict to save (an 'updated_at' key, if
+                present, sets the last-activity time)
+        """
+        messages = pack_messages(conversation.get("messages", []), self.blobs)
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM conversations WHERE id = ?", (conversation["id"],))
+                self._insert_conversation(conn, conversation)
+                for position, message in enumerate(messages):
+                    self._insert_message(conn, conversation["id"], position, message)
+                # Keep an imported conversation's own last-activity time
+                conn.execute(
+                    "UPDATE conversations SET updated_at = ? WHERE id = ?",
+                    (conversation.get("updated_at", conversation["created_at"]), conversation["id"])
+                )
+
+    def list_conversations_page(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: str = "created_at",
+        descending: bool = True
+    ) -> Dict[str, Any]:
+        """
+        List one page of conversation metadata.
+
+        Args:
+            limit: Page size, or None for all remaining conversations
+            cursor: Cursor from a previous page's 'next_cursor'
+            sort: Field to sort by (see index.SORT_FIELDS)
+            descending: Largest/newest first
+
+        Returns:
+            Dict with 'conversations' and 'next_cursor'
+        """
+        with self.lock:
+            return fetch_page(self._connect(), "conversations", limit, cursor, sort, descending)
+
+    def apply_changes(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        fields: Dict[str, Any]
+    ):
+        """
+        Append messages and update fields in one transaction.
+
+        Args:
+            conversation_id: Conversation identifier
+            messages: Message records to append, in order
+            fields: New values for any of UPDATABLE_FIELDS
+        """
+        columns = {
+            name: serialization.dumps(value) if name == "council_models" else value
+            for name, value in fields.items()
+            if name in UPDATABLE_FIELDS
+        }
+        messages = pack_messages(messages, self.blobs)
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                position = self._require(conn, conversation_id)
+                for message in messages:
+                    self._insert_message(conn, conversation_id, position, message)
+                    position += 1
+                columns["updated_at"] = datetime.utcnow().isoformat()
+                assignments = [f"{name} = ?" for name in columns]
+                if fields:
+                    assignments.append("edits = edits + 1")
+                conn.execute(
+                    f"UPDATE conversations SET {', '.join(assignments)} WHERE id = ?",
+                    [*columns.values(), conversation_id]
+                )
+
+    def prune_blobs(self) -> int:
+        """
+        Delete stage-text blobs that no stored message references.
+
+        Returns:
+            Number of blobs deleted
+        """
+        started_at = time.time()
+        with self.lock:
+            rows = self._connect().execute(
+                "SELECT data FROM stage_results WHERE stage IN (1, 2)"
+            ).fetchall()
+        live = set()
+        for (data,) in rows:
+            live |= result_keys(serialization.loads(data))
+        return self.blobs.prune(live, started_at)
+
+    def get_conversation_models(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Get the model configuration for a conversation.
+
+        Args:
+            conversation_id: Conversation identifier
+
+        Returns:
+            Dict with 'council_models', 'chairman_model' and 'preset_id' keys
+        """
+        with self.lock:
+            row = self._connect().execute(
+                "SELECT council_models, chairman_model, preset_id FROM conversations WHERE id = ?",
+                (conversation_id,)
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+        return {
+            "council_models": serialization.loads(row[0]),
+            "chairman_model": row[1],
+            "preset_id": row[2]
+        }
+
+    def delete_conversation(self, conversation_id: str):
+        """
+        Delete a conversation and its messages.
+
+        Args:
+            conversation_id: Conversation identifier
+
+        Raises:
+            ValueError: If conversation not found
+        """
+        with self.lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+        if cursor.rowcount == 0:
+            raise ValueError(f"Conversation {conversation_id} not found")
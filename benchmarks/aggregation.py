@@ -0,0 +1,97 @@
+"""
+Speed of stage 2 rank aggregation.
+
+Times every method in backend.aggregation on councils of several sizes
+(members rank each other's answers, some leaving entries out), then
+re-aggregates a batch of stored-style turns the way a migration to a new
+method would:
+
+    python -m benchmarks.aggregation [--sizes 4,10,30,60] [--turns N] [--repeat N]
+
+numpy is used for large councils when it is installed; the header says
+whether it was found.
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from backend import aggregation
+from backend.council import calculate_aggregate_rankings
+from backend.ranking import response_labels
+
+
+def council_rankings(size: int, rng: random.Random, partial: float = 0.2) -> List[List[str]]:
+    """Rankings from `size` members of `size` answers around a shared opinion."""
+    models = [f"model-{i}" for i in range(size)]
+    quality = {model: rng.random() for model in models}
+    rankings = []
+    for _ in models:
+        noisy = sorted(models, key=lambda m: quality[m] + rng.gauss(0, 0.3), reverse=True)
+        if rng.random() < partial:
+            noisy = noisy[:rng.randint(1, size - 1)]
+        rankings.append(noisy)
+    return rankings
+
+
+def stored_turn(rng: random.Random, size: int = 4) -> Dict[str, Any]:
+    """A message's stage 2 results and label mapping, as stored."""
+    labels = response_labels(size)
+    label_to_model = {label: f"model-{i}" for i, label in enumerate(labels)}
+    stage2 = []
+    for i in range(size):
+        order = labels[:]
+        rng.shuffle(order)
+        stage2.append({"model": f"model-{i}", "ranking": "", "parsed_ranking": order})
+    return {"stage2": stage2, "metadata": {"label_to_model": label_to_model}}
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> float:
+    """Best wall time of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rank aggregation methods.")
+    parser.add_argument("--sizes", default="4,10,30,60", help="Council sizes to time")
+    parser.add_argument("--turns", type=int, default=5000, help="Stored turns to re-aggregate")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sizes = [int(size) for size in args.sizes.split(",")]
+    print(f"numpy: {'yes' if aggregation.np is not None else 'no'}\n")
+
+    print(f"{'members':>8} " + " ".join(f"{method:>10}" for method in aggregation.METHODS) + "   (ms per turn)")
+    for size in sizes:
+        candidates = [f"model-{i}" for i in range(size)]
+        rankings = council_rankings(size, rng)
+        times = [
+            _measure(lambda: aggregation.aggregate(rankings, candidates, method), args.repeat)
+            for method in aggregation.METHODS
+        ]
+        print(f"{size:>8} " + " ".join(f"{seconds * 1000:>10.3f}" for seconds in times))
+
+    turns = [stored_turn(rng) for _ in range(args.turns)]
+    print(f"\nRe-aggregating {args.turns} stored 4-member turns (s):")
+    for method in aggregation.METHODS:
+        seconds = _measure(
+            lambda: [
+                calculate_aggregate_rankings(
+                    turn["stage2"], turn["metadata"]["label_to_model"], method
+                )
+                for turn in turns
+            ],
+            max(1, args.repeat // 10)
+        )
+        print(f"{method:>10} {seconds:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Prompt token budgets: estimator accuracy and chairman prompt trimming.
+
+First compares backend.budget.estimate_tokens and the old four-characters-
+per-token rule with a real tokenizer (tiktoken's o200k_base, when the
+package and its vocabulary are available) on this repository's own text and
+on synthetic council answers. Then builds stage 3 prompts for councils of
+several sizes through backend.council.stage3_synthesize_final (the chairman
+is simulated) and reports, per budget policy, the prompt's estimated tokens
+before and after fitting, how much of the top-ranked answer survived, and
+the time spent fitting:
+
+    python -m benchmarks.budget [--sizes 4,8,12] [--budget 12000] [--sections 8]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from pathlib import Path
+from typing import Dict
+
+import httpx
+
+from backend import budget, openrouter
+from backend.cache import cache_bypass
+from backend.council import stage3_synthesize_final
+from benchmarks.serialization import _paragraph, _evaluation
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+CHAIRMAN = "google/gemini-3-pro-preview"
+QUERY = "How should I choose between a cache and an index for query latency?"
+
+
+def _answer(rng: random.Random, sections: int) -> str:
+    parts = []
+    for _ in range(sections):
+        parts.append(f"## {_paragraph(rng, 4).title()}\n\n{_paragraph(rng, 90)}. {_paragraph(rng, 40)}.")
+        parts.append("\n".join(f"- **{_paragraph(rng, 2)}**: {_paragraph(rng, 15)}." for _ in range(3)))
+    parts.append("```python\ndef solve(data):\n    return sorted(data)\n```")
+    return "\n\n".join(parts)
+
+
+def _encoding():
+    """o200k_base, or None if tiktoken or its vocabulary (downloaded on first use) is unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def compare_estimators(texts: Dict[str, str]):
+    encoding = _encoding()
+    if encoding is None:
+        print("tiktoken (o200k_base) unavailable: showing estimates only\n")
+    print(f"{'text':<22} {'chars':>8} {'tokens':>8} {'estimate':>9} {'chars/4':>8} {'MB/s':>7}")
+    for name, text in texts.items():
+        start = time.perf_counter()
+        estimate = budget.estimate_tokens(text)
+        speed = len(text) / max(time.perf_counter() - start, 1e-9) / 1e6
+        actual = len(encoding.encode(text)) if encoding else None
+        row = f"{name:<22} {len(text):>8,} {actual if actual else '-':>8} "
+        if actual:
+            row += f"{estimate / actual - 1:>+9.1%} {len(text) // 4 / actual - 1:>+8.1%}"
+        else:
+            row += f"{estimate:>9,} {len(text) // 4:>8,}"
+        print(f"{row} {speed:>7.1f}")
+    print()
+
+
+async def fit_stage3(size: int, sections: int, max_prompt_tokens: int, rng: random.Random):
+    async def chairman(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"choices": [{"message": {"content": "synthesis"}}]})
+
+    openrouter._client = httpx.AsyncClient(transport=httpx.MockTransport(chairman))
+    cache_bypass.set(True)
+    models = [f"model-{i}" for i in range(size)]
+    stage1 = [{"model": model, "response": _answer(rng, sections)} for model in models]
+    stage2 = [{"model": model, "ranking": _evaluation(rng)} for model in models]
+    ranking = [{"model": model} for model in models]
+
+    for policy in budget.POLICIES:
+        metadata: Dict = {}
+        start = time.perf_counter()
+        await stage3_synthesize_final(
+            QUERY, stage1, stage2, CHAIRMAN,
+            budget_policy={"policy": policy, "keep_top": 2, "max_prompt_tokens": max_prompt_tokens},
+            aggregate_rankings=ranking, metadata=metadata
+        )
+        seconds = time.perf_counter() - start
+        report = metadata["prompt_budget"]["stage3"]
+        kept = {entry["name"]: entry["kept"] / entry["tokens"] for entry in report.get("trimmed", [])}
+        print(
+            f"{size:>8} {policy:<13} {report.get('original_tokens', report['tokens']):>9,} "
+            f"{report['tokens']:>8,} {len(kept):>8} {kept.get(models[0], 1.0):>9.0%} "
+            f"{kept.get(models[-1], 1.0):>9.0%} {seconds * 1000:>8.1f}"
+        )
+    await openrouter._client.aclose()
+
+
+async def main_async(args: argparse.Namespace):
+    rng = random.Random(0)
+    root = Path(__file__).resolve().parent.parent
+    texts = {
+        "README.md": (root / "README.md").read_text(),
+        "backend/council.py": (root / "backend" / "council.py").read_text(),
+        "synthetic answer": _answer(rng, args.sections),
+        "synthetic evaluation": _evaluation(rng),
+    }
+    compare_estimators(texts)
+
+    print(f"Stage 3 prompt fitted to {args.budget:,} tokens (model-0 ranked first):")
+    print(f"{'members':>8} {'policy':<13} {'estimated':>9} {'fitted':>8} {'trimmed':>8} {'top kept':>9} {'last kept':>9} {'ms':>8}")
+    for size in args.sizes:
+        await fit_stage3(size, args.sections, args.budget, rng)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt token budgeting.")
+    parser.add_argument("--sizes", default="4,8,12", help="Council sizes")
+    parser.add_argument("--budget", type=int, default=12000, help="max_prompt_tokens for the chairman")
+    parser.add_argument("--sections", type=int, default=8, help="Sections per synthetic answer")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
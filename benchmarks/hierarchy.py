@@ -0,0 +1,116 @@
+"""
+Prompt size and wall-clock time of large councils.
+
+Runs backend.council.run_full_council against a simulated OpenRouter whose
+calls take longer the more they read and write, and compares a flat
+council, a flat council with fast (ranking-only) stage 2 answers, a flat
+council with sharded stage 2 review, and hierarchical sub-councils, for
+councils of several sizes:
+
+    python -m benchmarks.hierarchy [--sizes 8,12,16,20] [--group-size 5] [--scale 1.0]
+
+Latency per call is 0.05 s plus 1 us per prompt character plus 80 us per
+answer character (times --scale), roughly the ratio of prefill to decoding
+speed. Answers and syntheses are 3000 characters; stage 2 answers are 400
+characters per response evaluated, or 60 per response in fast mode. The
+response cache is bypassed.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from backend import openrouter
+from backend.cache import cache_bypass
+from backend.config import AVAILABLE_MODELS
+from backend.council import run_full_council
+
+ANSWER_CHARS = 3000
+EVALUATION_CHARS_PER_RESPONSE = 400
+FAST_RANKING_LINE_CHARS = 60
+SYNTHESIS_CHARS = 3000
+
+
+class SimulatedOpenRouter:
+    """MockTransport handler that sleeps in proportion to prompt and answer size."""
+
+    def __init__(self, scale: float):
+        self.scale = scale
+        self.prompts: List[int] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        prompt = body["messages"][-1]["content"]
+        shown = re.findall(r"^(Response [A-Z]+):$", prompt, re.MULTILINE)
+        if "Chairman" in prompt:
+            text = "s" * SYNTHESIS_CHARS
+        elif shown and "Do not write an evaluation" in prompt:
+            text = "FINAL RANKING:\n" + "\n".join(
+                f"{i}. {label} - ".ljust(FAST_RANKING_LINE_CHARS, "r") for i, label in enumerate(shown, start=1)
+            )
+        elif shown:
+            ranking = "\n".join(f"{i}. {label}" for i, label in enumerate(shown, start=1))
+            text = "e" * EVALUATION_CHARS_PER_RESPONSE * len(shown) + "\n\nFINAL RANKING:\n" + ranking
+        else:
+            text = f"{body['model']} " + "a" * ANSWER_CHARS
+        self.prompts.append(len(prompt))
+        await asyncio.sleep(self.scale * (0.05 + 1e-6 * len(prompt) + 8e-5 * len(text)))
+        return httpx.Response(200, json={"choices": [{"message": {"content": text}}]})
+
+
+async def run_case(models: List[str], chairman: str, scale: float, **policies: Any) -> Dict[str, float]:
+    """Run one council turn and measure it."""
+    simulated = SimulatedOpenRouter(scale)
+    openrouter._client = httpx.AsyncClient(transport=httpx.MockTransport(simulated))
+    cache_bypass.set(True)
+    start = time.perf_counter()
+    _, _, stage3, _ = await run_full_council("How do I pick a database?", models, chairman, **policies)
+    seconds = time.perf_counter() - start
+    await openrouter._client.aclose()
+    assert not stage3["response"].startswith("Error"), stage3
+    return {
+        "seconds": seconds,
+        "calls": len(simulated.prompts),
+        "max_prompt": max(simulated.prompts),
+        "total_prompt": sum(simulated.prompts),
+    }
+
+
+async def main_async(args: argparse.Namespace):
+    # Text models only, in provider order
+    pool = [m for m in AVAILABLE_MODELS if "image" not in m and ":free" not in m]
+    chairman = "google/gemini-3-pro-preview"
+    cases = {
+        "flat": {},
+        "fast ranking": {"ranking_policy": {"mode": "fast"}},
+        "sharded": {"review_policy": {"sharded": True, "pair_coverage": 2, "min_responses": 6}},
+        "hierarchical": {"hierarchy_policy": {"enabled": True, "group_size": args.group_size, "min_members": 0}},
+    }
+    print(f"{'members':>8} {'mode':<13} {'seconds':>8} {'calls':>6} {'max prompt':>11} {'all prompts':>12}")
+    for size in args.sizes:
+        models = pool[:size]
+        for name, policies in cases.items():
+            result = await run_case(models, chairman, args.scale, **policies)
+            print(
+                f"{size:>8} {name:<13} {result['seconds']:>8.2f} {result['calls']:>6} "
+                f"{result['max_prompt']:>11,} {result['total_prompt']:>12,}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark large council layouts.")
+    parser.add_argument("--sizes", default="8,12,16,20", help="Council sizes")
+    parser.add_argument("--group-size", type=int, default=5, help="Sub-council size")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for simulated latency")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in args.sizes.split(",")]
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
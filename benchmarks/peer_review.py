@@ -0,0 +1,95 @@
+"""
+Cost and accuracy of sharded stage 2 review.
+
+For councils of several sizes, compares full review (every member ranks
+every answer) with the block designs from backend.peer_review: answers per
+reviewer, the pair coverage reached, total answers pasted into stage 2
+prompts, and how close the aggregate ranking gets to the true order when
+reviewers judge noisily (Kendall tau, averaged over trials). The last
+column aggregates the sharded rankings without their scopes, as if each
+reviewer had ranked the answers it was not shown below the rest; with
+--dropped reviewers failing each turn, the design is no longer balanced and
+the difference shows:
+
+    python -m benchmarks.peer_review [--sizes 6,8,10,12,16,20] [--coverage 2]
+        [--trials N] [--dropped N] [--method borda]
+"""
+
+import argparse
+import random
+from itertools import combinations
+from typing import List, Optional
+
+from backend import aggregation
+from backend.peer_review import design_blocks, min_pair_coverage
+
+
+def kendall_tau(order: List[str], truth: List[str]) -> float:
+    """Rank correlation of two orders of the same items (1 = identical)."""
+    position = {item: i for i, item in enumerate(order)}
+    pairs = list(combinations(truth, 2))
+    concordant = sum(1 if position[a] < position[b] else -1 for a, b in pairs)
+    return concordant / len(pairs)
+
+
+def review(
+    models: List[str],
+    quality: dict,
+    blocks: Optional[List[List[int]]],
+    rng: random.Random,
+    noise: float
+):
+    """Noisy rankings (and scopes) from every member, shown its block or everything."""
+    rankings, scopes = [], []
+    for reviewer in range(len(models)):
+        shown = [models[i] for i in blocks[reviewer]] if blocks else models
+        rankings.append(sorted(shown, key=lambda m: quality[m] + rng.gauss(0, noise), reverse=True))
+        scopes.append(shown)
+    return rankings, scopes if blocks else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sharded stage 2 review.")
+    parser.add_argument("--sizes", default="6,8,10,12,16,20", help="Council sizes")
+    parser.add_argument("--coverage", type=int, default=2, help="Reviewers per pair of answers")
+    parser.add_argument("--trials", type=int, default=200, help="Simulated turns per size")
+    parser.add_argument("--noise", type=float, default=0.25, help="Reviewer judgement noise")
+    parser.add_argument("--dropped", type=int, default=0, help="Reviewers failing per turn")
+    parser.add_argument("--method", default="average", choices=aggregation.METHODS)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(
+        f"{'members':>8} {'shown':>6} {'pairs':>6} {'answers in prompts':>19} "
+        f"{'tau full':>9} {'tau sharded':>12} {'no scopes':>10}"
+    )
+    for size in [int(size) for size in args.sizes.split(",")]:
+        models = [f"model-{i}" for i in range(size)]
+        blocks = design_blocks(size, tuple(range(size)), args.coverage)
+        if blocks is None:
+            print(f"{size:>8}   full review only")
+            continue
+        taus = {"full": 0.0, "sharded": 0.0, "no scopes": 0.0}
+        for _ in range(args.trials):
+            quality = {model: rng.random() for model in models}
+            truth = sorted(models, key=quality.get, reverse=True)
+            answered = sorted(rng.sample(range(size), size - min(args.dropped, size - 2)))
+            for name, design in (("full", None), ("sharded", blocks)):
+                rankings, scopes = review(models, quality, design, rng, args.noise)
+                rankings = [rankings[i] for i in answered]
+                scopes = [scopes[i] for i in answered] if scopes else None
+                entries, _ = aggregation.aggregate(rankings, models, args.method, scopes)
+                taus[name] += kendall_tau([e["model"] for e in entries], truth) / args.trials
+                if scopes:
+                    entries, _ = aggregation.aggregate(rankings, models, args.method)
+                    taus["no scopes"] += kendall_tau([e["model"] for e in entries], truth) / args.trials
+        shown = sum(len(block) for block in blocks)
+        print(
+            f"{size:>8} {len(blocks[0]):>6} {min_pair_coverage(blocks, size):>6} "
+            f"{shown:>7} / {size * size:<5} ({shown / (size * size):>4.0%}) "
+            f"{taus['full']:>9.3f} {taus['sharded']:>12.3f} {taus['no scopes']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Accuracy and speed of stage 2 ranking extraction.
+
+Runs the parser in backend.ranking and the original regex parser over
+
+  - CASES: hand-written answers showing the format deviations seen from
+    council members, each with the ranking a reader would take from it, and
+  - a synthetic corpus of full-length evaluations written in randomly
+    chosen styles (clean, markdown, lower-case heading, inline list, JSON,
+    fast-mode rationales, repeated or omitted labels, councils larger
+    than 26):
+
+    python -m benchmarks.ranking [--corpus N] [--repeat N]
+
+Exits non-zero if backend.ranking gets any of CASES wrong.
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from backend.ranking import extract_ranking, response_labels
+
+LABELS_4 = response_labels(4)
+
+CASES = [
+    {
+        "name": "clean",
+        "text": "Response A is thorough.\nResponse B is brief.\n\nFINAL RANKING:\n"
+                "1. Response A\n2. Response C\n3. Response B\n4. Response D",
+        "expected": ["Response A", "Response C", "Response B", "Response D"],
+    },
+    {
+        "name": "bold labels",
+        "text": "FINAL RANKING:\n1. **Response B**\n2. **Response A**\n3. **Response D**\n4. **Response C**",
+        "expected": ["Response B", "Response A", "Response D", "Response C"],
+    },
+    {
+        "name": "bold heading",
+        "text": "Evaluation...\n\n**FINAL RANKING:**\n1. Response D\n2. Response C\n3. Response B\n4. Response A",
+        "expected": ["Response D", "Response C", "Response B", "Response A"],
+    },
+    {
+        "name": "markdown heading, lower case",
+        "text": "## Final Ranking\n\n1. Response C\n2. Response A\n3. Response D\n4. Response B",
+        "expected": ["Response C", "Response A", "Response D", "Response B"],
+    },
+    {
+        "name": "inline list",
+        "text": "FINAL RANKING: 1. Response B 2. Response C 3. Response A 4. Response D",
+        "expected": ["Response B", "Response C", "Response A", "Response D"],
+    },
+    {
+        "name": "parenthesis numbering",
+        "text": "FINAL RANKING:\n1) Response A\n2) Response D\n3) Response B\n4) Response C",
+        "expected": ["Response A", "Response D", "Response B", "Response C"],
+    },
+    {
+        "name": "bullets",
+        "text": "FINAL RANKING:\n- Response C\n- Response B\n- Response A\n- Response D",
+        "expected": ["Response C", "Response B", "Response A", "Response D"],
+    },
+    {
+        "name": "explanations after labels",
+        "text": "FINAL RANKING:\n1. Response B - most complete, beats Response A on depth\n"
+                "2. Response A - accurate\n3. Response D\n4. Response C",
+        "expected": ["Response B", "Response A", "Response D", "Response C"],
+    },
+    {
+        "name": "heading echoed in the evaluation",
+        "text": "Before my FINAL RANKING: note that Response D is off-topic.\n\nResponse A ...\n\n"
+                "FINAL RANKING:\n1. Response A\n2. Response B\n3. Response C\n4. Response D",
+        "expected": ["Response A", "Response B", "Response C", "Response D"],
+    },
+    {
+        "name": "note after the ranking",
+        "text": "FINAL RANKING:\n1. Response C\n2. Response D\n3. Response A\n4. Response B\n\n"
+                "This final ranking reflects accuracy first.",
+        "expected": ["Response C", "Response D", "Response A", "Response B"],
+    },
+    {
+        "name": "duplicate entry",
+        "text": "FINAL RANKING:\n1. Response B\n2. Response A\n3. Response B\n4. Response C\n5. Response D",
+        "expected": ["Response B", "Response A", "Response C", "Response D"],
+    },
+    {
+        "name": "one entry missing",
+        "text": "FINAL RANKING:\n1. Response D\n2. Response B\n3. Response A",
+        "expected": ["Response D", "Response B", "Response A", "Response C"],
+    },
+    {
+        "name": "two entries missing (kept partial)",
+        "text": "FINAL RANKING:\n1. Response D\n2. Response B",
+        "expected": ["Response D", "Response B"],
+    },
+    {
+        "name": "unknown label",
+        "text": "FINAL RANKING:\n1. Response E\n2. Response A\n3. Response B\n4. Response C\n5. Response D",
+        "expected": ["Response A", "Response B", "Response C", "Response D"],
+    },
+    {
+        "name": "no heading",
+        "text": "Overall I'd put Response C first, then Response A, Response D and Response B.",
+        "expected": ["Response C", "Response A", "Response D", "Response B"],
+    },
+    {
+        "name": "label followed by possessive",
+        "text": "FINAL RANKING:\n1. Response A's answer\n2. Response B\n3. Response C\n4. Response D",
+        "expected": ["Response A", "Response B", "Response C", "Response D"],
+    },
+    {
+        "name": "structured output",
+        "text": json.dumps({"evaluation": "Response A is best.", "ranking": ["Response A", "Response D", "Response C", "Response B"]}),
+        "expected": ["Response A", "Response D", "Response C", "Response B"],
+    },
+    {
+        "name": "structured output in a code fence, bare letters",
+        "text": '```json\n{"evaluation": "...", "ranking": ["B", "C", "D", "A"]}\n```',
+        "expected": ["Response B", "Response C", "Response D", "Response A"],
+    },
+    {
+        "name": "fast mode with rationales",
+        "text": "FINAL RANKING:\n1. Response C - most complete, Response A is close\n2. Response A - accurate\n"
+                "3. Response D - vague\n4. Response B - wrong about the edge case",
+        "expected": ["Response C", "Response A", "Response D", "Response B"],
+    },
+    {
+        "name": "structured fast output with notes",
+        "text": json.dumps({"ranking": ["Response D", "Response A", "Response B", "Response C"],
+                            "notes": ["best", "close second to Response D", "thin", "off-topic"]}),
+        "expected": ["Response D", "Response A", "Response B", "Response C"],
+    },
+    {
+        "name": "nothing to parse",
+        "text": "I cannot rank these responses.",
+        "expected": [],
+    },
+    {
+        "name": "28 responses",
+        "labels": response_labels(28),
+        "text": "FINAL RANKING:\n" + "\n".join(
+            f"{i}. {label}" for i, label in enumerate(reversed(response_labels(28)), start=1)
+        ),
+        "expected": list(reversed(response_labels(28))),
+    },
+]
+
+
+def legacy_parse(ranking_text: str, labels: Optional[List[str]] = None) -> List[str]:
+    """The parser stage 2 used before backend.ranking (labels are ignored)."""
+    if "FINAL RANKING:" in ranking_text:
+        parts = ranking_text.split("FINAL RANKING:")
+        if len(parts) >= 2:
+            ranking_section = parts[1]
+            numbered_matches = re.findall(r'\d+\.\s*Response [A-Z]', ranking_section)
+            if numbered_matches:
+                return [re.search(r'Response [A-Z]', m).group() for m in numbered_matches]
+            return re.findall(r'Response [A-Z]', ranking_section)
+    return re.findall(r'Response [A-Z]', ranking_text)
+
+
+def current_parse(text: str, labels: Optional[List[str]] = None) -> List[str]:
+    return extract_ranking(text, labels)["ranking"]
+
+
+PARSERS: Dict[str, Callable[[str, Optional[List[str]]], List[str]]] = {
+    "legacy": legacy_parse,
+    "backend.ranking": current_parse,
+}
+
+WORDS = (
+    "accurate thorough misses detail clear concise example edge case overall "
+    "structure depth correct incomplete reasoning strong weak"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+
+
+def _styled(rng: random.Random, labels: List[str], order: List[str]) -> str:
+    """Write an evaluation of `labels` ending in `order`, in a random style."""
+    notes = "\n\n".join(f"{label} {_sentence(rng)} {_sentence(rng)}" for label in labels)
+    style = rng.choice(["clean", "bold", "heading", "inline", "bullets", "json", "fast", "duplicate", "omit_last"])
+    if style == "json":
+        return json.dumps({"evaluation": notes, "ranking": order})
+    if style == "fast":
+        # Fast ranking mode: no evaluation, a one-line reason per entry
+        return "FINAL RANKING:\n" + "\n".join(
+            f"{i}. {label} - {_sentence(rng)}" for i, label in enumerate(order, start=1)
+        )
+    if style == "bold":
+        lines = "\n".join(f"{i}. **{label}**" for i, label in enumerate(order, start=1))
+        return f"{notes}\n\n**FINAL RANKING:**\n{lines}"
+    if style == "heading":
+        lines = "\n".join(f"{i}. {label}" for i, label in enumerate(order, start=1))
+        return f"{notes}\n\n### Final ranking\n{lines}"
+    if style == "inline":
+        return f"{notes}\n\nFINAL RANKING: " + " ".join(
+            f"{i}. {label}" for i, label in enumerate(order, start=1)
+        )
+    if style == "bullets":
+        return f"{notes}\n\nFINAL RANKING:\n" + "\n".join(f"- {label}" for label in order)
+    entries = list(order)
+    if style == "duplicate":
+        # Repeated after its real position, as models do when restating one
+        repeated = rng.randrange(len(order))
+        entries.insert(rng.randint(repeated + 1, len(entries)), order[repeated])
+    elif style == "omit_last":
+        entries = entries[:-1]
+    lines = "\n".join(f"{i}. {label}" for i, label in enumerate(entries, start=1))
+    return f"{notes}\n\nFINAL RANKING:\n{lines}"
+
+
+def corpus(size: int, seed: int = 0) -> List[Dict]:
+    """Build `size` synthetic answers with their true rankings."""
+    rng = random.Random(seed)
+    items = []
+    for _ in range(size):
+        labels = response_labels(rng.choice([3, 4, 4, 4, 5, 8, 30]))
+        order = labels[:]
+        rng.shuffle(order)
+        items.append({"text": _styled(rng, labels, order), "labels": labels, "expected": order})
+    return items
+
+
+def _measure(func: Callable[[], object], repeat: int) -> float:
+    """Best wall time of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark stage 2 ranking extraction.")
+    parser.add_argument("--corpus", type=int, default=2000, help="Synthetic answers to parse")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per timing (best is reported)")
+    args = parser.parse_args()
+
+    items = corpus(args.corpus)
+    failures = []
+
+    print(f"{'parser':<18} {'cases':>8} {'corpus':>8} {'us/answer':>10}")
+    for name, parse in PARSERS.items():
+        case_hits = 0
+        for case in CASES:
+            got = parse(case["text"], case.get("labels", LABELS_4))
+            if got == case["expected"]:
+                case_hits += 1
+            elif name == "backend.ranking":
+                failures.append((case["name"], got))
+        corpus_hits = sum(parse(i["text"], i["labels"]) == i["expected"] for i in items)
+        seconds = _measure(lambda: [parse(i["text"], i["labels"]) for i in items], args.repeat)
+        print(
+            f"{name:<18} {case_hits:>4}/{len(CASES):<3} {corpus_hits / len(items):>8.1%} "
+            f"{seconds / len(items) * 1e6:>10.1f}"
+        )
+
+    for case_name, got in failures:
+        print(f"FAILED {case_name}: {got}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Micro-benchmark for JSON encoding of council messages.
+
+Compares the encoders storage and SSE can use on a synthetic conversation
+shaped like real ones (4 council models, markdown answers, stage 2
+evaluations, aggregate rankings):
+
+    python -m benchmarks.serialization [--turns N] [--repeat N]
+
+orjson rows are skipped when the package is not installed.
+"""
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from backend import serialization
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MODELS = [
+    "openai/gpt-5.2",
+    "anthropic/claude-opus-4.5",
+    "google/gemini-3-pro-preview",
+    "x-ai/grok-4",
+]
+
+WORDS = (
+    "the model answer because however approach example function value data "
+    "consider important detail overall summary accuracy clarity depth trade-off "
+    "latency throughput cache index query response évaluation naïve café 数据"
+).split()
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _answer(rng: random.Random) -> str:
+    sections = []
+    for _ in range(4):
+        sections.append(f"## {_paragraph(rng, 4).title()}\n\n{_paragraph(rng, 90)}")
+        sections.append("\n".join(f"- **{_paragraph(rng, 2)}**: {_paragraph(rng, 15)}" for _ in range(3)))
+    sections.append("```python\ndef solve(data):\n    return sorted(data)\n```")
+    return "\n\n".join(sections)
+
+
+def _evaluation(rng: random.Random) -> str:
+    labels = ["A", "B", "C", "D"]
+    notes = "\n\n".join(f"Response {label} {_paragraph(rng, 60)}" for label in labels)
+    rng.shuffle(labels)
+    ranking = "\n".join(f"{i}. Response {label}" for i, label in enumerate(labels, start=1))
+    return f"{notes}\n\nFINAL RANKING:\n{ranking}"
+
+
+def council_message(rng: random.Random) -> Dict[str, Any]:
+    """Build one assistant message with all three stages and metadata."""
+    label_to_model = {f"Response {chr(65 + i)}": model for i, model in enumerate(MODELS)}
+    return {
+        "role": "assistant",
+        "stage1": [{"model": model, "response": _answer(rng)} for model in MODELS],
+        "stage2": [
+            {
+                "model": model,
+                "ranking": _evaluation(rng),
+                "parsed_ranking": ["Response C", "Response A", "Response B", "Response D"],
+            }
+            for model in MODELS
+        ],
+        "stage3": {"model": MODELS[2], "response": _answer(rng)},
+        "metadata": {
+            "label_to_model": label_to_model,
+            "aggregate_rankings": [
+                {"model": model, "average_rank": round(1 + i * 0.75, 2), "rankings_count": 4}
+                for i, model in enumerate(MODELS)
+            ],
+        },
+    }
+
+
+def conversation(turns: int, seed: int = 0) -> Dict[str, Any]:
+    """Build a conversation with `turns` user/assistant exchanges."""
+    rng = random.Random(seed)
+    messages: List[Dict[str, Any]] = []
+    for _ in range(turns):
+        messages.append({"role": "user", "content": _paragraph(rng, 30)})
+        messages.append(council_message(rng))
+    return {
+        "id": "benchmark",
+        "created_at": "2025-01-01T00:00:00",
+        "title": "Benchmark conversation",
+        "messages": messages,
+    }
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> float:
+    """Best wall time of `repeat` runs, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoders on council messages.")
+    parser.add_argument("--turns", type=int, default=50, help="Exchanges in the test conversation")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per case (best is reported)")
+    args = parser.parse_args()
+
+    data = conversation(args.turns)
+    events = [
+        {"type": "stage1_complete", "data": message["stage1"], "metadata": message["metadata"]}
+        for message in data["messages"] if message["role"] == "assistant"
+    ]
+
+    encoders = {
+        "json indent=2 (old storage)": lambda obj: json.dumps(obj, indent=2),
+        "json default (old SSE)": json.dumps,
+        "json compact": lambda obj: json.dumps(obj, separators=(",", ":")),
+        "json compact, ensure_ascii=False": lambda obj: json.dumps(obj, separators=(",", ":"), ensure_ascii=False),
+    }
+    decoders = {"json": json.loads}
+    if orjson is not None:
+        encoders["orjson"] = orjson.dumps
+        decoders["orjson"] = orjson.loads
+
+    size = len(serialization.dumps_bytes(data))
+    print(f"Conversation: {args.turns} turns, {size / 1e6:.2f} MB compact; "
+          f"backend.serialization uses {serialization.ENCODER}\n")
+
+    print(f"{'encode':<34} {'ms':>8} {'MB/s':>8} {'bytes':>10}")
+    for name, encode in encoders.items():
+        seconds = _measure(lambda: encode(data), args.repeat)
+        print(f"{name:<34} {seconds * 1000:>8.2f} {size / seconds / 1e6:>8.1f} {len(encode(data)):>10}")
+
+    encoded = json.dumps(data)
+    print(f"\n{'decode':<34} {'ms':>8} {'MB/s':>8}")
+    for name, decode in decoders.items():
+        seconds = _measure(lambda: decode(encoded), args.repeat)
+        print(f"{name:<34} {seconds * 1000:>8.2f} {len(encoded) / seconds / 1e6:>8.1f}")
+
+    print(f"\n{'SSE frames (' + str(len(events)) + ' stage1_complete)':<34} {'ms':>8}")
+    cases = {
+        "f-string + json.dumps": lambda: [f"data: {json.dumps(e)}\n\n".encode("utf-8") for e in events],
+        "serialization.sse_frame": lambda: [serialization.sse_frame(e) for e in events],
+    }
+    for name, build in cases.items():
+        print(f"{name:<34} {_measure(build, args.repeat) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
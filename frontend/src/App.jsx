@@ -4,6 +4,30 @@ import ChatInterface from './components/ChatInterface';
 import { api } from './api';
 import './App.css';
 
+// Append a streamed token delta to the matching model's entry in a stage list
+function appendDelta(entries, event, field) {
+  const list = entries ? [...entries] : [];
+  const index = list.findIndex((entry) => entry.model === event.model);
+  if (index === -1) {
+    list.push({ model: event.model, [field]: event.delta });
+  } else {
+    list[index] = { ...list[index], [field]: list[index][field] + event.delta };
+  }
+  return list;
+}
+
+// Replace a model's streamed entry with its finished result
+function replaceEntry(entries, result) {
+  const list = entries ? [...entries] : [];
+  const index = list.findIndex((entry) => entry.model === result.model);
+  if (index === -1) {
+    list.push(result);
+  } else {
+    list[index] = result;
+  }
+  return list;
+}
+
 function App() {
   const [conversations, setConversations] = useState([]);
   const [currentConversationId, setCurrentConversationId] = useState(null);
@@ -143,6 +167,24 @@ function App() {
             });
             break;
 
+          case 'stage1_delta':
+            setCurrentConversation((prev) => {
+              const messages = [...prev.messages];
+              const lastMsg = messages[messages.length - 1];
+              lastMsg.stage1 = appendDelta(lastMsg.stage1, event, 'response');
+              return { ...prev, messages };
+            });
+            break;
+
+          case 'stage1_model_complete':
+            setCurrentConversation((prev) => {
+              const messages = [...prev.messages];
+              const lastMsg = messages[messages.length - 1];
+              lastMsg.stage1 = replaceEntry(lastMsg.stage1, event.data);
+              return { ...prev, messages };
+            });
+            break;
+
           case 'stage1_complete':
             setCurrentConversation((prev) => {
               const messages = [...prev.messages];
@@ -162,6 +204,24 @@ function App() {
             });
             break;
 
+          case 'stage2_delta':
+            setCurrentConversation((prev) => {
+              const messages = [...prev.messages];
+              const lastMsg = messages[messages.length - 1];
+              lastMsg.stage2 = appendDelta(lastMsg.stage2, event, 'ranking');
+              return { ...prev, messages };
+            });
+            break;
+
+          case 'stage2_model_complete':
+            setCurrentConversation((prev) => {
+              const messages = [...prev.messages];
+              const lastMsg = messages[messages.length - 1];
+              lastMsg.stage2 = replaceEntry(lastMsg.stage2, event.data);
+              return { ...prev, messages };
+            });
+            break;
+
           case 'stage2_complete':
             setCurrentConversation((prev) => {
               const messages = [...prev.messages];
@@ -182,6 +242,18 @@ function App() {
             });
             break;
 
+          case 'stage3_delta':
+            setCurrentConversation((prev) => {
+              const messages = [...prev.messages];
+              const lastMsg = messages[messages.length - 1];
+              lastMsg.stage3 = {
+                model: event.model,
+                response: (lastMsg.stage3?.response || '') + event.delta,
+              };
+              return { ...prev, messages };
+            });
+            break;
+
           case 'stage3_complete':
             setCurrentConversation((prev) => {
               const messages = [...prev.messages];
@@ -107,13 +107,16 @@ export const api = {
 
     const reader = response.body.getReader();
     const decoder = new TextDecoder();
+    // Token deltas are small and frequent, so frames often span read() chunks
+    let buffer = '';
 
     while (true) {
       const { done, value } = await reader.read();
       if (done) break;
 
-      const chunk = decoder.decode(value);
-      const lines = chunk.split('\n');
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
 
       for (const line of lines) {
         if (line.startsWith('data: ')) {
@@ -202,7 +205,7 @@ export const api = {
   /**
    * Update conversation models.
    */
-  async updateConversationModels(conversationId, councilModels, chairmanModel) {
+  async updateConversationModels(conversationId, councilModels, chairmanModel, presetId = null) {
     const response = await fetch(
       `${API_BASE}/api/conversations/${conversationId}/models`,
       {
@@ -213,6 +216,7 @@ export const api = {
         body: JSON.stringify({
           council_models: councilModels,
           chairman_model: chairmanModel,
+          preset_id: presetId,
         }),
       }
     );
@@ -73,7 +73,7 @@ export default function ModelSwitcher({
             // But the UI expects 4 slots.
             setModelEnabled([true, true, true, true]);
             setChairmanModel(models.chairman_model || '');
-            setAppliedPreset(''); // Reset applied preset when loading
+            setAppliedPreset(models.preset_id || '');
         } catch (error) {
             console.error('Failed to load conversation models:', error);
         }
@@ -186,7 +186,8 @@ export default function ModelSwitcher({
             await api.updateConversationModels(
                 conversationId,
                 activeCouncilModels,
-                activeChairman
+                activeChairman,
+                appliedPreset || null
             );
             if (onModelsUpdated) {
                 onModelsUpdated();
@@ -31,7 +31,8 @@ function deAnonymizeText(text, labelToModel) {
   // Replace each "Response X" with the actual model name
   Object.entries(labelToModel).forEach(([label, model]) => {
     const modelShortName = model.split('/')[1] || model;
-    result = result.replace(new RegExp(label, 'g'), `**${modelShortName}**`);
+    // Word boundary so "Response A" doesn't match inside "Response AB"
+    result = result.replace(new RegExp(`${label}\\b`, 'g'), `**${modelShortName}**`);
   });
   return result;
 }
@@ -104,7 +105,7 @@ export default function Stage2({ rankings, labelToModel, aggregateRankings }) {
           <div className="aggregate-list">
             {aggregateRankings.map((agg, index) => (
               <div key={index} className="aggregate-item">
-                <span className="rank-position">#{index + 1}</span>
+                <span className="rank-position">#{agg.rank ?? index + 1}</span>
                 <span className="rank-model">
                   {agg.model.split('/')[1] || agg.model}
                 </span>
@@ -0,0 +1,56 @@
+import asyncio
+
+from backend import council
+
+
+def test_cancelling_a_stage_cancels_its_model_calls(monkeypatch):
+    started, cancelled = [], []
+
+    async def slow_query(model, messages, on_delta=None, params=None):
+        started.append(model)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return {"content": "late"}
+
+    monkeypatch.setattr(council, "query_model", slow_query)
+    models = ["a/one", "b/two", "c/three"]
+
+    async def run():
+        stage = asyncio.create_task(council.collect_with_policy(
+            models, [{"role": "user", "content": "q"}]
+        ))
+        await asyncio.sleep(0.1)
+        stage.cancel()
+        try:
+            await stage
+        except asyncio.CancelledError:
+            pass
+        # Checked before asyncio.run cancels whatever is left on shutdown
+        return sorted(cancelled)
+
+    assert asyncio.run(run()) == models
+    assert sorted(started) == models
+
+
+def test_quorum_cancels_the_remaining_members(monkeypatch):
+    cancelled = []
+
+    async def query(model, messages, on_delta=None, params=None):
+        if model == "slow/model":
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(model)
+                raise
+        return {"content": model}
+
+    monkeypatch.setattr(council, "query_model", query)
+    answered, dropped = asyncio.run(council.collect_with_policy(
+        ["a/one", "b/two", "slow/model"], [], {"quorum": 2}
+    ))
+    assert list(answered) == ["a/one", "b/two"]
+    assert dropped == [{"model": "slow/model", "reason": "quorum_reached"}]
+    assert cancelled == ["slow/model"]
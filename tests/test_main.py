@@ -0,0 +1,135 @@
+import json
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import main, openrouter
+from backend.config import MODEL_PRESETS
+
+PANEL = MODEL_PRESETS["panel"]
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """The app with its data in tmp_path and OpenRouter simulated by `upstream`."""
+    monkeypatch.chdir(tmp_path)
+
+    async def no_prewarm():
+        pass
+
+    monkeypatch.setattr(openrouter, "start_client", no_prewarm)
+    with TestClient(main.app) as client:
+        yield client
+    openrouter._client = None
+
+
+def simulate(handler):
+    openrouter._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def stream_turn(client, content, council_models, chairman_model, preset_id):
+    conversation_id = client.post("/api/conversations", json={}).json()["id"]
+    client.post(f"/api/conversations/{conversation_id}/models", json={
+        "council_models": council_models,
+        "chairman_model": chairman_model,
+        "preset_id": preset_id,
+    })
+    response = client.post(
+        f"/api/conversations/{conversation_id}/message/stream", json={"content": content}
+    )
+    return [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines() if line.startswith("data: ")
+    ]
+
+
+def answer(request, text):
+    """A completion in the form the request asked for (streamed or not)."""
+    if json.loads(request.content).get("stream"):
+        chunk = json.dumps({"choices": [{"delta": {"content": text}}]})
+        return httpx.Response(
+            200, content=f"data: {chunk}\n\ndata: [DONE]\n\n".encode(),
+            headers={"content-type": "text/event-stream"}
+        )
+    return httpx.Response(200, json={"choices": [{"message": {"content": text}}]})
+
+
+def test_hierarchical_stream_reports_failure_when_every_member_fails(client):
+    prompts = []
+
+    def upstream(request):
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        prompts.append(prompt)
+        if "title" in prompt.lower():
+            return answer(request, "Title")
+        return httpx.Response(400, json={"error": {"message": "bad request"}})
+
+    simulate(upstream)
+    events = stream_turn(client, "q", PANEL["council_models"], PANEL["chairman_model"], "panel")
+    stage3 = next(event["data"] for event in events if event["type"] == "stage3_complete")
+    assert stage3 == {"model": "error", "response": "All models failed to respond. Please try again."}
+    assert not any("SUB-COUNCIL SYNTHESES" in prompt for prompt in prompts)
+    assert events[-1]["type"] == "complete"
+
+
+def test_hierarchical_stream_without_chairman_uses_a_sub_council_synthesis(client):
+    models = []
+
+    def upstream(request):
+        body = json.loads(request.content)
+        models.append(body["model"])
+        prompt = body["messages"][-1]["content"]
+        if "Chairman" in prompt:
+            return answer(request, f"synthesis by {body['model']}")
+        if "FINAL RANKING" in prompt:
+            return answer(request, "FINAL RANKING:\n1. Response A")
+        return answer(request, f"answer from {body['model']}")
+
+    simulate(upstream)
+    events = stream_turn(client, "q", PANEL["council_models"], "", "panel")
+    stage3 = next(event["data"] for event in events if event["type"] == "stage3_complete")
+    assert stage3["response"] == f"synthesis by {stage3['model']}"
+    assert "" not in models
+
+
+def save_preset(client, **policies):
+    return client.post("/api/presets", json={
+        "name": "custom",
+        "description": "test preset",
+        "council_models": PANEL["council_models"][:4],
+        "chairman_model": PANEL["chairman_model"],
+        **policies,
+    })
+
+
+@pytest.mark.parametrize("policies", [
+    {"stage_policy": {"quorum": "2"}},
+    {"stage_policy": {"soft_deadline": "30"}},
+    {"stage_policy": {"quorum": 0}},
+    {"review_policy": {"pair_coverage": "2"}},
+    {"review_policy": {"block_size": 1}},
+    {"hierarchy": {"group_size": 1}},
+    {"hierarchy": {"enabled": "yes"}},
+    {"hierarchy": {"groups": 3}},
+    {"ranking": {"mode": "quick"}},
+    {"budget": {"policy": "smallest"}},
+    {"budget": {"max_prompt_tokens": -1}},
+])
+def test_save_preset_rejects_invalid_policies(client, policies):
+    assert save_preset(client, **policies).status_code == 422
+
+
+def test_save_preset_stores_only_the_policy_keys_given(client):
+    response = save_preset(
+        client,
+        stage_policy={"quorum": 2, "soft_deadline": 30},
+        hierarchy={"enabled": True},
+        budget={"policy": "extractive"},
+    )
+    assert response.status_code == 200
+    preset = client.get("/api/presets").json()["presets"][response.json()["preset_id"]]
+    assert preset["stage_policy"] == {"quorum": 2, "soft_deadline": 30}
+    assert preset["hierarchy"] == {"enabled": True}
+    assert preset["budget"] == {"policy": "extractive"}
+    assert "review_policy" not in preset
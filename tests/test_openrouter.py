@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+import httpx
+
+from backend import cache, openrouter
+
+PRIMARY = "openai/gpt-5.2"
+FALLBACK = "openai/gpt-5.1"
+
+
+def test_fallback_hedge_win_is_attributed_and_cached_under_the_fallback(monkeypatch, tmp_path):
+    async def upstream(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        if model == PRIMARY:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json={"choices": [{"message": {"content": f"from {model}"}}]})
+
+    monkeypatch.setattr(openrouter, "HEDGING_ENABLED", True)
+    monkeypatch.setattr(openrouter, "HEDGE_DEFAULT_DELAY", 0.05)
+    monkeypatch.setitem(openrouter.HEDGE_FALLBACK_MODELS, PRIMARY, FALLBACK)
+    monkeypatch.setattr(cache, "_memory", cache.MemoryCache(100, 1 << 20, 3600))
+    monkeypatch.setattr(cache, "_disk", cache.DiskCache(str(tmp_path / "cache.sqlite3"), 100))
+    messages = [{"role": "user", "content": "q"}]
+
+    async def run():
+        openrouter._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        try:
+            answer = await openrouter.query_model(PRIMARY, messages)
+            return (
+                answer,
+                await cache.get(cache.make_key(PRIMARY, messages, None)),
+                await cache.get(cache.make_key(FALLBACK, messages, None)),
+            )
+        finally:
+            await openrouter._client.aclose()
+            openrouter._client = None
+
+    answer, primary_cached, fallback_cached = asyncio.run(run())
+    assert answer["content"] == f"from {FALLBACK}"
+    assert answer["answered_by"] == FALLBACK
+    assert primary_cached is None
+    assert fallback_cached["content"] == f"from {FALLBACK}"
+    assert "answered_by" not in fallback_cached
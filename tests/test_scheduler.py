@@ -0,0 +1,79 @@
+import asyncio
+
+import httpx
+
+from backend import openrouter, scheduler
+
+
+def test_blocked_call_does_not_hold_up_other_models(monkeypatch):
+    monkeypatch.setattr(scheduler, "MODEL_LIMITS", {"a/busy": {"max_concurrent": 1}})
+
+    async def run():
+        slots = scheduler.Scheduler(max_concurrent=8)
+        await slots.acquire("a/busy", 10, "c1")
+        blocked = asyncio.create_task(slots.acquire("a/busy", 10, "c1"))
+        await asyncio.sleep(0)
+        # Queued behind the blocked call in the same conversation
+        await asyncio.wait_for(slots.acquire("b/free", 10, "c1"), 1)
+        assert not blocked.done()
+        slots.release("a/busy")
+        await asyncio.wait_for(blocked, 1)
+        return slots.snapshot()
+
+    snapshot = asyncio.run(run())
+    assert snapshot["running_per_model"] == {"a/busy": 1, "b/free": 1}
+    assert snapshot["queue_depth"] == 0
+
+
+def test_calls_to_one_model_keep_their_order(monkeypatch):
+    monkeypatch.setattr(scheduler, "MODEL_LIMITS", {"a/busy": {"max_concurrent": 1}})
+
+    async def run():
+        slots = scheduler.Scheduler(max_concurrent=8)
+        await slots.acquire("a/busy", 10, "c1")
+        admitted = []
+
+        async def call(name):
+            await slots.acquire("a/busy", 10, "c1")
+            admitted.append(name)
+
+        tasks = [asyncio.create_task(call(name)) for name in ("first", "second")]
+        await asyncio.sleep(0)
+        for _ in tasks:
+            slots.release("a/busy")
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return admitted
+
+    assert asyncio.run(run()) == ["first", "second"]
+
+
+def test_queue_wait_comes_out_of_the_request_timeout(monkeypatch):
+    timeouts = []
+
+    def upstream(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    class SlowSlot:
+        def __init__(self, model, messages, timeout=None):
+            pass
+
+        async def __aenter__(self):
+            await asyncio.sleep(0.3)
+
+        async def __aexit__(self, *exc):
+            pass
+
+    monkeypatch.setattr(openrouter, "upstream_slot", SlowSlot)
+
+    async def run():
+        openrouter._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream))
+        try:
+            return await openrouter._send_request("m/x", [{"role": "user", "content": "q"}], 1.0)
+        finally:
+            await openrouter._client.aclose()
+            openrouter._client = None
+
+    assert asyncio.run(run())["content"] == "ok"
+    assert 0.5 < timeouts[0] <= 0.7
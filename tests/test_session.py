@@ -0,0 +1,67 @@
+import asyncio
+import threading
+import time
+
+from backend.storage.session import ConversationSession
+
+
+class SlowBackend:
+    """Records apply_changes calls, each taking a while on the I/O pool."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.writes = []
+        self.started = threading.Event()
+
+    def get_conversation_header(self, conversation_id):
+        return {"id": conversation_id, "title": "New Conversation", "message_count": 0}
+
+    def apply_changes(self, conversation_id, messages, fields):
+        self.started.set()
+        time.sleep(0.2)
+        if self.fail:
+            raise OSError("disk full")
+        self.writes.append([message["content"] for message in messages])
+
+
+def test_cancelled_commit_is_written_once():
+    backend = SlowBackend()
+
+    async def run():
+        session = ConversationSession(backend, "c1", write_behind=False)
+        await session.load()
+        session.add_user_message("question")
+        commit = asyncio.create_task(session.commit())
+        while not backend.started.is_set():
+            await asyncio.sleep(0.01)
+        commit.cancel()
+        try:
+            await commit
+        except asyncio.CancelledError:
+            pass
+        # The streaming endpoint closes the session again in its finally block
+        await session.close()
+        return session
+
+    session = asyncio.run(run())
+    assert backend.writes == [["question"]]
+    assert session.message_count == 1
+    assert session.pending_messages == []
+
+
+def test_failed_commit_keeps_messages_queued():
+    backend = SlowBackend(fail=True)
+
+    async def run():
+        session = ConversationSession(backend, "c1", write_behind=False)
+        await session.load()
+        session.add_user_message("question")
+        try:
+            await session.commit()
+        except OSError:
+            pass
+        return session
+
+    session = asyncio.run(run())
+    assert [message["content"] for message in session.pending_messages] == ["question"]
+    assert session.message_count == 0
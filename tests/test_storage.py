@@ -0,0 +1,41 @@
+import pytest
+
+from backend.storage.base import StorageBackend
+from backend.storage.json_backend import JsonStorage
+from backend.storage.log_backend import LogStorage
+from backend.storage.sqlite_backend import SqliteStorage
+
+
+@pytest.fixture(params=["json", "jsonl", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SqliteStorage(str(tmp_path / "conversations.sqlite3"))
+    return {"json": JsonStorage, "jsonl": LogStorage}[request.param](str(tmp_path))
+
+
+def test_backend_round_trip(backend):
+    backend.create_conversation("c1")
+    backend.add_user_message("c1", "question")
+    backend.update_conversation_title("c1", "Title")
+    conversation = backend.get_conversation("c1")
+    assert conversation["title"] == "Title"
+    assert [message["content"] for message in conversation["messages"]] == ["question"]
+
+
+def test_incomplete_backend_fails_at_construction():
+    class Incomplete(StorageBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError, match="delete_conversation"):
+        Incomplete()
+
+
+def test_log_append_after_a_torn_line(tmp_path):
+    backend = LogStorage(str(tmp_path))
+    backend.create_conversation("c1")
+    backend.add_user_message("c1", "first")
+    with open(backend.get_log_path("c1"), "a") as f:
+        f.write('{"type": "message", "message": {"role": "us')
+    backend.add_user_message("c1", "second")
+    messages = backend.get_conversation("c1")["messages"]
+    assert [message["content"] for message in messages] == ["first", "second"]